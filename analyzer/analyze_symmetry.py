@@ -1,48 +1,196 @@
 # analyzer/analyze_symmetry.py
 
+import os
+import threading
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
 import numpy as np
+from utils.face_utils import as_landmark_array
+
+# FaceMesh z(깊이) 좌표까지 포함해 3D로 대칭을 계산할지 여부 (기본은 2D)
+SYMMETRY_3D = os.environ.get("SYMMETRY_3D", "0") != "0"
+
+# 메시 기본 점 수 / 홍채 포함 점 수
+MESH_POINTS = 468
+REFINED_POINTS = 478
+
+# 좌우 대응 탐색의 시작점: 얼굴 중심선 위의 변(코끝 1 - 4)
+_SEED_EDGE = (1, 4)
 
-# MediaPipe landmark index 기준 좌우 짝 (예: 좌: 33, 우: 263)
-# 각 쌍은 (left_idx, right_idx)
-# “nose” 파트를 추가하여 코 양 옆 팁(98, 327)도 대칭률에 포함합니다.
-PAIR_INDICES = {
-    "eyes": [(33, 263), (160, 387), (159, 386)],
-    "mouth": [(61, 291), (78, 308), (95, 324)],
-    "ears": [(234, 454), (172, 397), (152, 378)],
-    "nose": [(98, 327)],
+# 홍채 점은 메시 삼각형에 속하지 않으므로 대응을 직접 지정
+# (중심, +x, 위, -x, 아래 순서가 양쪽 모두 같아 좌우 반사 시 +x ↔ -x가 바뀜)
+_IRIS_PAIRS = [(468, 473), (469, 476), (470, 475), (471, 474), (472, 477)]
+
+# 대칭률을 집계할 부위 → FaceMesh 연결 집합 이름 (연결에 포함된 점이 부위에 속함)
+SYMMETRY_REGIONS = {
+    "eyes": ("FACEMESH_LEFT_EYE", "FACEMESH_RIGHT_EYE", "FACEMESH_IRISES"),
+    "mouth": ("FACEMESH_LIPS",),
+    "ears": ("FACEMESH_FACE_OVAL",),
+    "nose": ("FACEMESH_NOSE",),
 }
 
-def calculate_symmetry(landmarks):
-    if not landmarks or len(landmarks) < 468:
+
+class MirrorTable(NamedTuple):
+    """좌우 대칭 계산용 사전 계산 표 (점 수별로 1회 생성)"""
+    mirror: np.ndarray          # (N,) 각 점의 좌우 대응 점 인덱스 (중심선 위의 점은 자기 자신)
+    left: np.ndarray            # (P,) 서로 다른 좌우 짝의 한쪽 인덱스
+    right: np.ndarray           # (P,) 반대쪽 인덱스
+    region_weights: np.ndarray  # (R + 1, P) 부위별 평균 가중치 (부위 마스크 / 부위 짝 수), 마지막 행은 전체 평균
+    regions: tuple              # 부위 이름 (region_weights 행 순서)
+
+
+def _mesh_triangles(edges) -> tuple[dict, dict]:
+    # 변 → 변을 공유하는 삼각형의 나머지 꼭짓점 목록, 점 → 이웃 점 집합 (연결 정보만으로 삼각형 복원)
+    neighbors = defaultdict(set)
+    for a, b in edges:
+        neighbors[a].add(b)
+        neighbors[b].add(a)
+    return {(a, b): sorted(neighbors[a] & neighbors[b]) for a, b in edges}, neighbors
+
+
+def build_mirror_index(tesselation) -> np.ndarray:
+    """
+    FaceMesh 삼각 메시 연결 정보에서 모든 점의 좌우 대응 인덱스를 구합니다. (478,)
+    - 중심선 위의 변에서 시작해, 대응이 정해진 변마다 양옆 삼각형의 나머지 꼭짓점끼리 짝지어 전체로 전파
+    - 메시의 삼각분할이 완전히 대칭이 아니므로 변마다 후보를 투표하고, 서로를 가리키는 짝만 확정
+    - 마지막까지 남은 점은 이웃 집합이 가장 잘 겹치는 점과 짝지음
+    """
+    edges = sorted({tuple(sorted(edge)) for edge in tesselation})
+    triangles, neighbors = _mesh_triangles(edges)
+
+    a, b = _SEED_EDGE
+    c, d = triangles[_SEED_EDGE]
+    mirror = {a: a, b: b, c: d, d: c}
+    while True:
+        votes = defaultdict(Counter)
+        for (a, b), apexes in triangles.items():
+            if a not in mirror or b not in mirror or len(apexes) != 2:
+                continue
+            image = tuple(sorted((mirror[a], mirror[b])))
+            image_apexes = triangles.get(image, ())
+            if image == (a, b):
+                # 중심선 위의 변: 양옆 삼각형이 서로의 대응
+                if mirror[a] == a:
+                    votes[apexes[0]][apexes[1]] += 1
+                    votes[apexes[1]][apexes[0]] += 1
+                continue
+            if len(image_apexes) != 2:
+                continue
+            known = {mirror[apex] for apex in apexes if apex in mirror}
+            unknown = [apex for apex in apexes if apex not in mirror]
+            candidates = [apex for apex in image_apexes if apex not in known]
+            if len(unknown) == 1 and len(candidates) == 1:
+                votes[unknown[0]][candidates[0]] += 1
+
+        best = {point: counter.most_common(1)[0][0] for point, counter in votes.items() if point not in mirror}
+        added = 0
+        for point, other in sorted(best.items()):
+            if point in mirror or other in mirror or best.get(other, point) != point:
+                continue
+            mirror[point], mirror[other] = other, point
+            added += 1
+        if not added:
+            break
+
+    # 남은 점: 대응된 이웃의 상(image) 집합과 이웃 집합이 가장 많이 겹치는 점끼리 짝지음
+    remaining = sorted(point for point in neighbors if point not in mirror)
+    for point in remaining:
+        if point in mirror:
+            continue
+        mirrored = {mirror[n] for n in neighbors[point] if n in mirror}
+        others = [other for other in remaining if other not in mirror and other != point]
+        if not others:
+            mirror[point] = point
+            continue
+        other = max(others, key=lambda o: (len(mirrored & neighbors[o]) / len(mirrored | neighbors[o]), -o))
+        mirror[point], mirror[other] = other, point
+
+    for left, right in _IRIS_PAIRS:
+        mirror[left], mirror[right] = right, left
+
+    index = np.array([mirror.get(i, i) for i in range(REFINED_POINTS)], dtype=np.intp)
+    if not np.array_equal(index[index], np.arange(REFINED_POINTS)):
+        raise RuntimeError("FaceMesh mirror index is not an involution")
+    return index
+
+
+def _build_table(mirror: np.ndarray, region_points: dict, n_points: int) -> MirrorTable:
+    mirror = mirror[:n_points]
+    points = np.arange(n_points)
+    left = points[points < mirror]
+    right = mirror[left]
+
+    regions = tuple(region_points)
+    masks = np.ones((len(regions) + 1, len(left)), dtype=np.float64)
+    for row, region in enumerate(regions):
+        members = np.zeros(n_points, dtype=bool)
+        members[[i for i in region_points[region] if i < n_points]] = True
+        # 한쪽 점이라도 부위에 속하면 그 짝을 부위에 포함
+        masks[row] = members[left] | members[right]
+    region_weights = masks / np.maximum(masks.sum(axis=1, keepdims=True), 1)
+    return MirrorTable(mirror, left, right, region_weights, regions)
+
+
+_tables: dict[int, MirrorTable] = {}
+_tables_lock = threading.Lock()
+
+
+def mirror_table(n_points: int = REFINED_POINTS) -> MirrorTable:
+    """
+    점 수(468 / 478)별 대칭 계산 표를 반환합니다.
+    mediapipe import 비용이 커서 처음 필요할 때(예열 시) 한 번만 만들고 재사용합니다.
+    """
+    table = _tables.get(n_points)
+    if table is not None:
+        return table
+    with _tables_lock:
+        if not _tables:
+            from mediapipe.python.solutions import face_mesh_connections as connections
+
+            mirror = build_mirror_index(connections.FACEMESH_TESSELATION)
+            region_points = {
+                region: {i for name in names for edge in getattr(connections, name) for i in edge}
+                for region, names in SYMMETRY_REGIONS.items()
+            }
+            for count in (MESH_POINTS, REFINED_POINTS):
+                _tables[count] = _build_table(mirror, region_points, count)
+        return _tables[n_points]
+
+
+def calculate_symmetry(landmarks, depth=None):
+    """
+    메시 전체의 좌우 대응 점 짝을 한 번에 비교하여 전체·부위별 대칭률(0~100)을 계산합니다.
+    - landmarks: 정렬된 (N, 2) 랜드마크 (N = 468 또는 478)
+    - depth: 점별 깊이 (N,) 픽셀 단위, 주면 z 차이까지 포함한 3D 거리로 비교
+    - 중심선은 모든 짝의 중점 x 평균 (최소제곱 대칭축)
+    """
+    if landmarks is None or len(landmarks) < MESH_POINTS:
         raise ValueError("Insufficient landmark points.")
 
-    # 중심선 기준 x좌표 (코 중심 기준)
-    left_x = landmarks[234][0]
-    right_x = landmarks[454][0]
-    center_x = (left_x + right_x) / 2
-
-    part_scores = {}
-    total_diffs = []
-
-    for part, pairs in PAIR_INDICES.items():
-        diffs = []
-        for left_idx, right_idx in pairs:
-            lx, ly = landmarks[left_idx]
-            rx, ry = landmarks[right_idx]
-
-            # 좌우 점을 중심선 기준으로 반사시켜 차이 계산
-            reflected_rx = 2 * center_x - rx
-            diff = np.sqrt((lx - reflected_rx)**2 + (ly - ry)**2)
-            diffs.append(diff)
-            total_diffs.append(diff)
-
-        # 부위 평균 → 정규화 (0~100점으로 변환)
-        avg_diff = np.mean(diffs)
-        part_score = max(0, 100 - avg_diff)
-        part_scores[part] = round(part_score, 2)
-
-    # 전체 평균
-    overall_diff = np.mean(total_diffs)
+    landmarks = as_landmark_array(landmarks)
+    n_points = REFINED_POINTS if len(landmarks) >= REFINED_POINTS else MESH_POINTS
+    table = mirror_table(n_points)
+
+    # 오른쪽 점을 중심선 기준으로 반사시켜 왼쪽 점과의 거리 계산 (모든 짝을 한 번에)
+    # 반사 후 x 차이 = (x_l + x_r) - 2 * 중심선, 중심선의 2배는 모든 짝의 x 합 평균
+    x, y = landmarks[:, 0], landmarks[:, 1]
+    dx = x[table.left] + x[table.right]
+    dx -= dx.sum() / dx.size
+    dy = y[table.left] - y[table.right]
+    squared = dx * dx + dy * dy
+    if depth is not None and len(depth) >= n_points:
+        z = np.asarray(depth, dtype=np.float32)
+        dz = z[table.left] - z[table.right]
+        squared += dz * dz
+    diffs = np.sqrt(squared, dtype=np.float64)
+
+    # 부위 마스크 가중치로 부위별·전체 평균을 한 번에 계산 → 정규화 (0~100점으로 변환)
+    *part_means, overall_diff = (table.region_weights @ diffs).tolist()
+    part_scores = {
+        part: round(max(0, 100 - avg_diff), 2)
+        for part, avg_diff in zip(table.regions, part_means)
+    }
     symmetry_score = round(max(0, 100 - overall_diff), 2)
 
     return symmetry_score, part_scores
@@ -0,0 +1,97 @@
+# analyzer/batch.py
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from logger import logger
+from utils.admission import DeadlineExceeded, remaining
+
+# 배치 워커 프로세스 수 (기본: CPU 코어 수)
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "0")) or (os.cpu_count() or 1)
+# 한 번의 배치 요청에서 허용하는 최대 이미지 수
+BATCH_MAX_IMAGES = int(os.environ.get("BATCH_MAX_IMAGES", "64"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker():
+    # 워커 프로세스마다 FaceMesh 1개와 좌우 대칭 인덱스 표를 미리 만들어 두고 재사용
+    from analyzer.analyze_symmetry import mirror_table
+    from analyzer.face_mesh_pool import face_mesh_pool
+    face_mesh_pool.warm_up(count=1)
+    mirror_table()
+
+
+def _score_one(image_bytes: bytes, align_mode: str | None) -> dict:
+    # 워커 프로세스에서 실행: 점수만 계산 (렌더링/인코딩 없음)
+    from analyzer.pipeline import score_face
+
+    try:
+        ctx = score_face(image_bytes, align_mode=align_mode)
+    except Exception as e:
+        return {"error": str(e)}
+
+    if ctx is None:
+        return {"error": "No face detected"}
+
+    return {
+        "final_scores": ctx.final_scores,
+        "final_score": ctx.final_score,
+        "symmetry_score": ctx.symmetry_score,
+        "align_mode": ctx.align_mode,
+    }
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """배치 분석용 프로세스 풀을 처음 사용할 때 생성합니다."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # MediaPipe 내부 스레드와 fork가 충돌하지 않도록 spawn 사용
+            _executor = ProcessPoolExecutor(
+                max_workers=BATCH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info(f"배치 분석 프로세스 풀 생성: 워커 {BATCH_WORKERS}개")
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def analyze_batch(images: list[bytes], align_mode: str | None = None) -> list[dict]:
+    """
+    여러 이미지를 프로세스 풀에 나눠 점수를 계산합니다.
+    - 결과는 입력 순서대로 반환되며, 실패한 이미지는 해당 항목에만 error가 담깁니다.
+    - 요청 기한이 지나면 남은 작업을 취소하고 DeadlineExceeded가 발생합니다.
+    """
+    if len(images) > BATCH_MAX_IMAGES:
+        raise ValueError(f"Too many images in batch (max {BATCH_MAX_IMAGES})")
+
+    executor = get_executor()
+    futures = [executor.submit(_score_one, image_bytes, align_mode) for image_bytes in images]
+
+    results = []
+    for index, future in enumerate(futures):
+        left = remaining()
+        try:
+            result = future.result(timeout=None if left is None else max(0.0, left))
+        except FutureTimeoutError:
+            for pending in futures[index:]:
+                pending.cancel()
+            raise DeadlineExceeded(f"Request deadline exceeded after {index}/{len(futures)} images")
+        except Exception as e:
+            # 워커 프로세스 비정상 종료 등
+            logger.exception("배치 워커 실행 실패")
+            result = {"error": str(e)}
+        results.append({"index": index, **result})
+    return results
@@ -0,0 +1,166 @@
+# analyzer/context.py
+
+import io
+import os
+import numpy as np
+from PIL import Image
+from logger import logger
+from utils.lazy_import import lazy_module
+
+# OpenCV는 import 비용이 커서 처음 사용할 때(예열 단계) 로드
+cv2 = lazy_module("cv2")
+
+# 분석에 사용할 이미지 최대 변 길이 (0이면 원본 해상도 유지)
+# 기본 2560: 얼굴 crop·결과 이미지 기준 크기(최대 1000px)와 DETECT_MAX_SIDE(1280)의 2배를 넉넉히 넘는 값
+MAX_IMAGE_SIDE = int(os.environ.get("MAX_IMAGE_SIDE", "2560"))
+# 랜드마크 검출 입력 최대 변 길이 (FaceMesh는 내부적으로 작은 텐서만 사용)
+DETECT_MAX_SIDE = int(os.environ.get("DETECT_MAX_SIDE", "1280"))
+
+# 축소 디코딩 플래그 이름 (JPEG는 DCT 단계에서 바로 축소되어 디코딩 비용이 크게 줄어듦)
+# (모듈 수준에서 cv2 상수를 읽으면 import 시점에 로드되므로 이름으로 보관)
+_REDUCED_DECODE_FLAGS = (
+    (8, "IMREAD_REDUCED_COLOR_8"),
+    (4, "IMREAD_REDUCED_COLOR_4"),
+    (2, "IMREAD_REDUCED_COLOR_2"),
+)
+
+
+class InvalidImage(ValueError):
+    """업로드 바이트를 이미지로 디코딩할 수 없을 때 발생합니다. (서버 오류가 아닌 잘못된 요청)"""
+
+
+def _probe_size(image_bytes: bytes) -> tuple[int, int] | None:
+    # 헤더만 읽어 원본 크기 확인 (픽셀 디코딩 없음)
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as probe:
+            return probe.size
+    except Exception:
+        return None
+
+
+def check_image_header(image_bytes: bytes):
+    """픽셀 디코딩 없이 헤더만 읽어 이미지 파일인지 확인합니다. (아니면 InvalidImage 발생)"""
+    if _probe_size(image_bytes) is None:
+        raise InvalidImage("Invalid image data")
+
+
+def downscale_to_max_side(image: np.ndarray, max_side: int) -> np.ndarray:
+    """긴 변이 max_side를 넘으면 비율을 유지하며 축소합니다. (0 이하이면 그대로 반환)"""
+    h, w = image.shape[:2]
+    if max_side <= 0 or max(h, w) <= max_side:
+        return image
+    scale = max_side / max(h, w)
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def decode_image_rgb(image_bytes: bytes, max_side: int = 0) -> np.ndarray:
+    """
+    이미지 바이트를 RGB ndarray로 디코딩합니다.
+    - max_side가 주어지면 축소 디코딩 플래그로 먼저 줄인 뒤 최종 크기로 맞춤
+    - 디코딩할 수 없는 데이터이면 InvalidImage 발생
+    """
+    flag = cv2.IMREAD_COLOR
+    if max_side > 0:
+        size = _probe_size(image_bytes)
+        if size is not None:
+            long_side = max(size)
+            for factor, flag_name in _REDUCED_DECODE_FLAGS:
+                if long_side // factor >= max_side:
+                    flag = getattr(cv2, flag_name)
+                    break
+
+    image_array = np.frombuffer(image_bytes, np.uint8)
+    image_bgr = cv2.imdecode(image_array, flag)
+
+    if image_bgr is None:
+        logger.warning("이미지 디코딩 실패: 유효하지 않은 이미지")
+        raise InvalidImage("Invalid image data")
+
+    image_bgr = downscale_to_max_side(image_bgr, max_side)
+
+    # BGR → RGB 변환 (원본 버퍼를 재사용하여 추가 할당 방지)
+    return cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB, dst=image_bgr)
+
+
+class AnalysisContext:
+    """
+    요청 1건의 분석 상태를 담는 컨텍스트입니다.
+    - 업로드 이미지는 한 번만 디코딩하여 RGB ndarray(image_rgb)로 보관
+    - PIL 이미지는 실제로 필요할 때만 생성(image_pil, aligned_pil)
+    - 각 단계의 결과(랜드마크, 정렬 이미지, 부위 크롭)를 다음 단계로 전달
+    """
+
+    def __init__(self, image_rgb: np.ndarray):
+        self.image_rgb = image_rgb
+        # 랜드마크는 (N, 2) float32 픽셀 좌표 배열 (utils.face_utils.Landmarks)
+        # 1차 검출 결과는 정렬 단계에서 재검출 없이 재사용
+        self.landmarks = None
+        # 점별 깊이 (N,) 픽셀 단위 (FaceMesh z), 클라이언트 랜드마크 등 깊이가 없으면 None
+        self.landmarks_depth = None
+
+        self.aligned_rgb = None
+        self.aligned_landmarks = None
+        self.rotation_matrix = None
+        self.align_mode = None
+
+        # 부위 크롭 영역 (정렬 이미지 기준) 및 응답용 부위 PIL 이미지
+        self.part_boxes = None
+        self.parts = None
+
+        # 점수 계산 결과
+        self.symmetry_score = None
+        self.part_scores = None
+        self.match_scores = None
+        self.final_scores = None
+        self.final_score = None
+
+        self._image_pil = None
+        self._aligned_pil = None
+        self._detect_rgb = None
+
+    @classmethod
+    def from_bytes(cls, image_bytes: bytes) -> "AnalysisContext":
+        # 이미지 바이트 → RGB 이미지 (MAX_IMAGE_SIDE 지정 시 축소 디코딩)
+        logger.debug("이미지 바이트 수신 및 디코딩 시도")
+        image_rgb = decode_image_rgb(image_bytes, MAX_IMAGE_SIDE)
+        logger.debug(f"OpenCV 이미지 디코딩 성공: {image_rgb.shape[1]}x{image_rgb.shape[0]}")
+        return cls(image_rgb)
+
+    @property
+    def detect_rgb(self) -> np.ndarray:
+        """랜드마크 검출용 축소 이미지 (정규화 좌표는 image_rgb 크기로 환산)"""
+        if self._detect_rgb is None:
+            self._detect_rgb = downscale_to_max_side(self.image_rgb, DETECT_MAX_SIDE)
+        return self._detect_rgb
+
+    @property
+    def size(self) -> tuple[int, int]:
+        h, w = self.image_rgb.shape[:2]
+        return w, h
+
+    @property
+    def image_pil(self) -> Image.Image:
+        if self._image_pil is None:
+            self._image_pil = Image.fromarray(self.image_rgb)
+        return self._image_pil
+
+    @property
+    def aligned_pil(self) -> Image.Image | None:
+        if self._aligned_pil is None and self.aligned_rgb is not None:
+            self._aligned_pil = Image.fromarray(self.aligned_rgb)
+        return self._aligned_pil
+
+    def set_aligned(self, aligned_rgb: np.ndarray, aligned_landmarks, rotation_matrix=None, mode=None):
+        self.aligned_rgb = aligned_rgb
+        self.aligned_landmarks = aligned_landmarks
+        self.rotation_matrix = rotation_matrix
+        self.align_mode = mode
+        self._aligned_pil = None
+
+
+def as_context(image) -> AnalysisContext:
+    """bytes 또는 AnalysisContext를 받아 AnalysisContext로 반환합니다."""
+    if isinstance(image, AnalysisContext):
+        return image
+    return AnalysisContext.from_bytes(image)
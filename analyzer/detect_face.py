@@ -1,117 +1,292 @@
-import cv2
+import os
+import random
 import numpy as np
-from PIL import Image
-import mediapipe as mp
 from logger import logger
+from analyzer.context import AnalysisContext, as_context, downscale_to_max_side, DETECT_MAX_SIDE
+from analyzer.face_mesh_pool import face_mesh_pool, DEFAULT_CONFIG
+from utils.face_utils import Landmarks, as_landmark_array
+from utils.metrics import CLIENT_LANDMARKS
+from utils.lazy_import import lazy_module
 
-mp_face_mesh = mp.solutions.face_mesh
+cv2 = lazy_module("cv2")
 
-def detect_landmarks(image_bytes: bytes):
-    # 이미지 바이트 → OpenCV 이미지
-    logger.debug("이미지 바이트 수신 및 디코딩 시도")
-    image_array = np.frombuffer(image_bytes, np.uint8)
-    image_bgr = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
+# 정렬 모드
+# - analytic: 1차 랜드마크를 회전 행렬로 변환하고, 부위 크롭에 필요한 영역만 회전 (추론 1회)
+# - precise : 전체 이미지를 회전한 뒤 FaceMesh로 다시 검출 (추론 2회)
+ALIGN_MODES = ("analytic", "precise")
+DEFAULT_ALIGN_MODE = os.environ.get("ALIGN_MODE", "analytic")
 
-    if image_bgr is None:
-        logger.error("이미지 디코딩 실패: 유효하지 않은 이미지")
-        raise ValueError("Invalid image data")
+# 여러 얼굴 분석 시 한 번에 검출할 최대 얼굴 수 (요청의 max_faces 상한)
+MAX_FACES = int(os.environ.get("MAX_FACES", "10"))
+MULTI_FACE_CONFIG = DEFAULT_CONFIG._replace(max_num_faces=MAX_FACES)
 
-    logger.debug("OpenCV 이미지 디코딩 성공")
+# 클라이언트 랜드마크를 서버 검출과 비교할 요청 비율, 허용 오차 (눈 사이 거리 대비 평균 거리)
+CLIENT_LANDMARKS_VERIFY_RATE = float(os.environ.get("CLIENT_LANDMARKS_VERIFY_RATE", "0.05"))
+CLIENT_LANDMARKS_MAX_ERROR = float(os.environ.get("CLIENT_LANDMARKS_MAX_ERROR", "0.1"))
+# 이미지 밖으로 허용하는 랜드마크 범위 (이미지 크기 대비), 최소 얼굴 크기(px)
+_CLIENT_BOUNDS_MARGIN = 0.1
+_CLIENT_MIN_FACE_SIDE = 16
 
-    # BGR → RGB 변환
-    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+# analytic 모드에서 회전할 영역 여유 (랜드마크 bbox 대비 이미지 크기 비율)
+# image_devide.PADDING_RATIO_MAP의 최대 패딩(0.12)보다 크게 잡아 크롭이 잘리지 않도록 함
+ALIGN_ROI_MARGIN = 0.15
 
-    # MediaPipe 모델 초기화
-    with mp_face_mesh.FaceMesh(
-        static_image_mode=True,           # 정적 이미지 처리
-        max_num_faces=1,                  # 최대 얼굴 수: 1
-        refine_landmarks=True,            # 눈, 입술 등 세부 랜드마크 보정
-        min_detection_confidence=0.5      # 감지 신뢰도 임계값
-    ) as face_mesh:
 
-        results = face_mesh.process(image_rgb)
+def _landmarks_to_pixels(face: np.ndarray, w: int, h: int) -> tuple[Landmarks, np.ndarray]:
+    # 정규화 좌표 (N, 3) → 실수 픽셀 좌표 (N, 2)와 깊이 (N,), 소수점 정밀도 유지
+    # FaceMesh z는 x와 같은 배율이므로 이미지 너비로 환산
+    points = face * np.array([w, h, w], dtype=np.float32)
+    return np.ascontiguousarray(points[:, :2]), np.ascontiguousarray(points[:, 2])
 
-        # 얼굴이 감지되지 않음
-        if not results.multi_face_landmarks:
-            logger.warning("얼굴이 감지되지 않음")
-            return None, None
 
-        logger.debug("얼굴 랜드마크 감지 성공")
+def _detect_all_points(detector, detect_rgb: np.ndarray, size: tuple[int, int]) -> list[tuple[Landmarks, np.ndarray]]:
+    # 축소 이미지로 검출하고, 정규화 좌표를 원본 크기(size = (w, h)) 픽셀 좌표·깊이로 환산
+    w, h = size
+    return [_landmarks_to_pixels(face, w, h) for face in detector.detect(detect_rgb)]
 
-        # 첫 번째 얼굴의 랜드마크 추출
-        face_landmarks = results.multi_face_landmarks[0]
-        h, w, _ = image_rgb.shape
-        landmarks = []
-        for lm in face_landmarks.landmark:
-            x, y = int(lm.x * w), int(lm.y * h)
-            landmarks.append((x, y))
 
-        # OpenCV 이미지를 PIL 이미지로 변환
-        image_pil = Image.fromarray(image_rgb)
+def _detect_all_pixels(detector, detect_rgb: np.ndarray, size: tuple[int, int]) -> list[Landmarks]:
+    return [points for points, _ in _detect_all_points(detector, detect_rgb, size)]
 
-        return landmarks, image_pil
 
+def _detect_pixels(detector, detect_rgb: np.ndarray, size: tuple[int, int]) -> Landmarks | None:
+    faces = _detect_all_pixels(detector, detect_rgb, size)
+    return faces[0] if faces else None
 
-def align_and_detect_landmarks(image_bytes: bytes):
-    # 이미지 바이트 → OpenCV 이미지
-    logger.debug("이미지 바이트 수신 및 디코딩 시도")
-    image_array = np.frombuffer(image_bytes, np.uint8)
-    image_bgr = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
 
-    if image_bgr is None:
-        logger.error("이미지 디코딩 실패: 유효하지 않은 이미지")
-        raise ValueError("Invalid image data")
+def face_box(points: Landmarks, size: tuple[int, int]) -> tuple[int, int, int, int]:
+    """랜드마크를 감싸는 얼굴 영역 (x0, y0, x1, y1), 이미지 경계로 제한"""
+    w, h = size
+    x0, y0 = np.floor(points.min(axis=0)).astype(int).tolist()
+    x1, y1 = np.ceil(points.max(axis=0)).astype(int).tolist()
+    return max(x0, 0), max(y0, 0), min(x1, w), min(y1, h)
 
-    logger.debug("OpenCV 이미지 디코딩 성공")
-    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
 
-    with mp_face_mesh.FaceMesh(
-        static_image_mode=True,
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5
-    ) as face_mesh:
+def locate_landmarks(ctx: AnalysisContext, face_mesh=None) -> Landmarks | None:
+    """
+    컨텍스트 이미지에서 랜드마크만 검출합니다. (PIL 이미지 생성 없음)
+    - face_mesh: 스트림 세션처럼 호출 측이 붙잡고 있는 인스턴스 (없으면 풀에서 대여)
+    """
+    if face_mesh is not None:
+        faces = _detect_all_points(face_mesh, ctx.detect_rgb, ctx.size)
+    else:
+        # 풀에서 예열된 MediaPipe 모델 대여 (정적 이미지, 얼굴 1개, 세부 랜드마크 보정)
+        with face_mesh_pool.checkout(DEFAULT_CONFIG) as face_mesh:
+            faces = _detect_all_points(face_mesh, ctx.detect_rgb, ctx.size)
 
-        results = face_mesh.process(image_rgb)
+    # 얼굴이 감지되지 않음
+    if not faces:
+        logger.warning("얼굴이 감지되지 않음")
+        return None
 
-        if not results.multi_face_landmarks:
-            logger.warning("얼굴이 감지되지 않음")
-            return None, None
+    logger.debug("얼굴 랜드마크 감지 성공")
 
-        logger.debug("얼굴 랜드마크 감지 성공")
-        face_landmarks = results.multi_face_landmarks[0]
-        h, w, _ = image_rgb.shape
+    # 첫 번째 얼굴의 랜드마크 (N, 2) 배열과 깊이 (3D 대칭 계산용)
+    ctx.landmarks, ctx.landmarks_depth = faces[0]
+    return ctx.landmarks
 
-        # 눈 좌표 추출 (좌: 33, 우: 263)
-        left_eye = face_landmarks.landmark[33]
-        right_eye = face_landmarks.landmark[263]
 
-        left_eye_pos = np.array([left_eye.x * w, left_eye.y * h])
-        right_eye_pos = np.array([right_eye.x * w, right_eye.y * h])
+def locate_faces(ctx: AnalysisContext, max_faces: int) -> list[tuple[Landmarks, np.ndarray]]:
+    """
+    추론 1회로 최대 max_faces개의 얼굴 (랜드마크, 깊이)를 검출합니다.
+    - MAX_FACES개까지 검출한 뒤 큰 얼굴 순으로 max_faces개를 고르고, 왼쪽 → 오른쪽 순으로 정렬
+    """
+    with face_mesh_pool.checkout(MULTI_FACE_CONFIG) as face_mesh:
+        faces = _detect_all_points(face_mesh, ctx.detect_rgb, ctx.size)
 
-        # 회전 각도 계산 (눈 중심을 수평으로 정렬)
-        delta = right_eye_pos - left_eye_pos
-        angle = np.degrees(np.arctan2(delta[1], delta[0]))
+    if not faces:
+        logger.warning("얼굴이 감지되지 않음")
+        return []
 
-        logger.debug(f"얼굴 회전 각도: {angle:.2f}도")
+    def area(face):
+        x0, y0, x1, y1 = face_box(face[0], ctx.size)
+        return (x1 - x0) * (y1 - y0)
 
-        # 회전 행렬 계산 및 이미지 회전
-        center = (int(w // 2), int(h // 2))
-        rot_mat = cv2.getRotationMatrix2D(center, angle, 1.0)
+    faces = sorted(faces, key=area, reverse=True)[:max_faces]
+    faces.sort(key=lambda face: float(face[0][:, 0].min()))
+    logger.debug(f"검출된 얼굴 수: {len(faces)}")
+    return faces
+
+
+def _client_landmark_problem(points: Landmarks, size: tuple[int, int]) -> str | None:
+    # 이미지 범위를 크게 벗어나거나 얼굴 크기가 비정상이면 거부 사유 반환
+    w, h = size
+    x0, y0 = points.min(axis=0).tolist()
+    x1, y1 = points.max(axis=0).tolist()
+    mx, my = w * _CLIENT_BOUNDS_MARGIN, h * _CLIENT_BOUNDS_MARGIN
+    if x0 < -mx or y0 < -my or x1 > w + mx or y1 > h + my:
+        return "out_of_bounds"
+    if x1 - x0 < _CLIENT_MIN_FACE_SIDE or y1 - y0 < _CLIENT_MIN_FACE_SIDE:
+        return "degenerate"
+    if np.linalg.norm(points[263] - points[33]) < 1:
+        return "degenerate"
+    return None
+
+
+def use_client_landmarks(ctx: AnalysisContext, points, normalized: bool = True, pre_aligned: bool = False) -> str:
+    """
+    클라이언트(브라우저 MediaPipe)가 보낸 랜드마크를 컨텍스트에 적용하여 서버 검출을 건너뜁니다.
+    - points: (N, 2) 또는 z(깊이)를 포함한 (N, 3) 좌표
+    - normalized: 0~1 정규화 좌표이면 이미지 크기로 환산 (False면 픽셀 좌표), z는 서버 검출과 같이 너비로 환산
+    - pre_aligned: 업로드 이미지가 이미 수평 정렬되어 있으면 정렬 단계도 건너뜀
+    - CLIENT_LANDMARKS_VERIFY_RATE 비율로 서버 검출과 비교하여, 오차가 크면 서버 결과를 사용
+    반환값은 실제 사용한 랜드마크 출처("client" / "server")이며, 서버로 대체하면
+    컨텍스트에 서버 검출 결과(있는 경우)가 들어갑니다.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    depth = None
+    if points.ndim == 2 and points.shape[1] == 3:
+        points, depth = np.ascontiguousarray(points[:, :2]), np.ascontiguousarray(points[:, 2])
+    points = as_landmark_array(points)
+    if normalized:
+        points = points * np.array(ctx.size, dtype=np.float32)
+        if depth is not None:
+            depth = depth * np.float32(ctx.size[0])
+
+    problem = _client_landmark_problem(points, ctx.size)
+    if problem is not None:
+        logger.warning(f"클라이언트 랜드마크 거부 ({problem}), 서버 검출로 대체")
+        CLIENT_LANDMARKS.inc(result=problem)
+        return "server"
+
+    if random.random() < CLIENT_LANDMARKS_VERIFY_RATE:
+        # 표본 검증: 서버에서도 검출하여 평균 오차 비교
+        with face_mesh_pool.checkout(DEFAULT_CONFIG) as face_mesh:
+            faces = _detect_all_points(face_mesh, ctx.detect_rgb, ctx.size)
+        if not faces:
+            CLIENT_LANDMARKS.inc(result="unverified")
+        else:
+            server, server_depth = faces[0]
+            n = min(len(points), len(server))
+            eye_distance = float(np.linalg.norm(server[263] - server[33])) or 1.0
+            error = float(np.linalg.norm(points[:n] - server[:n], axis=1).mean()) / eye_distance
+            logger.debug(f"클라이언트 랜드마크 검증 오차: {error:.4f}")
+            if error > CLIENT_LANDMARKS_MAX_ERROR:
+                logger.warning(f"클라이언트 랜드마크 불일치 (오차 {error:.3f}), 서버 검출 결과 사용")
+                CLIENT_LANDMARKS.inc(result="mismatch")
+                ctx.landmarks, ctx.landmarks_depth = server, server_depth
+                return "server"
+            CLIENT_LANDMARKS.inc(result="verified")
+
+    ctx.landmarks, ctx.landmarks_depth = points, depth
+    if pre_aligned:
+        ctx.set_aligned(ctx.image_rgb, points, None, "client")
+    CLIENT_LANDMARKS.inc(result="accepted")
+    return "client"
+
+
+def detect_landmarks(image: bytes | AnalysisContext):
+    # 이미지 바이트 또는 이미 디코딩된 컨텍스트 사용
+    ctx = as_context(image)
+    if locate_landmarks(ctx) is None:
+        return None, None
+
+    # PIL 이미지는 컨텍스트에서 필요할 때 생성
+    return ctx.landmarks, ctx.image_pil
+
+
+def _rotation_matrix(points: Landmarks, w: int, h: int) -> np.ndarray:
+    # 눈 좌표 추출 (좌: 33, 우: 263)
+    left_eye_pos = points[33].astype(np.float64)
+    right_eye_pos = points[263].astype(np.float64)
+
+    # 회전 각도 계산 (눈 중심을 수평으로 정렬)
+    delta = right_eye_pos - left_eye_pos
+    angle = np.degrees(np.arctan2(delta[1], delta[0]))
+
+    logger.debug(f"얼굴 회전 각도: {angle:.2f}도")
+
+    # 회전 행렬 계산
+    center = (int(w // 2), int(h // 2))
+    return cv2.getRotationMatrix2D(center, angle, 1.0)
+
+
+def _rotate_points(points: Landmarks, rot_mat: np.ndarray) -> Landmarks:
+    # 랜드마크를 이미지와 같은 회전 행렬로 변환
+    return points @ rot_mat[:, :2].T.astype(np.float32) + rot_mat[:, 2].astype(np.float32)
+
+
+def align_landmarks(points: Landmarks, size: tuple[int, int]) -> Landmarks:
+    """이미지 회전 없이 랜드마크만 눈 기준으로 수평 정렬합니다. (analytic 모드와 같은 좌표)"""
+    w, h = size
+    return _rotate_points(points, _rotation_matrix(points, w, h))
+
+
+def _warp_region(image_rgb: np.ndarray, rot_mat: np.ndarray, points: Landmarks) -> np.ndarray:
+    """
+    회전 결과 중 랜드마크 주변 영역만 계산하여 원본 크기 캔버스에 채웁니다.
+    영역 밖은 검은색으로 남으며, 부위 크롭은 항상 영역 안쪽에서 이루어집니다.
+    """
+    h, w = image_rgb.shape[:2]
+    margin_x = int(w * ALIGN_ROI_MARGIN)
+    margin_y = int(h * ALIGN_ROI_MARGIN)
+
+    x0 = max(int(points[:, 0].min()) - margin_x, 0)
+    x1 = min(int(np.ceil(points[:, 0].max())) + margin_x, w)
+    y0 = max(int(points[:, 1].min()) - margin_y, 0)
+    y1 = min(int(np.ceil(points[:, 1].max())) + margin_y, h)
+
+    aligned = np.zeros_like(image_rgb)
+    if x1 <= x0 or y1 <= y0:
+        return aligned
+
+    # 출력 좌표를 영역 원점 기준으로 옮긴 행렬로 영역만 샘플링
+    roi_mat = rot_mat.copy()
+    roi_mat[0, 2] -= x0
+    roi_mat[1, 2] -= y0
+    cv2.warpAffine(
+        image_rgb, roi_mat, (x1 - x0, y1 - y0),
+        dst=aligned[y0:y1, x0:x1], flags=cv2.INTER_LINEAR,
+    )
+    return aligned
+
+
+def align_face(ctx: AnalysisContext, mode: str | None = None) -> Landmarks | None:
+    """
+    눈 기준으로 얼굴을 수평 정렬하고 정렬된 랜드마크를 반환합니다.
+    정렬 결과(aligned_rgb, aligned_landmarks)는 컨텍스트에 저장됩니다. (PIL 이미지 생성 없음)
+    """
+    image_rgb = ctx.image_rgb
+    h, w = image_rgb.shape[:2]
+
+    mode = mode or DEFAULT_ALIGN_MODE
+    if mode not in ALIGN_MODES:
+        raise ValueError(f"Unknown alignment mode: {mode}")
+
+    # 1차 검출 결과가 컨텍스트에 있으면 재사용
+    points = ctx.landmarks
+    if points is None:
+        points = locate_landmarks(ctx)
+        if points is None:
+            return None
+
+    rot_mat = _rotation_matrix(points, w, h)
+
+    if mode == "analytic":
+        # 1차 랜드마크를 같은 회전 행렬로 변환
+        aligned_points = _rotate_points(points, rot_mat)
+        aligned_image = _warp_region(image_rgb, rot_mat, aligned_points)
+    else:
+        # 전체 이미지 회전 후 다시 랜드마크 감지
         aligned_image = cv2.warpAffine(image_rgb, rot_mat, (w, h), flags=cv2.INTER_LINEAR)
 
-        # 회전된 이미지로 다시 랜드마크 감지
-        results_aligned = face_mesh.process(aligned_image)
+        with face_mesh_pool.checkout(DEFAULT_CONFIG) as face_mesh:
+            aligned_points = _detect_pixels(
+                face_mesh, downscale_to_max_side(aligned_image, DETECT_MAX_SIDE), (w, h)
+            )
 
-        if not results_aligned.multi_face_landmarks:
+        if aligned_points is None:
             logger.warning("얼굴이 회전된 이미지에서도 감지되지 않음")
-            return None, None
+            return None
+
+    logger.debug(f"얼굴 정렬 완료 (모드: {mode})")
+    ctx.set_aligned(aligned_image, aligned_points, rot_mat, mode)
+    return aligned_points
 
-        aligned_landmarks = []
-        for lm in results_aligned.multi_face_landmarks[0].landmark:
-            x, y = int(lm.x * w), int(lm.y * h)
-            aligned_landmarks.append((x, y))
 
-        aligned_pil_image = Image.fromarray(aligned_image)
+def align_and_detect_landmarks(image: bytes | AnalysisContext, mode: str | None = None):
+    ctx = as_context(image)
+    if align_face(ctx, mode) is None:
+        return None, None
 
-        return aligned_landmarks, aligned_pil_image
\ No newline at end of file
+    return ctx.aligned_landmarks, ctx.aligned_pil
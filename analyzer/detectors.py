@@ -0,0 +1,266 @@
+# analyzer/detectors.py
+
+import json
+import os
+import sys
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import numpy as np
+from logger import logger
+from utils.face_utils import LANDMARK_COUNTS
+
+# 랜드마크 검출 백엔드: facemesh(기본, mp.solutions) / landmarker(MediaPipe Tasks FaceLandmarker) / stub(고정 랜드마크)
+LANDMARK_DETECTOR = os.environ.get("LANDMARK_DETECTOR", "facemesh")
+# 추론 스레드 수 (0이면 런타임 기본값), 위임 장치 (cpu / gpu) — landmarker 백엔드에 적용
+DETECTOR_THREADS = int(os.environ.get("DETECTOR_THREADS", "0"))
+DETECTOR_DELEGATE = os.environ.get("DETECTOR_DELEGATE", "cpu").lower()
+# FaceLandmarker 모델 파일 (빌드 시 `python -m analyzer.detectors`로 미리 받아 둠)
+FACE_LANDMARKER_URL = os.environ.get(
+    "FACE_LANDMARKER_URL",
+    "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task",
+)
+FACE_LANDMARKER_MODEL = os.environ.get("FACE_LANDMARKER_MODEL", os.path.join("models", "face_landmarker.task"))
+# stub 백엔드가 돌려줄 정규화 랜드마크 [[x, y, z], ...] JSON 파일
+STUB_LANDMARKS_PATH = os.environ.get(
+    "STUB_LANDMARKS_PATH", os.path.join(os.path.dirname(__file__), "data", "stub_landmarks.json")
+)
+
+# XNNPACK 스레드 수 지정(BaseOptions.to_pb2 교체)을 확인한 mediapipe 버전 (major, minor)
+_XNNPACK_PATCH_VERSION = (0, 10)
+
+# 추적 모드에서 프레임마다 늘려 주는 가상 타임스탬프 간격(ms) — VIDEO 모드는 증가하는 값만 요구
+_VIDEO_FRAME_MS = 33
+
+
+class LandmarkDetector(ABC):
+    """
+    랜드마크 검출기 인터페이스입니다. 인스턴스는 스레드 하나가 빌려 쓰며 (face_mesh_pool), 동시에 호출되지 않습니다.
+    - detect(): RGB 배열에서 얼굴별 정규화 좌표 (N, 3) float32 배열 목록을 반환 (x, y는 0~1, z는 x와 같은 배율)
+    - reset(): 추적 상태 초기화 (추적 모드 인스턴스를 풀에 반납할 때 호출)
+    - close(): 모델 자원 해제
+    """
+
+    @abstractmethod
+    def detect(self, image_rgb: np.ndarray) -> list[np.ndarray]:
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# 백엔드 이름 → 생성 함수 (FaceMeshConfig를 받아 LandmarkDetector 반환)
+_BACKENDS = {}
+
+
+def register_detector(name: str):
+    """검출기 백엔드를 이름으로 등록하는 데코레이터입니다."""
+    def decorator(factory):
+        _BACKENDS[name] = factory
+        return factory
+    return decorator
+
+
+def available_detectors() -> list[str]:
+    return sorted(_BACKENDS)
+
+
+def create_detector(config, backend: str | None = None) -> LandmarkDetector:
+    """설정(FaceMeshConfig)에 맞는 검출기를 생성합니다. backend를 생략하면 LANDMARK_DETECTOR 사용"""
+    backend = backend or LANDMARK_DETECTOR
+    factory = _BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"Unknown LANDMARK_DETECTOR: {backend} (available: {', '.join(available_detectors())})")
+    return factory(config)
+
+
+def _to_array(landmarks) -> np.ndarray:
+    # 정규화 랜드마크 목록 → (N, 3) float32 배열
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+
+
+@register_detector("facemesh")
+class FaceMeshDetector(LandmarkDetector):
+    """
+    mp.solutions.face_mesh 기반 검출기 (기존 동작)
+    추론 스레드 수와 위임 장치는 지정할 수 없으며 런타임 기본값을 사용합니다.
+    """
+
+    def __init__(self, config):
+        # mediapipe(및 matplotlib 등 의존 모듈)는 import 비용이 커서 첫 인스턴스 생성 시점에 로드
+        import mediapipe as mp
+
+        self._face_mesh = mp.solutions.face_mesh.FaceMesh(**config._asdict())
+
+    def detect(self, image_rgb: np.ndarray) -> list[np.ndarray]:
+        results = self._face_mesh.process(image_rgb)
+        return [_to_array(face.landmark) for face in results.multi_face_landmarks or ()]
+
+    def reset(self):
+        self._face_mesh.reset()
+
+    def close(self):
+        self._face_mesh.close()
+
+
+@lru_cache(maxsize=1)
+def _xnnpack_threads_supported() -> bool:
+    """
+    설치된 mediapipe에서 XNNPACK 스레드 수 지정이 가능한지 확인합니다. (프로세스당 한 번, 불가하면 경고)
+    - 확인한 버전(_XNNPACK_PATCH_VERSION)이 아니거나 BaseOptions protobuf에 acceleration.xnnpack 필드가 없으면
+      DETECTOR_THREADS를 무시하고 런타임 기본 스레드 수를 사용
+    """
+    import mediapipe as mp
+    from mediapipe.tasks.python import BaseOptions
+
+    version = tuple(int(part) for part in mp.__version__.split(".")[:2] if part.isdigit())
+    if version != _XNNPACK_PATCH_VERSION:
+        logger.warning(
+            f"DETECTOR_THREADS 무시: mediapipe {mp.__version__}에서는 스레드 수 지정을 확인하지 않음 "
+            f"(확인된 버전 {'.'.join(map(str, _XNNPACK_PATCH_VERSION))}.x)"
+        )
+        return False
+    acceleration = BaseOptions(delegate=BaseOptions.Delegate.CPU).to_pb2().acceleration
+    if "xnnpack" not in acceleration.DESCRIPTOR.fields_by_name:
+        logger.warning("DETECTOR_THREADS 무시: BaseOptions protobuf에 acceleration.xnnpack 필드가 없음")
+        return False
+    return True
+
+
+@register_detector("landmarker")
+class FaceLandmarkerDetector(LandmarkDetector):
+    """
+    MediaPipe Tasks FaceLandmarker 기반 검출기
+    - 정적 이미지 설정은 IMAGE 모드, 추적 설정(static_image_mode=False)은 VIDEO 모드로 실행
+    - DETECTOR_THREADS > 0이면 CPU(XNNPACK) 추론 스레드 수를 지정, DETECTOR_DELEGATE=gpu이면 GPU 위임
+    - 항상 홍채 포함 478개 랜드마크를 반환 (refine_landmarks 설정과 무관)
+    """
+
+    def __init__(self, config, model_path: str = FACE_LANDMARKER_MODEL,
+                 threads: int = DETECTOR_THREADS, delegate: str = DETECTOR_DELEGATE):
+        if delegate not in ("cpu", "gpu"):
+            raise ValueError(f"Unknown DETECTOR_DELEGATE: {delegate}")
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(
+                f"FaceLandmarker model not found: {model_path} (python -m analyzer.detectors 로 설치)"
+            )
+        self.config = config
+        self.model_path = model_path
+        self.threads = threads
+        self.delegate = delegate
+        self._landmarker = self._create()
+        self._timestamp_ms = 0
+
+    def _create(self):
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        base_options = BaseOptions(
+            model_asset_path=self.model_path,
+            delegate=BaseOptions.Delegate.GPU if self.delegate == "gpu" else BaseOptions.Delegate.CPU,
+        )
+        if self.delegate == "cpu" and self.threads > 0 and _xnnpack_threads_supported():
+            # Python BaseOptions에는 스레드 수 옵션이 없어, 생성되는 protobuf의 위임 설정을
+            # XNNPACK(num_threads 지정)으로 바꾸도록 이 인스턴스의 to_pb2만 감쌈
+            # (mediapipe 내부 구조에 의존하므로 _xnnpack_threads_supported()로 버전·필드를 먼저 확인)
+            to_pb2 = base_options.to_pb2
+
+            def to_pb2_with_threads():
+                proto = to_pb2()
+                proto.acceleration.xnnpack.num_threads = self.threads
+                return proto
+
+            base_options.to_pb2 = to_pb2_with_threads
+
+        running_mode = vision.RunningMode.IMAGE if self.config.static_image_mode else vision.RunningMode.VIDEO
+        options = vision.FaceLandmarkerOptions(
+            base_options=base_options,
+            running_mode=running_mode,
+            num_faces=self.config.max_num_faces,
+            min_face_detection_confidence=self.config.min_detection_confidence,
+            min_face_presence_confidence=self.config.min_detection_confidence,
+        )
+        return vision.FaceLandmarker.create_from_options(options)
+
+    def detect(self, image_rgb: np.ndarray) -> list[np.ndarray]:
+        import mediapipe as mp
+
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(image_rgb))
+        if self.config.static_image_mode:
+            result = self._landmarker.detect(image)
+        else:
+            self._timestamp_ms += _VIDEO_FRAME_MS
+            result = self._landmarker.detect_for_video(image, self._timestamp_ms)
+        return [_to_array(face) for face in result.face_landmarks]
+
+    def reset(self):
+        # VIDEO 모드는 추적 상태를 지우는 API가 없어 새로 생성
+        if not self.config.static_image_mode:
+            self._landmarker.close()
+            self._landmarker = self._create()
+            self._timestamp_ms = 0
+
+    def close(self):
+        self._landmarker.close()
+
+
+def load_stub_landmarks(path: str = STUB_LANDMARKS_PATH) -> np.ndarray:
+    """stub 백엔드용 정규화 랜드마크 [[x, y, z], ...] 파일을 읽어 (N, 3) 배열로 반환합니다."""
+    with open(path, encoding="utf-8") as f:
+        points = np.asarray(json.load(f), dtype=np.float32)
+    if points.ndim != 2 or points.shape[1] != 3 or len(points) not in LANDMARK_COUNTS:
+        raise ValueError(f"Stub landmarks must be {' or '.join(map(str, LANDMARK_COUNTS))} [x, y, z] points: {path}")
+    return points
+
+
+@register_detector("stub")
+class StubDetector(LandmarkDetector):
+    """
+    모델 없이 항상 같은 얼굴 1개를 돌려주는 검출기 (부하·벤치마크 테스트용)
+    - 입력 이미지와 무관하게 STUB_LANDMARKS_PATH의 정규화 좌표를 반환하므로 결과가 결정적
+    - 검출 비용이 거의 없어 검출 이후 단계(정렬, 대칭률, 일치율, 렌더링)만 따로 측정할 수 있음
+    """
+
+    _landmarks = None
+
+    def __init__(self, config):
+        if StubDetector._landmarks is None:
+            StubDetector._landmarks = load_stub_landmarks()
+        points = StubDetector._landmarks
+        self._faces = [points if config.refine_landmarks else points[:LANDMARK_COUNTS[0]]]
+
+    def detect(self, image_rgb: np.ndarray) -> list[np.ndarray]:
+        return list(self._faces)
+
+
+def download_face_landmarker(url: str = FACE_LANDMARKER_URL, path: str = FACE_LANDMARKER_MODEL) -> str:
+    """
+    FaceLandmarker 모델을 내려받아 저장합니다. 이미지 빌드/배포 단계에서만 호출하며
+    요청 처리나 import 경로에서는 호출하지 않습니다.
+    """
+    import requests
+
+    if os.path.isfile(path):
+        logger.info(f"FaceLandmarker 모델이 이미 설치되어 있음: {path}")
+        return path
+
+    resp = requests.get(url, timeout=120)
+    resp.raise_for_status()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(resp.content)
+    os.replace(tmp_path, path)
+    logger.info(f"FaceLandmarker 모델 다운로드 완료: {path}")
+    return path
+
+
+if __name__ == "__main__":
+    try:
+        download_face_landmarker()
+    except Exception as e:
+        logger.error(f"FaceLandmarker 모델 다운로드 실패: {e}")
+        sys.exit(1)
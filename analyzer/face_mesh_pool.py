@@ -0,0 +1,153 @@
+# analyzer/face_mesh_pool.py
+
+import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from queue import Queue, Empty
+
+from logger import logger
+from analyzer.detectors import LANDMARK_DETECTOR, create_detector
+
+# FaceMesh 설정 키 (같은 설정끼리만 인스턴스를 공유)
+FaceMeshConfig = namedtuple(
+    "FaceMeshConfig",
+    ["static_image_mode", "max_num_faces", "refine_landmarks", "min_detection_confidence"],
+)
+
+# 기본 분석 설정 (정적 이미지, 얼굴 1개, 세부 랜드마크 보정, 신뢰도 0.5)
+DEFAULT_CONFIG = FaceMeshConfig(
+    static_image_mode=True,
+    max_num_faces=1,
+    refine_landmarks=True,
+    min_detection_confidence=0.5,
+)
+
+# 설정별 최대 인스턴스 수 (Flask 워커 스레드 수에 맞춰 조정)
+POOL_SIZE = int(os.environ.get("FACE_MESH_POOL_SIZE", "4"))
+# 인스턴스 반납 대기 시간(초)
+CHECKOUT_TIMEOUT = float(os.environ.get("FACE_MESH_CHECKOUT_TIMEOUT", "30"))
+
+
+class FaceMeshPool:
+    """
+    설정별로 미리 로드된 랜드마크 검출기(LANDMARK_DETECTOR 백엔드) 인스턴스를 보관하는 스레드 안전 풀입니다.
+    - checkout(): 인스턴스를 빌려오고 with 블록이 끝나면 자동 반납
+    - 설정별 인스턴스 수는 max_size를 넘지 않으며, 모두 사용 중이면 반납을 기다립니다.
+    """
+
+    def __init__(self, max_size: int = POOL_SIZE, timeout: float = CHECKOUT_TIMEOUT):
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: dict[FaceMeshConfig, Queue] = {}
+        self._created: dict[FaceMeshConfig, int] = {}
+
+    def _create(self, config: FaceMeshConfig):
+        logger.debug(f"검출기 인스턴스 생성 ({LANDMARK_DETECTOR}): {config}")
+        return create_detector(config)
+
+    def _queue_for(self, config: FaceMeshConfig) -> Queue:
+        with self._lock:
+            if config not in self._idle:
+                self._idle[config] = Queue()
+                self._created[config] = 0
+            return self._idle[config]
+
+    def acquire(self, config: FaceMeshConfig = DEFAULT_CONFIG, timeout: float | None = None):
+        """
+        인스턴스를 빌려옵니다. 요청 단위 사용은 checkout()을 쓰고,
+        스트림 세션처럼 여러 요청에 걸쳐 붙잡아 둘 때만 acquire()/release()를 직접 호출합니다.
+        - timeout: 반납 대기 시간(초), None이면 풀 기본값
+        """
+        idle = self._queue_for(config)
+        try:
+            return idle.get_nowait()
+        except Empty:
+            pass
+
+        # 한도 내라면 새 인스턴스 생성, 아니면 반납 대기
+        with self._lock:
+            can_create = self._created[config] < self.max_size
+            if can_create:
+                self._created[config] += 1
+        if can_create:
+            try:
+                return self._create(config)
+            except Exception:
+                with self._lock:
+                    self._created[config] -= 1
+                raise
+
+        try:
+            return idle.get(timeout=self.timeout if timeout is None else timeout)
+        except Empty:
+            raise TimeoutError("FaceMesh pool exhausted") from None
+
+    def release(self, config: FaceMeshConfig, face_mesh, broken: bool = False):
+        if broken:
+            # 예외로 상태가 불확실한 인스턴스는 폐기
+            face_mesh.close()
+            with self._lock:
+                self._created[config] -= 1
+            return
+        if not config.static_image_mode:
+            # 추적 모드 인스턴스는 이전 세션의 추적 상태를 지우고 반납
+            face_mesh.reset()
+        self._idle[config].put(face_mesh)
+
+    @contextmanager
+    def checkout(self, config: FaceMeshConfig = DEFAULT_CONFIG):
+        face_mesh = self.acquire(config)
+        broken = False
+        try:
+            yield face_mesh
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(config, face_mesh, broken)
+
+    def warm_up(self, config: FaceMeshConfig = DEFAULT_CONFIG, count: int | None = None):
+        """서버 시작 시 지정 개수만큼 인스턴스를 미리 생성해 풀에 넣어 둡니다."""
+        count = self.max_size if count is None else min(count, self.max_size)
+        idle = self._queue_for(config)
+        created = 0
+        while True:
+            with self._lock:
+                if self._created[config] >= count:
+                    break
+                self._created[config] += 1
+            try:
+                face_mesh = self._create(config)
+            except Exception:
+                with self._lock:
+                    self._created[config] -= 1
+                raise
+            idle.put(face_mesh)
+            created += 1
+        logger.info(f"FaceMesh 풀 예열 완료: {config} ({created}개 생성)")
+
+    def close(self):
+        with self._lock:
+            for config, idle in self._idle.items():
+                while True:
+                    try:
+                        idle.get_nowait().close()
+                    except Empty:
+                        break
+                    self._created[config] -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                str(tuple(config)): {
+                    "created": self._created[config],
+                    "idle": self._idle[config].qsize(),
+                }
+                for config in self._idle
+            }
+
+
+# 프로세스 전역 풀
+face_mesh_pool = FaceMeshPool()
@@ -1,7 +1,8 @@
 import os
 from PIL import Image, ImageOps
-from skimage.metrics import structural_similarity as ssim
 import numpy as np
+from utils.face_utils import Landmarks, as_landmark_array
+from analyzer.ssim import ssim, ssim_pairs
 
 # === 얼굴 부위별 랜드마크 인덱스 ===
 FACE_PARTS = {
@@ -27,13 +28,20 @@ PADDING_RATIO_MAP = {
     "right_chin": {'top': 0.12, 'bottom': 0.02, 'left': 0.00, 'right': 0.10},
 }
 
-# 영역별 자르기 함수
-def devide_region(image_pil: Image.Image, landmarks: list[tuple], indices: list[int], padding_ratio: dict) -> Image.Image:
-    points = [landmarks[i] for i in indices if 0 <= i < len(landmarks)]
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
+# 좌우 절반으로 나눠 비교하는 부위
+SPLIT_PARTS = ("nose", "mouth")
+
+# 부위별 인덱스 배열 (요청마다 리스트를 다시 만들지 않도록 미리 변환)
+_FACE_PART_INDEX_ARRAYS = {
+    part_name: np.asarray(indices, dtype=np.intp) for part_name, indices in FACE_PARTS.items()
+}
 
-    width, height = image_pil.size
+# 부위 크롭 영역 (min_x, min_y, max_x, max_y) 계산
+def _region_box(landmarks: Landmarks, indices, padding_ratio: dict, size: tuple[int, int]) -> tuple[int, int, int, int]:
+    indices = np.asarray(indices, dtype=np.intp)
+    points = landmarks[indices[(indices >= 0) & (indices < len(landmarks))]]
+
+    width, height = size
 
     # 비율 기반 padding 계산
     top = int(padding_ratio.get('top', 0.02) * height)
@@ -41,24 +49,79 @@ def devide_region(image_pil: Image.Image, landmarks: list[tuple], indices: list[
     left = int(padding_ratio.get('left', 0.02) * width)
     right = int(padding_ratio.get('right', 0.02) * width)
 
-    min_x = max(min(xs) - left, 0)
-    max_x = min(max(xs) + right, width)
-    min_y = max(min(ys) - top, 0)
-    max_y = min(max(ys) + bottom, height)
+    # 실수 좌표는 바깥쪽으로 반올림하여 부위가 잘리지 않도록 함
+    (min_px, min_py), (max_px, max_py) = points.min(axis=0), points.max(axis=0)
+    min_x = max(int(np.floor(min_px)) - left, 0)
+    max_x = min(int(np.ceil(max_px)) + right, width)
+    min_y = max(int(np.floor(min_py)) - top, 0)
+    max_y = min(int(np.ceil(max_py)) + bottom, height)
+    return min_x, min_y, max_x, max_y
 
-    return image_pil.crop((min_x, min_y, max_x, max_y))
+# 영역별 자르기 함수
+def devide_region(image_pil: Image.Image, landmarks: Landmarks, indices, padding_ratio: dict) -> Image.Image:
+    landmarks = as_landmark_array(landmarks)
+    return image_pil.crop(_region_box(landmarks, indices, padding_ratio, image_pil.size))
 
 # 얼굴 부위별 검출
-def get_face_parts(landmarks: list[tuple], image_pil: Image.Image) -> dict[str, Image.Image]:
+def get_face_parts(landmarks: Landmarks, image_pil: Image.Image) -> dict[str, Image.Image]:
+    landmarks = as_landmark_array(landmarks)
     parts = {}
-    for part_name, indices in FACE_PARTS.items():
+    for part_name, indices in _FACE_PART_INDEX_ARRAYS.items():
         padding_ratio = PADDING_RATIO_MAP.get(part_name, {})
         cropped = devide_region(image_pil, landmarks, indices, padding_ratio)
         parts[part_name] = cropped
     return parts
 
-# === 기본 SSIM 비교 함수 (좌우 반전 포함, 이미지 객체 사용) ===
-def compare_ssim_flipped_images(img1: Image.Image, img2: Image.Image) -> float:
+# === ndarray 크롭 경로 (그레이스케일 1회 변환 + 슬라이스 뷰) ===
+def get_face_part_boxes(landmarks: Landmarks, size: tuple[int, int]) -> dict[str, tuple[int, int, int, int]]:
+    """부위별 크롭 영역만 계산합니다. 코/입은 좌우 절반 영역도 함께 반환합니다."""
+    landmarks = as_landmark_array(landmarks)
+    boxes = {}
+    for part_name, indices in _FACE_PART_INDEX_ARRAYS.items():
+        box = _region_box(landmarks, indices, PADDING_RATIO_MAP.get(part_name, {}), size)
+        if part_name in SPLIT_PARTS:
+            min_x, min_y, max_x, max_y = box
+            mid = min_x + (max_x - min_x) // 2
+            boxes[f"left_{part_name}"] = (min_x, min_y, mid, max_y)
+            boxes[f"right_{part_name}"] = (mid, min_y, max_x, max_y)
+        else:
+            boxes[part_name] = box
+    return boxes
+
+def rgb_to_gray(image_rgb: np.ndarray) -> np.ndarray:
+    """PIL convert("L")과 같은 정수 가중치(ITU-R 601-2)로 그레이스케일 변환합니다."""
+    rgb = image_rgb.astype(np.uint32)
+    gray = rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471 + 0x8000
+    return (gray >> 16).astype(np.uint8)
+
+def get_gray_part_views(image_rgb: np.ndarray, boxes: dict[str, tuple[int, int, int, int]]) -> dict[str, np.ndarray]:
+    """
+    부위 영역을 모두 덮는 범위만 한 번 그레이스케일로 변환한 뒤,
+    각 부위는 복사 없이 슬라이스 뷰로 반환합니다.
+    """
+    if not boxes:
+        return {}
+    x0 = min(box[0] for box in boxes.values())
+    y0 = min(box[1] for box in boxes.values())
+    x1 = max(box[2] for box in boxes.values())
+    y1 = max(box[3] for box in boxes.values())
+    gray = rgb_to_gray(image_rgb[y0:y1, x0:x1])
+    return {
+        name: gray[top - y0:bottom - y0, left - x0:right - x0]
+        for name, (left, top, right, bottom) in boxes.items()
+    }
+
+def crop_part_images(image_rgb: np.ndarray, boxes: dict[str, tuple[int, int, int, int]], names=None) -> dict[str, Image.Image]:
+    """응답으로 내보낼 부위만 PIL 이미지로 만듭니다."""
+    names = boxes.keys() if names is None else names
+    return {
+        name: Image.fromarray(image_rgb[top:bottom, left:right])
+        for name in names
+        for (left, top, right, bottom) in (boxes[name],)
+    }
+
+# === SSIM 입력 준비 (좌우 반전 + 크기 맞추기 → 그레이스케일 배열) ===
+def _flipped_pair(img1: Image.Image, img2: Image.Image) -> tuple[np.ndarray, np.ndarray]:
     img1 = img1.convert("L")
     img2 = img2.convert("L")
 
@@ -69,13 +132,9 @@ def compare_ssim_flipped_images(img1: Image.Image, img2: Image.Image) -> float:
     if img1.size != img2.size:
         img2 = img2.resize(img1.size)
 
-    arr1 = np.array(img1)
-    arr2 = np.array(img2)
-
-    score, _ = ssim(arr1, arr2, full=True)
-    return round(score * 100, 2)
+    return np.array(img1), np.array(img2)
 
-def compare_split_match(image: Image.Image) -> tuple[float, Image.Image, Image.Image]:
+def _split_pair(image: Image.Image) -> tuple[np.ndarray, np.ndarray, Image.Image, Image.Image]:
     width, height = image.size
     mid = width // 2
 
@@ -90,11 +149,60 @@ def compare_split_match(image: Image.Image) -> tuple[float, Image.Image, Image.I
     if left_half.size != right_half_flipped.size:
         right_half_flipped = right_half_flipped.resize(left_half.size)
 
-    # SSIM 계산
     arr1 = np.array(left_half.convert("L"))
     arr2 = np.array(right_half_flipped.convert("L"))
-    score, _ = ssim(arr1, arr2, full=True)
+    return arr1, arr2, left_half, right_half
+
+def _match_shape(arr1: np.ndarray, arr2: np.ndarray) -> np.ndarray:
+    # 크기가 다를 때만 arr2를 arr1 크기로 리사이즈 (PIL 기본 보간과 동일)
+    if arr1.shape == arr2.shape:
+        return arr2
+    h, w = arr1.shape
+    return np.array(Image.fromarray(np.ascontiguousarray(arr2)).resize((w, h)))
+
+def compare_match_parts_from_arrays(gray_parts: dict[str, np.ndarray]) -> dict[str, float | None]:
+    """
+    그레이스케일 부위 뷰로 일치율을 계산합니다. (get_gray_part_views 결과 사용)
+    - 좌우 반전은 음수 stride 뷰로 처리하여 복사 없음
+    - 코/입은 left_/right_ 절반 영역을 비교
+    """
+    pairs: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    for name, left_key, right_key in (
+        ("eyes", "left_eye", "right_eye"),
+        ("ears", "left_ear", "right_ear"),
+        ("nose", "left_nose", "right_nose"),
+        ("mouth", "left_mouth", "right_mouth"),
+        ("chin", "left_chin", "right_chin"),
+    ):
+        if left_key not in gray_parts or right_key not in gray_parts:
+            continue
+        left, right = gray_parts[left_key], gray_parts[right_key]
+        if name in SPLIT_PARTS:
+            # 오른쪽 절반을 반전하여 왼쪽 절반과 비교
+            arr1, arr2 = left, right[:, ::-1]
+        else:
+            # 왼쪽 부위를 반전하여 오른쪽 부위와 비교
+            arr1, arr2 = left[:, ::-1], right
+        pairs[name] = (arr1, _match_shape(arr1, arr2))
+
+    scores = dict(zip(pairs, ssim_pairs(list(pairs.values()))))
+
+    results: dict[str, float | None] = {}
+    for name in ("eyes", "ears", "nose", "mouth", "chin"):
+        if name in scores:
+            results[name] = round(scores[name] * 100, 2)
+        elif name not in SPLIT_PARTS:
+            results[name] = None
+    return results
 
+# === 기본 SSIM 비교 함수 (좌우 반전 포함, 이미지 객체 사용) ===
+def compare_ssim_flipped_images(img1: Image.Image, img2: Image.Image) -> float:
+    score = ssim(*_flipped_pair(img1, img2))
+    return round(score * 100, 2)
+
+def compare_split_match(image: Image.Image) -> tuple[float, Image.Image, Image.Image]:
+    arr1, arr2, left_half, right_half = _split_pair(image)
+    score = ssim(arr1, arr2)
     return round(score * 100, 2), left_half, right_half
 
 # 가중치에 따른 평균 도출
@@ -108,37 +216,33 @@ def weighted_average(score_dict, weights):
                 total_weight += weight
         return round(total_weighted_score / total_weight, 2) if total_weight else None
 
-# 일치율 계산 함수
+# 일치율 계산 함수 (모든 부위 쌍을 모아 SSIM 한 번에 계산)
 def compare_match_parts_from_images(parts: dict[str, Image.Image]) -> dict[str, float | None]:
-    results: dict[str, float | None] = {}
+    pairs: dict[str, tuple[np.ndarray, np.ndarray]] = {}
 
-    results["eyes"] = (
-        compare_ssim_flipped_images(parts["left_eye"], parts["right_eye"])
-        if "left_eye" in parts and "right_eye" in parts else None
-    )
-
-    results["ears"] = (
-        compare_ssim_flipped_images(parts["left_ear"], parts["right_ear"])
-        if "left_ear" in parts and "right_ear" in parts else None
-    )
-
-    if "nose" in parts:
-        score, left_nose, right_nose = compare_split_match(parts["nose"])
-        results["nose"] = score
-        parts["left_nose"] = left_nose
-        parts["right_nose"] = right_nose
-        del parts["nose"]  # 원본 nose 이미지 삭제
-
-    if "mouth" in parts:
-        score, left_mouth, right_mouth = compare_split_match(parts["mouth"])
-        results["mouth"] = score
-        parts["left_mouth"] = left_mouth
-        parts["right_mouth"] = right_mouth
-        del parts["mouth"]  # 원본 mouth 이미지 삭제
-
-    results["chin"] = (
-        compare_ssim_flipped_images(parts["left_chin"], parts["right_chin"])
-        if "left_chin" in parts and "right_chin" in parts else None
-    )
-
-    return results
\ No newline at end of file
+    if "left_eye" in parts and "right_eye" in parts:
+        pairs["eyes"] = _flipped_pair(parts["left_eye"], parts["right_eye"])
+
+    if "left_ear" in parts and "right_ear" in parts:
+        pairs["ears"] = _flipped_pair(parts["left_ear"], parts["right_ear"])
+
+    for name in SPLIT_PARTS:
+        if name in parts:
+            arr1, arr2, left_half, right_half = _split_pair(parts[name])
+            pairs[name] = (arr1, arr2)
+            parts[f"left_{name}"] = left_half
+            parts[f"right_{name}"] = right_half
+            del parts[name]  # 원본 이미지 삭제
+
+    if "left_chin" in parts and "right_chin" in parts:
+        pairs["chin"] = _flipped_pair(parts["left_chin"], parts["right_chin"])
+
+    scores = dict(zip(pairs, ssim_pairs(list(pairs.values()))))
+
+    results: dict[str, float | None] = {}
+    for name in ("eyes", "ears", "nose", "mouth", "chin"):
+        if name in scores:
+            results[name] = round(scores[name] * 100, 2)
+        elif name not in SPLIT_PARTS:
+            results[name] = None
+    return results
@@ -0,0 +1,152 @@
+# analyzer/jobs.py
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from logger import logger
+from utils.job_store import DONE, FAILED, QUEUED, RUNNING, JobStore, create_job_store
+from utils.metrics import JOBS, JOBS_PENDING
+
+# 작업 실행 스레드 수
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+# 대기·실행 중 작업 최대 수 (넘으면 제출 거절)
+JOB_MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", "64"))
+# 완료 후 결과 보관 시간(초)
+JOB_TTL = float(os.environ.get("JOB_TTL", "3600"))
+# 만료 작업 정리 최소 간격(초)
+JOB_PURGE_INTERVAL = float(os.environ.get("JOB_PURGE_INTERVAL", "60"))
+
+
+class JobQueueFull(Exception):
+    """대기 중 작업이 JOB_MAX_PENDING개를 넘어 새 작업을 받을 수 없을 때 발생합니다."""
+
+
+class JobFailed(Exception):
+    """작업 함수가 요청 자체의 문제(얼굴 미검출 등)로 실패를 알릴 때 사용합니다."""
+
+
+class JobManager:
+    """
+    분석 작업을 제출받아 스레드 풀에서 실행하고, 상태·결과를 저장소에 기록합니다.
+    - 작업 함수는 (결과 dict, 이미지 이름 → 바이트, MIME 타입)을 반환
+    - 결과 이미지는 레코드와 따로 저장하여 상태 조회 응답을 작게 유지
+    - 완료 후 ttl초가 지난 작업은 다음 호출 시 정리 (최소 JOB_PURGE_INTERVAL 간격)
+    """
+
+    def __init__(self, store: JobStore | None = None, workers: int = JOB_WORKERS,
+                 max_pending: int = JOB_MAX_PENDING, ttl: float = JOB_TTL):
+        self.store = store or create_job_store()
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._futures = {}
+        self._last_purge = 0.0
+
+        interrupted = self.store.fail_unfinished("Interrupted by server restart")
+        if interrupted:
+            logger.warning(f"재시작으로 중단된 작업 {interrupted}개를 실패로 표시")
+
+    def _purge(self):
+        now = time.time()
+        with self._lock:
+            if now - self._last_purge < JOB_PURGE_INTERVAL:
+                return
+            self._last_purge = now
+        purged = self.store.purge_expired(now)
+        if purged:
+            logger.info(f"만료된 작업 {purged}개 정리")
+
+    def submit(self, func, *args, kind: str = "analyze") -> dict:
+        """작업을 등록하고 바로 반환합니다. 대기 작업이 가득 차면 JobQueueFull이 발생합니다."""
+        self._purge()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull("Too many pending jobs")
+            self._pending += 1
+        JOBS_PENDING.inc()
+
+        now = time.time()
+        job = {"id": uuid.uuid4().hex, "kind": kind, "status": QUEUED, "created_at": now, "expires_at": now + self.ttl}
+        self.store.create(job)
+        future = self._executor.submit(self._run, job["id"], func, args)
+        with self._lock:
+            # 등록 전에 이미 끝난 작업은 보관하지 않음
+            if not future.done():
+                self._futures[job["id"]] = future
+        logger.info(f"작업 등록: {job['id']} ({kind})")
+        return job
+
+    def _run(self, job_id: str, func, args):
+        self.store.update(job_id, status=RUNNING, started_at=time.time())
+        status, fields = FAILED, {}
+        try:
+            result, images, mime_type = func(*args)
+            # 실행 중 삭제된 작업의 이미지는 저장하지 않음 (확인과 저장은 저장소가 원자적으로 처리)
+            if images and not self.store.put_images(job_id, images, mime_type):
+                logger.info(f"삭제된 작업의 결과 이미지 폐기: {job_id}")
+            status, fields = DONE, {"result": result}
+        except JobFailed as e:
+            fields = {"error": str(e)}
+        except Exception as e:
+            logger.exception(f"작업 실행 중 예외 발생: {job_id}")
+            fields = {"error": str(e)}
+        finally:
+            now = time.time()
+            self.store.update(job_id, status=status, finished_at=now, expires_at=now + self.ttl, **fields)
+            with self._lock:
+                self._pending -= 1
+                self._futures.pop(job_id, None)
+            JOBS_PENDING.dec()
+            JOBS.inc(status=status)
+            logger.info(f"작업 종료: {job_id} ({status})")
+
+    def get(self, job_id: str) -> dict | None:
+        self._purge()
+        job = self.store.get(job_id)
+        if job is None or (job["status"] in (DONE, FAILED) and job["expires_at"] <= time.time()):
+            return None
+        return job
+
+    def get_image(self, job_id: str, name: str) -> tuple[bytes, str] | None:
+        if self.get(job_id) is None:
+            return None
+        return self.store.get_image(job_id, name)
+
+    def delete(self, job_id: str) -> bool:
+        """작업을 삭제합니다. 아직 시작하지 않은 작업은 취소하고, 실행 중인 작업은 끝난 뒤 결과만 버려집니다."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            with self._lock:
+                self._pending -= 1
+                self._futures.pop(job_id, None)
+            JOBS_PENDING.dec()
+            JOBS.inc(status="cancelled")
+        return self.store.delete(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._pending
+        return {"pending": pending, "max_pending": self.max_pending, "ttl": self.ttl, "jobs": self.store.count()}
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    프로세스 전역 작업 관리자를 처음 사용할 때 생성합니다.
+    배치 워커 등 spawn 자식 프로세스도 app.py를 다시 import하므로, import 시점에 만들면
+    자식이 부모의 실행 중인 작업을 중단된 것으로 표시해 버립니다 (fail_unfinished).
+    """
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
@@ -0,0 +1,143 @@
+# analyzer/pipeline.py
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from logger import logger
+from utils.admission import check_deadline
+from utils.metrics import stage_timer
+from analyzer.context import AnalysisContext, as_context
+from analyzer.detect_face import locate_landmarks, locate_faces, align_face
+from analyzer.analyze_symmetry import calculate_symmetry, SYMMETRY_3D
+from analyzer.image_devide import (
+    compare_match_parts_from_arrays,
+    crop_part_images,
+    get_face_part_boxes,
+    get_gray_part_views,
+)
+
+# 최종 점수 부위별 가중치
+WEIGHTS = {
+    "eyes": 0.30,
+    "nose": 0.20,
+    "mouth": 0.20,
+    "chin": 0.20,
+    "ears": 0.10
+}
+
+# 여러 얼굴을 동시에 채점할 스레드 수 (OpenCV·NumPy 연산은 GIL을 풀고 실행)
+FACE_WORKERS = int(os.environ.get("FACE_WORKERS", "4"))
+_face_pool = ThreadPoolExecutor(max_workers=FACE_WORKERS, thread_name_prefix="face")
+
+
+def combine_scores(part_scores: dict, match_scores: dict) -> tuple[dict, float]:
+    """
+    부위별 대칭률과 일치율을 합쳐 최종 부위 점수와 가중 평균 점수를 계산합니다.
+    - 턱은 대칭률 없이 일치율만 사용
+    """
+    final_scores = {}
+    weighted_total = 0.0
+    for part, weight in WEIGHTS.items():
+        match = match_scores.get(part, 0)
+        if part == "chin":
+            final = round(match, 2)
+        else:
+            sym = part_scores.get(part, 0)
+            final = round((sym * 0.5 + match * 0.5), 2)
+        final_scores[part] = final
+        weighted_total += final * weight
+
+    return final_scores, round(weighted_total, 2)
+
+
+def score_face(image: bytes | AnalysisContext, align_mode: str | None = None) -> AnalysisContext | None:
+    """
+    검출 → 정렬 → 대칭률 → 부위 크롭 → 일치율 → 최종 점수까지 계산하여
+    결과를 컨텍스트(final_scores, final_score 등)에 담아 반환합니다.
+    얼굴이 감지되지 않으면 None을 반환합니다.
+    """
+    ctx = as_context(image)
+
+    # 이미 검출된 랜드마크가 있으면 재사용 (여러 얼굴 분석 시 얼굴별 컨텍스트)
+    landmarks = ctx.landmarks
+    if landmarks is None:
+        logger.debug("얼굴 랜드마크 추출 시도")
+        with stage_timer("detect"):
+            landmarks = locate_landmarks(ctx)
+        if landmarks is None:
+            return None
+
+    logger.debug(f"랜드마크 수: {len(landmarks)}")
+
+    # 클라이언트가 정렬된 이미지를 보낸 경우 정렬 단계 생략
+    align_landmarks = ctx.aligned_landmarks
+    if align_landmarks is None:
+        # 기한이 지난 요청은 무거운 단계에 들어가기 전에 중단
+        check_deadline("align")
+        with stage_timer("align"):
+            align_landmarks = align_face(ctx, mode=align_mode)
+        if align_landmarks is None:
+            return None
+
+    logger.debug("대칭률 계산 시작")
+    with stage_timer("symmetry"):
+        # 정렬은 화면 안 회전이라 깊이는 그대로 사용
+        depth = ctx.landmarks_depth if SYMMETRY_3D else None
+        symmetry_score, part_scores = calculate_symmetry(align_landmarks, depth)
+    logger.debug(f"총 대칭률 점수: {symmetry_score}")
+    logger.debug(f"부위별 대칭률 점수: {part_scores}")
+
+    logger.debug("일치율 계산 시작")
+    check_deadline("ssim")
+    # 정렬 이미지에서 부위 영역만 그레이스케일 뷰로 잘라 비교 (PIL 이미지는 응답 시에만 생성)
+    with stage_timer("crop"):
+        ctx.part_boxes = get_face_part_boxes(align_landmarks, ctx.size)
+        gray_parts = get_gray_part_views(ctx.aligned_rgb, ctx.part_boxes)
+    with stage_timer("ssim"):
+        match_scores = compare_match_parts_from_arrays(gray_parts)
+    logger.debug(f"부위별 일치율 : {match_scores}")
+
+    final_scores, final_score = combine_scores(part_scores, match_scores)
+    logger.debug(f"일치율 + 대칭률 : {final_scores}")
+    logger.debug(f"최종 대칭 점수 : {final_score}")
+
+    ctx.symmetry_score = symmetry_score
+    ctx.part_scores = part_scores
+    ctx.match_scores = match_scores
+    ctx.final_scores = final_scores
+    ctx.final_score = final_score
+    return ctx
+
+
+def score_faces(image: bytes | AnalysisContext, max_faces: int, align_mode: str | None = None) -> list[AnalysisContext]:
+    """
+    추론 1회로 최대 max_faces개의 얼굴을 검출하고, 얼굴마다 score_face를 병렬로 실행합니다.
+    - 얼굴별 컨텍스트는 원본 이미지 배열을 공유하며 (복사 없음) 왼쪽 → 오른쪽 순으로 반환
+    - 얼굴이 없으면 빈 리스트를 반환합니다.
+    """
+    ctx = as_context(image)
+    with stage_timer("detect"):
+        faces = locate_faces(ctx, max_faces)
+
+    face_contexts = []
+    for points, depth in faces:
+        face_ctx = AnalysisContext(ctx.image_rgb)
+        face_ctx.landmarks, face_ctx.landmarks_depth = points, depth
+        face_contexts.append(face_ctx)
+
+    # 요청 기한·로그 샘플링 상태(contextvars)를 작업 스레드로 전달
+    futures = [
+        _face_pool.submit(contextvars.copy_context().run, score_face, face_ctx, align_mode)
+        for face_ctx in face_contexts
+    ]
+    scored = [future.result() for future in futures]
+    return [face_ctx for face_ctx in scored if face_ctx is not None]
+
+
+def part_images(ctx: AnalysisContext, names=None) -> dict:
+    """score_face 이후, 응답에 포함할 부위만 정렬 이미지에서 잘라 PIL 이미지로 반환합니다."""
+    if ctx.parts is None:
+        with stage_timer("crop"):
+            ctx.parts = crop_part_images(ctx.aligned_rgb, ctx.part_boxes, names)
+    return ctx.parts
@@ -0,0 +1,83 @@
+# analyzer/ssim.py
+
+import numpy as np
+
+from utils.lazy_import import lazy_module
+
+cv2 = lazy_module("cv2")
+
+# skimage.metrics.structural_similarity 기본값과 동일한 설정
+# (7x7 균일 윈도우, 표본 공분산, uint8 데이터 범위 255)
+WIN_SIZE = 7
+K1 = 0.01
+K2 = 0.03
+DATA_RANGE = 255.0
+
+_NP = WIN_SIZE * WIN_SIZE
+_COV_NORM = _NP / (_NP - 1)
+_C1 = (K1 * DATA_RANGE) ** 2
+_C2 = (K2 * DATA_RANGE) ** 2
+_PAD = (WIN_SIZE - 1) // 2
+
+
+def _mean_ssim(img1: np.ndarray, img2: np.ndarray) -> float:
+    if img1.shape != img2.shape:
+        raise ValueError("Input images must have the same dimensions.")
+    if img1.ndim != 2:
+        raise ValueError("Input images must be 2-D grayscale arrays.")
+    if min(img1.shape) < WIN_SIZE:
+        raise ValueError("win_size exceeds image extent.")
+
+    x = img1.astype(np.float64)
+    y = img2.astype(np.float64)
+
+    # 분리형 박스 필터로 윈도우 평균 계산 후, 경계 윈도우는 skimage와 같이 제외
+    h, w = x.shape
+    inner = (slice(_PAD, h - _PAD), slice(_PAD, w - _PAD))
+    ksize = (WIN_SIZE, WIN_SIZE)
+    ux = cv2.boxFilter(x, -1, ksize)[inner]
+    uy = cv2.boxFilter(y, -1, ksize)[inner]
+    uxx = cv2.boxFilter(x * x, -1, ksize)[inner]
+    uyy = cv2.boxFilter(y * y, -1, ksize)[inner]
+    uxy = cv2.boxFilter(x * y, -1, ksize)[inner]
+
+    # 임시 배열을 줄이기 위해 제자리 연산으로 SSIM 식 계산
+    # S = (2·ux·uy + C1)(2·vxy + C2) / ((ux² + uy² + C1)(vx + vy + C2))
+    uxuy = ux * uy
+    ux *= ux
+    uy *= uy
+
+    uxy -= uxuy                      # 2·vxy + C2
+    uxy *= 2 * _COV_NORM
+    uxy += _C2
+
+    uxx += uyy                       # vx + vy + C2
+    uxx -= ux
+    uxx -= uy
+    uxx *= _COV_NORM
+    uxx += _C2
+
+    uxuy *= 2                        # 2·ux·uy + C1
+    uxuy += _C1
+    ux += uy                         # ux² + uy² + C1
+    ux += _C1
+
+    uxuy *= uxy
+    ux *= uxx
+    uxuy /= ux
+    return float(uxuy.mean())
+
+
+def ssim_pairs(pairs: list[tuple[np.ndarray, np.ndarray]]) -> list[float]:
+    """
+    여러 (img1, img2) 그레이스케일 uint8 쌍의 평균 SSIM을 입력 순서대로 계산합니다.
+    - 쌍마다 박스 필터를 적용 (같은 크기 쌍을 채널로 쌓아도 OpenCV 필터 비용은 줄지 않음)
+    - 전체 SSIM 맵은 만들지 않고 평균 점수만 반환
+    - skimage.metrics.structural_similarity(img1, img2)와 부동소수점 오차(1e-12) 이내로 일치
+    """
+    return [_mean_ssim(img1, img2) for img1, img2 in pairs]
+
+
+def ssim(img1: np.ndarray, img2: np.ndarray) -> float:
+    """두 그레이스케일 uint8 이미지의 평균 SSIM을 계산합니다."""
+    return _mean_ssim(img1, img2)
@@ -0,0 +1,327 @@
+# analyzer/stream.py
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+from logger import logger
+from analyzer.analyze_symmetry import calculate_symmetry, SYMMETRY_3D
+from analyzer.context import AnalysisContext
+from analyzer.detect_face import align_face, align_landmarks, locate_landmarks
+from analyzer.face_mesh_pool import face_mesh_pool, DEFAULT_CONFIG
+from analyzer.image_devide import compare_match_parts_from_arrays, get_face_part_boxes, get_gray_part_views
+from analyzer.pipeline import combine_scores
+from analyzer.visualize_result import generate_result_image
+from utils.admission import check_deadline
+from utils.image_utils import EncodeOptions, encode_image_to_base64
+from utils.lazy_import import lazy_module
+from utils.metrics import stage_timer
+
+cv2 = lazy_module("cv2")
+
+# 점수 평활화 계수 (지수 이동 평균, 1이면 평활화 없음)
+STREAM_SMOOTHING = float(os.environ.get("STREAM_SMOOTHING", "0.3"))
+# 일치율(SSIM) / 결과 이미지 계산 빈도 (초당 횟수, 0이면 계산 안 함)
+STREAM_SSIM_FPS = float(os.environ.get("STREAM_SSIM_FPS", "2"))
+STREAM_RENDER_FPS = float(os.environ.get("STREAM_RENDER_FPS", "0"))
+# 마지막 프레임 이후 세션을 유지하는 시간(초)
+STREAM_SESSION_TTL = float(os.environ.get("STREAM_SESSION_TTL", "60"))
+# 세션별로 보관할 최근 프레임 점수 수
+STREAM_SERIES_LIMIT = int(os.environ.get("STREAM_SERIES_LIMIT", "600"))
+# 동영상 파일 분석 시 최대 처리 프레임 수
+VIDEO_MAX_FRAMES = int(os.environ.get("VIDEO_MAX_FRAMES", "3600"))
+
+# 추적 모드 FaceMesh 설정 (첫 프레임만 전체 검출, 이후 이전 프레임 위치로 추적)
+TRACKING_CONFIG = DEFAULT_CONFIG._replace(static_image_mode=False)
+
+
+class SessionClosed(Exception):
+    """이미 종료된 스트림 세션에 프레임이 들어왔을 때 발생합니다."""
+
+
+class _RateGate:
+    """타임스탬프(초) 기준으로 초당 fps회까지만 통과시킵니다. fps가 0이면 항상 막습니다."""
+
+    def __init__(self, fps: float):
+        self.interval = 1.0 / fps if fps > 0 else None
+        self._last = None
+
+    def due(self, timestamp: float) -> bool:
+        if self.interval is None:
+            return False
+        # 부동소수점 오차로 프레임이 건너뛰어지지 않도록 약간의 여유를 둠
+        if self._last is None or timestamp - self._last >= self.interval * 0.999:
+            self._last = timestamp
+            return True
+        return False
+
+
+class StreamSession:
+    """
+    카메라·동영상 프레임을 순서대로 분석하는 세션입니다.
+    - 세션 동안 추적 모드 FaceMesh 1개를 붙잡아 두고 재사용 (프레임마다 전체 검출하지 않음)
+    - 프레임마다 대칭률을 계산하고 부위별 점수를 지수 이동 평균으로 평활화
+    - 일치율(SSIM)과 결과 이미지는 설정한 빈도로만 계산
+    """
+
+    def __init__(
+        self,
+        smoothing: float = STREAM_SMOOTHING,
+        ssim_fps: float = STREAM_SSIM_FPS,
+        render_fps: float = STREAM_RENDER_FPS,
+        encode_options: EncodeOptions | None = None,
+        series_limit: int | None = STREAM_SERIES_LIMIT,
+        acquire_timeout: float | None = None,
+    ):
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        if ssim_fps < 0 or render_fps < 0:
+            raise ValueError("ssim_fps and render_fps must not be negative")
+
+        self.id = uuid.uuid4().hex
+        self.smoothing = smoothing
+        self.ssim_fps = ssim_fps
+        self.render_fps = render_fps
+        self.encode_options = encode_options or EncodeOptions()
+
+        self._face_mesh = face_mesh_pool.acquire(TRACKING_CONFIG, timeout=acquire_timeout)
+        self._broken = False
+        self._lock = threading.Lock()
+        self._ssim_gate = _RateGate(ssim_fps)
+        self._render_gate = _RateGate(render_fps)
+
+        self.created_at = self.last_seen = time.monotonic()
+        self.closed = False
+        self.frame_count = 0
+        self.face_frames = 0
+        self.smoothed = None
+        self.match_scores = None
+        self.series = deque(maxlen=series_limit)
+
+    def settings(self) -> dict:
+        return {
+            "smoothing": self.smoothing,
+            "ssim_fps": self.ssim_fps,
+            "render_fps": self.render_fps,
+            "image_format": self.encode_options.fmt,
+        }
+
+    def _smooth(self, scores: dict) -> dict:
+        if self.smoothed is None:
+            self.smoothed = dict(scores)
+        else:
+            a = self.smoothing
+            self.smoothed = {
+                name: round(a * value + (1 - a) * self.smoothed.get(name, value), 2)
+                for name, value in scores.items()
+            }
+        return self.smoothed
+
+    def process_frame(self, image_rgb: np.ndarray, timestamp: float | None = None) -> dict:
+        """
+        프레임 1장을 분석하고 결과를 반환합니다.
+        - timestamp: 프레임 시각(초). 생략하면 세션 시작 이후 경과 시간 사용
+        - 이미 종료된 세션이면 SessionClosed 발생
+        """
+        with self._lock:
+            if self.closed:
+                raise SessionClosed("Stream session is closed")
+
+            self.last_seen = time.monotonic()
+            if timestamp is None:
+                timestamp = self.last_seen - self.created_at
+            index = self.frame_count
+            self.frame_count += 1
+
+            try:
+                return self._process(index, image_rgb, timestamp)
+            except Exception:
+                # 추적 상태가 불확실해진 인스턴스는 세션 종료 시 폐기
+                self._broken = True
+                raise
+
+    def _process(self, index: int, image_rgb: np.ndarray, timestamp: float) -> dict:
+        ctx = AnalysisContext(image_rgb)
+        with stage_timer("detect"):
+            points = locate_landmarks(ctx, face_mesh=self._face_mesh)
+
+        entry = {"frame": index, "timestamp": round(timestamp, 3), "face": points is not None}
+        if points is None:
+            # 얼굴이 없는 프레임은 평활화 값을 그대로 유지
+            entry.update(symmetry_score=None, smoothed=self.smoothed)
+            self.series.append(entry)
+            return {**entry, "part_scores": None, "match_scores": None,
+                    "final_scores": None, "final_score": None, "result_image": None}
+
+        self.face_frames += 1
+        match_scores = None
+        if self._ssim_gate.due(timestamp):
+            # 일치율 계산 프레임: 부위 영역만 회전하여 SSIM 비교
+            aligned = align_face(ctx, mode="analytic")
+            with stage_timer("ssim"):
+                boxes = get_face_part_boxes(aligned, ctx.size)
+                match_scores = compare_match_parts_from_arrays(get_gray_part_views(ctx.aligned_rgb, boxes))
+            self.match_scores = match_scores
+        else:
+            # 그 외 프레임: 이미지 처리 없이 랜드마크만 정렬
+            aligned = align_landmarks(points, ctx.size)
+
+        with stage_timer("symmetry"):
+            symmetry_score, part_scores = calculate_symmetry(aligned, ctx.landmarks_depth if SYMMETRY_3D else None)
+        smoothed = self._smooth({"total": symmetry_score, **part_scores})
+        entry.update(symmetry_score=symmetry_score, smoothed=smoothed)
+        self.series.append(entry)
+
+        # 최근 일치율과 평활화된 대칭률로 최종 점수 계산
+        final_scores = final_score = None
+        if self.match_scores is not None:
+            final_scores, final_score = combine_scores(smoothed, self.match_scores)
+
+        result_image = None
+        if self._render_gate.due(timestamp):
+            score = final_score if final_score is not None else smoothed["total"]
+            with stage_timer("render"):
+                image, _ = generate_result_image(ctx.image_rgb, points, score, final_scores or smoothed)
+            with stage_timer("encode"):
+                result_image = encode_image_to_base64(image, self.encode_options)
+
+        return {
+            **entry,
+            "part_scores": part_scores,
+            "match_scores": match_scores,
+            "final_scores": final_scores,
+            "final_score": final_score,
+            "result_image": result_image,
+        }
+
+    def summary(self) -> dict:
+        with self._lock:
+            final_scores = final_score = None
+            if self.smoothed is not None and self.match_scores is not None:
+                final_scores, final_score = combine_scores(self.smoothed, self.match_scores)
+            return {
+                "session_id": self.id,
+                "settings": self.settings(),
+                "frames": self.frame_count,
+                "face_frames": self.face_frames,
+                "smoothed": self.smoothed,
+                "final_scores": final_scores,
+                "final_score": final_score,
+                "series": list(self.series),
+            }
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            face_mesh_pool.release(TRACKING_CONFIG, self._face_mesh, broken=self._broken)
+            self._face_mesh = None
+
+
+class StreamSessionManager:
+    """
+    열린 스트림 세션을 보관합니다.
+    - 동시 세션 수는 추적 모드 FaceMesh 풀 크기(FACE_MESH_POOL_SIZE)로 제한
+    - 마지막 프레임 이후 ttl초가 지난 세션은 다음 호출 시 정리
+    """
+
+    def __init__(self, ttl: float = STREAM_SESSION_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions: dict[str, StreamSession] = {}
+
+    def _reap(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [s for s in self._sessions.values() if now - s.last_seen > self.ttl]
+            for session in expired:
+                del self._sessions[session.id]
+        for session in expired:
+            logger.info(f"유휴 스트림 세션 종료: {session.id}")
+            session.close()
+
+    def create(self, **options) -> StreamSession:
+        """새 세션을 엽니다. 사용 가능한 추적 인스턴스가 없으면 TimeoutError가 발생합니다."""
+        self._reap()
+        session = StreamSession(acquire_timeout=0, **options)
+        with self._lock:
+            self._sessions[session.id] = session
+        logger.info(f"스트림 세션 시작: {session.id}")
+        return session
+
+    def get(self, session_id: str) -> StreamSession | None:
+        self._reap()
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def close(self, session_id: str) -> dict | None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return None
+        summary = session.summary()
+        session.close()
+        logger.info(f"스트림 세션 종료: {session_id} (프레임 {summary['frames']}개)")
+        return summary
+
+    def close_all(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+def analyze_video(
+    path: str,
+    smoothing: float = STREAM_SMOOTHING,
+    ssim_fps: float = STREAM_SSIM_FPS,
+    sample_fps: float = 0,
+    max_frames: int = VIDEO_MAX_FRAMES,
+) -> dict:
+    """
+    동영상 파일을 프레임 단위로 분석하여 평활화된 점수 시계열을 반환합니다.
+    - sample_fps: 초당 분석할 프레임 수 (0이면 모든 프레임)
+    - 결과 이미지는 만들지 않습니다.
+    - 요청 기한이 지나면 프레임 사이에서 DeadlineExceeded로 중단합니다.
+    """
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError("Invalid video data")
+
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    sample_gate = _RateGate(sample_fps) if sample_fps > 0 else None
+    session = StreamSession(smoothing=smoothing, ssim_fps=ssim_fps, render_fps=0, series_limit=None)
+    try:
+        index = 0
+        while session.frame_count < max_frames:
+            ok, frame_bgr = capture.read()
+            if not ok:
+                break
+            timestamp = index / fps
+            index += 1
+            if sample_gate is not None and not sample_gate.due(timestamp):
+                continue
+            check_deadline("video frame")
+            session.process_frame(cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=frame_bgr), timestamp)
+        summary = session.summary()
+    finally:
+        capture.release()
+        session.close()
+
+    del summary["session_id"]
+    summary.update(fps=round(fps, 3), duration=round(index / fps, 3), truncated=session.frame_count >= max_frames)
+    return summary
+
+
+# 프로세스 전역 스트림 세션 목록
+stream_sessions = StreamSessionManager()
@@ -1,21 +1,14 @@
-import os
-import requests
 import math
-from datetime import datetime
+from functools import lru_cache
+import numpy as np
 from math import hypot
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFont
 from logger import logger
-from utils.face_utils import estimate_position
-
-# 폰트 경로 설정 (고정 크기)
-FONT_URL = "https://github.com/googlefonts/noto-cjk/raw/main/Sans/OTF/Korean/NotoSansKR-Regular.ttf"
-FONT_PATH = os.path.join("fonts", "NotoSansKR-Regular.ttf")
-if not os.path.exists(FONT_PATH):
-    os.makedirs(os.path.dirname(FONT_PATH), exist_ok=True)
-    resp = requests.get(FONT_URL)
-    with open(FONT_PATH, "wb") as f:
-        f.write(resp.content)
-    logger.info("폰트 다운로드 완료: NotoSansKR-Regular.ttf")
+from utils.face_utils import Landmarks, as_landmark_array
+from utils.font_utils import load_font
+from utils.lazy_import import lazy_module
+
+cv2 = lazy_module("cv2")
 
 def draw_dotted_line(draw, start, end, color="blue", width=2, dash_length=10):
     total = hypot(end[0] - start[0], end[1] - start[1])
@@ -41,23 +34,27 @@ def project_point_to_line(px, py, pt1, pt2):
     t = (ux*vx + uy*vy) / denom
     return (pt1[0] + t*ux, pt1[1] + t*uy)
 
-def crop_to_face_center_with_zoom(
-    image: Image.Image,
-    landmarks,
+def _face_crop_geometry(
+    size: tuple[int, int],
+    landmarks: Landmarks,
     h_ratio: float = 0.5,
     v_ratio: float = 4/5,
     min_face_occupancy: float = 0.6
 ):
-    orig_w, orig_h = image.size
+    """
+    얼굴 중심 4:5 크롭에 필요한 확대율과 크롭 영역을 계산합니다.
+    반환값: (scale, left, top, crop_w, crop_h) — 좌표는 확대된 이미지 기준
+    """
+    orig_w, orig_h = size
 
     # 얼굴 가로 중심 (귀끝 중간)
-    lx, _ = landmarks[234]
-    rx, _ = landmarks[454]
+    lx = float(landmarks[234, 0])
+    rx = float(landmarks[454, 0])
     face_cx = (lx + rx) / 2
 
     # 얼굴 세로 중심 및 높이 (머리·턱 중간)
-    _, ty = landmarks[10]
-    _, by = landmarks[152]
+    ty = float(landmarks[10, 1])
+    by = float(landmarks[152, 1])
     face_cy = (ty + by) / 2
     face_h = by - ty
 
@@ -86,10 +83,7 @@ def crop_to_face_center_with_zoom(
     scale = max(1.0, *needed)
     scale = min(scale, 1.25)  # 최대 1.25배 확대 제한
 
-    # 이미지 및 랜드마크 확대
     new_w, new_h = int(orig_w * scale), int(orig_h * scale)
-    image = image.resize((new_w, new_h), Image.LANCZOS)
-    landmarks = [(x * scale, y * scale) for x, y in landmarks]
     face_cx *= scale
     face_cy *= scale
 
@@ -98,120 +92,235 @@ def crop_to_face_center_with_zoom(
 
     left = max(0, min(int(face_cx - crop_w * h_ratio), new_w - crop_w))
     top  = max(0, min(int(face_cy - crop_h * v_ratio), new_h - crop_h))
+    return scale, left, top, crop_w, crop_h
 
-    cropped = image.crop((left, top, left + crop_w, top + crop_h))
-    new_landmarks = [(x - left, y - top) for x, y in landmarks]
-    return cropped, new_landmarks
-
-def generate_result_image(image: Image.Image, landmarks, score, part_scores):
-    logger.debug("결과 이미지 시각화 시작")
-
-    # 1) 얼굴 4:5 비율 확대 & 크롭
-    image, landmarks = crop_to_face_center_with_zoom(
-        image, landmarks,
-        h_ratio=0.5,
-        v_ratio=6/9,
-        min_face_occupancy=0.5
+def crop_to_face_center_with_zoom(
+    image: Image.Image,
+    landmarks: Landmarks,
+    h_ratio: float = 0.5,
+    v_ratio: float = 4/5,
+    min_face_occupancy: float = 0.6
+):
+    landmarks = as_landmark_array(landmarks)
+    scale, left, top, crop_w, crop_h = _face_crop_geometry(
+        image.size, landmarks, h_ratio, v_ratio, min_face_occupancy
     )
 
-    # 2) 고정 해상도 리사이즈
-    STANDARD_W, STANDARD_H = 800, 1000
-    scale_img = STANDARD_W / image.width
-    image = image.resize((STANDARD_W, STANDARD_H), Image.LANCZOS)
-    landmarks = [(x * scale_img, y * scale_img) for x, y in landmarks]
+    # 이미지 및 랜드마크 확대
+    orig_w, orig_h = image.size
+    new_w, new_h = int(orig_w * scale), int(orig_h * scale)
+    image = image.resize((new_w, new_h), Image.LANCZOS)
 
-    # 3) 해상도 기반 폰트 크기 동적 조절
-    scale_factor = image.width / 800
-    title_size = int(40 * scale_factor)
-    message_size = int(34 * scale_factor)
-    label_size = int(24 * scale_factor)
-    face_size = int(15 * scale_factor)
-
-    # 4) 폰트 설정
-    font_title = ImageFont.truetype(FONT_PATH, title_size)
-    font_message = ImageFont.truetype(FONT_PATH, message_size)
-    font_label = ImageFont.truetype(FONT_PATH, label_size)
-    font_face = ImageFont.truetype(FONT_PATH, int(face_size * 1.5))
-
-    # 5) RGBA 모드
-    if image.mode != 'RGBA':
-        image = image.convert('RGBA')
-    w, h = image.size
+    cropped = image.crop((left, top, left + crop_w, top + crop_h))
+    new_landmarks = landmarks * np.float32(scale) - np.array([left, top], dtype=np.float32)
+    return cropped, new_landmarks
 
-    # 6) 눈 좌표로 얼굴 대칭축(수직선) 벡터 계산
-    x1, y1 = landmarks[33]   # 왼쪽 눈 외곽
-    x2, y2 = landmarks[263]  # 오른쪽 눈 외곽
+# 결과 이미지 고정 해상도 및 얼굴 배치 비율
+STANDARD_W, STANDARD_H = 800, 1000
+RESULT_CROP_OPTIONS = dict(h_ratio=0.5, v_ratio=6/9, min_face_occupancy=0.5)
+
+# 거리 시각화 대상 (랜드마크 인덱스, 색상, 이름)
+DISTANCE_HIGHLIGHTS = [
+    (61,  'blue', 'left_mouth'), (291, 'blue', 'right_mouth'),
+    (133, 'blue', 'left_eye'),   (362, 'blue', 'right_eye'),
+    (234, 'cyan', 'left_ear'),   (454, 'cyan', 'right_ear'),
+    (98,  'red', 'left_nose'),   (327, 'red', 'right_nose'),
+    (172, 'red', 'left_chin'),   (397, 'red', 'right_chin'),
+]
+
+def result_transform(size: tuple[int, int], landmarks: Landmarks):
+    """
+    확대 → 4:5 크롭 → 800x1000 리사이즈를 하나의 축 정렬 아핀 변환으로 합칩니다.
+    반환값: (원본 기준 샘플링 영역 (x0, y0, x1, y1), 원본 → 결과 좌표 2x3 행렬)
+    - 영역은 원본 픽셀 경계로 맞추므로 이미지와 랜드마크가 같은 행렬을 따릅니다.
+    """
+    orig_w, orig_h = size
+    scale, left, top, crop_w, crop_h = _face_crop_geometry(size, landmarks, **RESULT_CROP_OPTIONS)
+
+    # 확대 이미지 기준 크롭 영역을 원본 좌표로 되돌림
+    x0 = int(left / scale)
+    y0 = int(top / scale)
+    x1 = min(orig_w, max(x0 + 1, round((left + crop_w) / scale)))
+    y1 = min(orig_h, max(y0 + 1, round((top + crop_h) / scale)))
+
+    sx = STANDARD_W / (x1 - x0)
+    sy = STANDARD_H / (y1 - y0)
+    matrix = np.array([[sx, 0, -x0 * sx], [0, sy, -y0 * sy]], dtype=np.float32)
+    return (x0, y0, x1, y1), matrix
+
+def standardize_landmarks(size: tuple[int, int], landmarks: Landmarks) -> Landmarks:
+    """결과 이미지(800x1000) 좌표계로 랜드마크만 변환합니다. (이미지 처리 없음)"""
+    landmarks = as_landmark_array(landmarks)
+    _, matrix = result_transform(size, landmarks)
+    return landmarks @ matrix[:, :2].T + matrix[:, 2]
+
+def standardize_image(image_rgb: np.ndarray, box: tuple[int, int, int, int]) -> np.ndarray:
+    """
+    원본에서 결과 영역(box)만 한 번 샘플링하여 800x1000 RGB 배열로 만듭니다.
+    축소는 INTER_AREA, 확대는 LANCZOS로 보간합니다.
+    """
+    x0, y0, x1, y1 = box
+    region = image_rgb[y0:y1, x0:x1]
+    shrinking = (x1 - x0) > STANDARD_W
+    interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_LANCZOS4
+    return cv2.resize(region, (STANDARD_W, STANDARD_H), interpolation=interpolation)
+
+def _symmetry_axis(landmarks: Landmarks, w: int, h: int, length: float | None = None):
+    # 눈 좌표로 얼굴 대칭축(수직선) 벡터 계산 (length: 눈 중심에서 양쪽으로 그을 길이)
+    x1, y1 = landmarks[33].tolist()   # 왼쪽 눈 외곽
+    x2, y2 = landmarks[263].tolist()  # 오른쪽 눈 외곽
     ex, ey = x2 - x1, y2 - y1
     norm = math.hypot(ex, ey) or 1
     ux, uy = -ey / norm, ex / norm  # 수직 단위벡터
 
-    # 7) 기준선 점(pt1, pt2) 계산
-    L = max(w, h) * 2
+    # 기준선 점(pt1, pt2) 계산
+    L = length if length is not None else max(w, h) * 2
     cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
     pt1 = (cx - ux * L, cy - uy * L)
     pt2 = (cx + ux * L, cy + uy * L)
+    return pt1, pt2
 
-    # 8) 기준선 그리기
-    draw = ImageDraw.Draw(image)
-    draw.line([pt1, pt2], fill='yellow', width=2)
-
-    # 9) 상단 메시지 박스
-    if score >= 90:
-        message = "~(^ w ^~) 이 정도면 대칭의 신이에요! (~ ^ w ^)~"
-    elif score >= 75:
-        message = "☆대칭 미모의 숨겨진 고수~!☆"
-    elif score >= 60:
-        message = "살~짝 삐뚤, 그게 매력이라구요! ^^b"
-    else:
-        message = "비대칭? 그건 개성이라고 불러요 :)"
+def compute_distance_dict(size: tuple[int, int], landmarks) -> dict[str, float]:
+    """
+    결과 이미지를 그리지 않고 부위별 대칭축 거리(px, 결과 이미지 기준)만 계산합니다.
+    generate_result_image가 반환하는 distance_dict와 같은 값입니다.
+    """
+    landmarks = standardize_landmarks(size, landmarks)
+    pt1, pt2 = _symmetry_axis(landmarks, STANDARD_W, STANDARD_H)
 
-    image_center_x = w // 2
+    distance_dict = {}
+    for idx, _, name in DISTANCE_HIGHLIGHTS:
+        x_i, y_i = landmarks[idx].tolist()
+        proj = project_point_to_line(x_i, y_i, pt1, pt2)
+        distance_dict[name] = round(hypot(x_i - proj[0], y_i - proj[1]), 0)
+    return distance_dict
+
+# 점수 구간별 상단 메시지 (높은 기준부터)
+SCORE_MESSAGES = [
+    (90, "~(^ w ^~) 이 정도면 대칭의 신이에요! (~ ^ w ^)~"),
+    (75, "☆대칭 미모의 숨겨진 고수~!☆"),
+    (60, "살~짝 삐뚤, 그게 매력이라구요! ^^b"),
+    (None, "비대칭? 그건 개성이라고 불러요 :)"),
+]
+
+def score_message(score) -> str:
+    for threshold, message in SCORE_MESSAGES:
+        if threshold is None or score >= threshold:
+            return message
+
+@lru_cache(maxsize=32)
+def get_font(size: int) -> ImageFont.FreeTypeFont:
+    """크기별 폰트를 한 번만 로드하여 프로세스 전역에서 재사용합니다."""
+    return load_font(size)
+
+def _text_sizes(scale_factor: float) -> dict[str, int]:
+    # 해상도 기반 폰트 크기
+    return {
+        "title": int(40 * scale_factor),
+        "message": int(34 * scale_factor),
+        "label": int(24 * scale_factor),
+        "face": int(int(15 * scale_factor) * 1.5),
+    }
+
+def _header_layout(scale_factor: float) -> tuple[int, int, int]:
+    # (vertical_padding, box_height, start_y)
+    title_size = _text_sizes(scale_factor)["title"]
     vertical_padding = int(20 * scale_factor)
     box_height = int(title_size * 3 + vertical_padding * 2)
-    start_y = vertical_padding
+    return vertical_padding, box_height, vertical_padding
+
+def safe_text(draw_obj, text, x, y, font, fill, w, h, anchor='mm'):
+    """이미지(w x h) 밖으로 나가지 않도록 위치를 보정하고 그림자와 함께 텍스트를 그립니다."""
+    left, top, right, bottom = draw_obj.textbbox((x, y), text, font=font, anchor=anchor)
+    dx = dy = 0
+    if top < 0:
+        dy = -top + 5
+    elif bottom > h:
+        dy = h - bottom - 5
+    if left < 0:
+        dx = -left + 5
+    elif right > w:
+        dx = w - right - 5
+    draw_obj.text((x + dx + 1, y + dy + 1), text, font=font, fill='black', anchor=anchor)
+    draw_obj.text((x + dx, y + dy), text, font=font, fill=fill, anchor=anchor)
+
+@lru_cache(maxsize=len(SCORE_MESSAGES))
+def _header_sprite(message: str) -> Image.Image:
+    """
+    상단 반투명 박스와 점수 구간 메시지를 기준 폭(STANDARD_W, 배율 1)으로 미리 그려 둔 RGBA 스프라이트입니다.
+    메시지별로 한 번만 만들어 재사용하며, 반환된 이미지는 수정하지 않습니다.
+    """
+    vertical_padding, box_height, _ = _header_layout(1.0)
+    sizes = _text_sizes(1.0)
+
+    sprite = Image.new('RGBA', (STANDARD_W, box_height + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+    draw.rectangle([20, 0, STANDARD_W - 20, box_height], fill=(0, 0, 0, 180))
+    safe_text(draw, message, STANDARD_W // 2, vertical_padding + sizes["title"] * 2.5,
+              get_font(sizes["message"]), 'white', STANDARD_W, sprite.height)
+    return sprite
+
+def _header_overlay(message: str, width: int, scale_factor: float) -> Image.Image:
+    # 기준 폭 스프라이트를 결과 폭·배율의 박스 크기로 맞춤 (단일 얼굴 결과는 기준 폭이라 그대로 사용)
+    sprite = _header_sprite(message)
+    _, box_height, _ = _header_layout(scale_factor)
+    size = (width, box_height + 1)
+    if sprite.size == size:
+        return sprite
+    return sprite.resize(size, Image.LANCZOS)
+
+def preload_render_assets(scale_factor: float = 1.0):
+    """결과 이미지에 쓰이는 폰트와 상단 메시지 스프라이트를 미리 만들어 둡니다. (예열용)"""
+    for size in _text_sizes(scale_factor).values():
+        get_font(size)
+    for _, message in SCORE_MESSAGES:
+        _header_sprite(message)
+
+def generate_result_image(image: Image.Image | np.ndarray, landmarks: Landmarks, score, part_scores):
+    logger.debug("결과 이미지 시각화 시작")
+    landmarks = as_landmark_array(landmarks)
+    image_rgb = np.asarray(image.convert('RGB')) if isinstance(image, Image.Image) else image
+
+    # 1~2) 얼굴 4:5 확대·크롭·고정 해상도 리사이즈를 한 번의 변환으로 처리
+    size = (image_rgb.shape[1], image_rgb.shape[0])
+    box, matrix = result_transform(size, landmarks)
+    image = Image.fromarray(cv2.cvtColor(standardize_image(image_rgb, box), cv2.COLOR_RGB2RGBA), 'RGBA')
+    landmarks = landmarks @ matrix[:, :2].T + matrix[:, 2]
 
-    overlay = Image.new('RGBA', (w, h), (0, 0, 0, 0))
-    od = ImageDraw.Draw(overlay)
-    od.rectangle([20, start_y, w - 20, start_y + box_height], fill=(0, 0, 0, 180))
-    image = Image.alpha_composite(image, overlay)
+    # 3~4) 해상도 기반 폰트 (크기별 캐시)
+    scale_factor = image.width / 800
+    sizes = _text_sizes(scale_factor)
+    font_title = get_font(sizes["title"])
+    font_label = get_font(sizes["label"])
+    font_face = get_font(sizes["face"])
+
+    # 5) RGBA 캔버스
+    w, h = image.size
+
+    # 6~7) 눈 좌표로 얼굴 대칭축(수직선) 기준선 점(pt1, pt2) 계산
+    pt1, pt2 = _symmetry_axis(landmarks, w, h)
+
+    # 8) 기준선 그리기
     draw = ImageDraw.Draw(image)
+    draw.line([pt1, pt2], fill='yellow', width=2)
 
-    def safe_text(draw_obj, text, x, y, font, fill, anchor='mm'):
-        bbox = draw_obj.textbbox((x, y), text, font=font, anchor=anchor)
-        left, top, right, bottom = bbox
-        dx = dy = 0
-        if top < 0:
-            dy = -top + 5
-        elif bottom > h:
-            dy = h - bottom - 5
-        if left < 0:
-            dx = -left + 5
-        elif right > w:
-            dx = w - right - 5
-        draw_obj.text((x + dx + 1, y + dy + 1), text, font=font, fill='black', anchor=anchor)
-        draw_obj.text((x + dx, y + dy), text, font=font, fill=fill, anchor=anchor)
-
-    safe_text(draw, f'당신의 대칭률은 {score:.2f}%!!', image_center_x, start_y + vertical_padding + title_size * 0.5, font_title, 'white')
-    safe_text(draw, message, image_center_x, start_y + vertical_padding + title_size * 2.5, font_message, 'white')
+    # 9) 상단 메시지 박스: 미리 그려 둔 스프라이트를 박스 영역에만 합성하고, 점수 문구만 새로 그림
+    vertical_padding, _, start_y = _header_layout(scale_factor)
+    image.alpha_composite(_header_overlay(score_message(score), w, scale_factor), (0, start_y))
+    safe_text(draw, f'당신의 대칭률은 {score:.2f}%!!', w // 2,
+              start_y + vertical_padding + sizes["title"] * 0.5, font_title, 'white', w, h)
 
     # 10) 거리 시각화 (기울어진 대칭축에 대한 최단 거리)
-    highlights = [
-        (61,  'blue', 'left_mouth'), (291, 'blue', 'right_mouth'),
-        (133, 'blue', 'left_eye'),   (362, 'blue', 'right_eye'),
-        (234, 'cyan', 'left_ear'),   (454, 'cyan', 'right_ear'),
-        (98,  'red', 'left_nose'),   (327, 'red', 'right_nose'),
-        (172, 'red', 'left_chin'),   (397, 'red', 'right_chin'),
-    ]
     distance_dict = {}
-    for idx, color, name in highlights:
-        x_i, y_i = landmarks[idx]
+    for idx, color, name in DISTANCE_HIGHLIGHTS:
+        x_i, y_i = landmarks[idx].tolist()
         proj = project_point_to_line(x_i, y_i, pt1, pt2)
         draw_dotted_line(draw, (x_i, y_i), proj, color=color)
 
         text_x = int((x_i + proj[0]) / 2)
         text_y = int((y_i + proj[1]) / 2)
         safe_text(draw, f"{int(hypot(x_i - proj[0], y_i - proj[1]))}px",
-                  text_x, text_y, font_face, color)
+                  text_x, text_y, font_face, color, w, h)
 
         distance_dict[name] = round(hypot(x_i - proj[0], y_i - proj[1]), 0)
 
@@ -221,7 +330,7 @@ def generate_result_image(image: Image.Image, landmarks, score, part_scores):
     label_indices = {'눈': 33, '코': 1, '입': 13, '귀': 234, '턱': 397}
     static_pos = {}
     for part, idx in label_indices.items():
-        x_pt, y_pt = landmarks[idx]
+        x_pt, y_pt = landmarks[idx].tolist()
         bx = PADDING if part in ['눈', '입'] else w - LABEL_W - PADDING
         by = int(y_pt - LABEL_H / 2)
         by = max(PADDING, min(by, h - LABEL_H - PADDING))
@@ -237,6 +346,66 @@ def generate_result_image(image: Image.Image, landmarks, score, part_scores):
             [bx + shadow_offset, by + shadow_offset, bx + LABEL_W + shadow_offset, by + LABEL_H + shadow_offset],
             fill=shadow_color, radius=8)
         draw.rounded_rectangle([bx, by, bx + LABEL_W, by + LABEL_H], fill='white', radius=8)
-        safe_text(draw, txt, bx + LABEL_W // 2, by + LABEL_H // 2, font_label, 'black')
+        safe_text(draw, txt, bx + LABEL_W // 2, by + LABEL_H // 2, font_label, 'black', w, h)
 
     return image, distance_dict
+
+
+# 여러 얼굴 결과 이미지의 긴 변 길이와 얼굴별 색상
+GROUP_MAX_SIDE = 1000
+FACE_COLORS = ['lime', 'orange', 'magenta', 'cyan', 'yellow', 'red', 'deepskyblue', 'white']
+
+def generate_group_result_image(image: Image.Image | np.ndarray, faces: list[tuple[Landmarks, float]]) -> Image.Image:
+    """
+    여러 얼굴의 분석 결과를 한 장의 캔버스에 한 번에 그립니다.
+    - faces: [(원본 좌표 랜드마크, 최종 점수), ...]
+    - 원본 전체를 긴 변 GROUP_MAX_SIDE로 한 번만 리사이즈하고, 위에 평균 점수 박스 띠를 붙임
+    - 얼굴마다 영역 박스, 대칭축, 부위별 거리 점선, 번호·점수 라벨을 그림
+    """
+    logger.debug(f"여러 얼굴 결과 이미지 시각화 시작 (얼굴 {len(faces)}개)")
+    image_rgb = np.asarray(image.convert('RGB')) if isinstance(image, Image.Image) else image
+
+    src_h, src_w = image_rgb.shape[:2]
+    scale = GROUP_MAX_SIDE / max(src_w, src_h)
+    w, body_h = max(1, round(src_w * scale)), max(1, round(src_h * scale))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LANCZOS4
+    body = cv2.resize(image_rgb, (w, body_h), interpolation=interpolation)
+
+    # 상단 띠(점수 박스) + 본문 이미지를 하나의 RGBA 캔버스로
+    scale_factor = w / STANDARD_W
+    sizes = _text_sizes(scale_factor)
+    vertical_padding, box_height, start_y = _header_layout(scale_factor)
+    band = box_height + start_y * 2
+    h = band + body_h
+    canvas = np.zeros((h, w, 4), dtype=np.uint8)
+    canvas[..., 3] = 255
+    canvas[band:, :, :3] = body
+    image = Image.fromarray(canvas, 'RGBA')
+
+    mean_score = round(sum(score for _, score in faces) / len(faces), 2)
+    image.alpha_composite(_header_overlay(score_message(mean_score), w, scale_factor), (0, start_y))
+    draw = ImageDraw.Draw(image)
+    safe_text(draw, f'{len(faces)}명의 평균 대칭률은 {mean_score:.2f}%!!', w // 2,
+              start_y + vertical_padding + sizes["title"] * 0.5, get_font(sizes["title"]), 'white', w, h)
+
+    font_label = get_font(sizes["label"])
+    offset = np.array([0, band], dtype=np.float32)
+    for i, (landmarks, score) in enumerate(faces):
+        points = as_landmark_array(landmarks) * np.float32(scale) + offset
+        color = FACE_COLORS[i % len(FACE_COLORS)]
+        x0, y0 = points.min(axis=0).tolist()
+        x1, y1 = points.max(axis=0).tolist()
+        draw.rectangle([x0, y0, x1, y1], outline=color, width=2)
+
+        # 대칭축은 얼굴 높이만큼만
+        pt1, pt2 = _symmetry_axis(points, w, h, length=(y1 - y0) * 0.6)
+        draw.line([pt1, pt2], fill='yellow', width=2)
+        for idx, line_color, _ in DISTANCE_HIGHLIGHTS:
+            x_i, y_i = points[idx].tolist()
+            draw_dotted_line(draw, (x_i, y_i), project_point_to_line(x_i, y_i, pt1, pt2),
+                             color=line_color, dash_length=max(2, int((x1 - x0) / 30)))
+
+        safe_text(draw, f"#{i + 1} {score:.1f}%", (x0 + x1) / 2, max(y0 - sizes["label"] * 0.7, band),
+                  font_label, color, w, h)
+
+    return image
@@ -0,0 +1,106 @@
+# analyzer/warmup.py
+
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+from logger import logger
+
+# 서버 시작 시 예열 실행 여부 (0이면 예열 없이 바로 ready)
+WARMUP_ON_START = os.environ.get("WARMUP_ON_START", "1") != "0"
+
+_lock = threading.Lock()
+_ready = threading.Event()
+_state = {
+    "status": "pending",   # pending / warming / ready / failed / skipped
+    "duration": None,
+    "error": None,
+}
+
+
+def _dummy_landmarks(w: int, h: int) -> np.ndarray:
+    # 렌더링 경로 예열용 고정 랜드마크 (이미지 중앙 영역의 임의 점)
+    rng = np.random.default_rng(0)
+    low, high = (w * 0.35, h * 0.3), (w * 0.65, h * 0.7)
+    return rng.uniform(low, high, size=(478, 2)).astype(np.float32)
+
+
+def _run_warm_up():
+    # 무거운 모듈은 예열 시점에 로드
+    from analyzer.analyze_symmetry import mirror_table
+    from analyzer.context import AnalysisContext
+    from analyzer.face_mesh_pool import face_mesh_pool
+    from analyzer.pipeline import score_face
+    from analyzer.ssim import ssim
+    from analyzer.visualize_result import generate_result_image, preload_render_assets
+    from utils.image_utils import encode_image
+
+    # 1) FaceMesh 모델 로드, 좌우 대칭 인덱스 표 생성
+    face_mesh_pool.warm_up()
+    mirror_table()
+
+    # 2) 폰트 및 메시지 스프라이트
+    preload_render_assets()
+
+    # 3) 더미 추론: 빈 이미지로 검출 그래프 1회 실행, 결과 이미지 렌더링·인코딩 1회
+    blank = np.full((256, 256, 3), 128, dtype=np.uint8)
+    score_face(AnalysisContext(blank))
+    ssim(blank[:, :, 0], blank[:, :, 1])
+    result_image, _ = generate_result_image(blank, _dummy_landmarks(256, 256), 0.0, {})
+    encode_image(result_image)
+
+
+def warm_up():
+    """
+    모델·폰트를 미리 로드하고 더미 추론을 실행하여 첫 요청 지연을 없앱니다.
+    완료되면 readiness()가 ready 상태가 됩니다.
+    """
+    with _lock:
+        if _state["status"] in ("warming", "ready"):
+            return
+        _state["status"] = "warming"
+
+    start = time.perf_counter()
+    try:
+        _run_warm_up()
+    except Exception as e:
+        logger.exception("예열 실패")
+        with _lock:
+            _state.update(status="failed", error=str(e), duration=round(time.perf_counter() - start, 3))
+        return
+
+    with _lock:
+        _state.update(status="ready", error=None, duration=round(time.perf_counter() - start, 3))
+    _ready.set()
+    logger.info(f"예열 완료: {_state['duration']}초")
+
+
+def start_warm_up() -> threading.Thread | None:
+    """
+    백그라운드 스레드에서 예열을 시작합니다. (서버는 바로 요청을 받을 수 있고 /readyz로 완료 여부 확인)
+    - WARMUP_ON_START=0이면 예열을 건너뛰고 바로 ready로 표시
+    - 배치 워커 등 자식 프로세스에서는 실행하지 않음 (자식은 자체 initializer로 예열)
+    """
+    if multiprocessing.parent_process() is not None:
+        return None
+
+    if not WARMUP_ON_START:
+        with _lock:
+            _state["status"] = "skipped"
+        _ready.set()
+        return None
+
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def readiness() -> dict:
+    with _lock:
+        return {"ready": _ready.is_set(), **_state}
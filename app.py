@@ -1,29 +1,169 @@
-from flask import Flask, request, jsonify
-from analyzer.detect_face import detect_landmarks, align_and_detect_landmarks
-from analyzer.analyze_symmetry import calculate_symmetry
-from analyzer.visualize_result import generate_result_image
-from analyzer.image_devide import compare_match_parts_from_images, get_face_parts
-from logger import logger
-from utils.image_utils import encode_image_to_base64
-from utils.visual_utils import draw_landmark_points, draw_specific_points
+import base64
+import hashlib
+import os
+import tempfile
+import time
+from flask import Flask, Response, g, request, jsonify, url_for
+from analyzer.analyze_symmetry import SYMMETRY_3D
+from analyzer.detect_face import locate_landmarks, face_box, use_client_landmarks, ALIGN_MODES, DEFAULT_ALIGN_MODE, MAX_FACES
+from analyzer.detectors import LANDMARK_DETECTOR
+from analyzer.context import (
+    AnalysisContext, DETECT_MAX_SIDE, MAX_IMAGE_SIDE, InvalidImage, check_image_header, decode_image_rgb
+)
+from analyzer.pipeline import score_face, score_faces, part_images
+from analyzer.batch import analyze_batch, BATCH_MAX_IMAGES
+from analyzer.jobs import JobFailed, JobQueueFull, get_job_manager
+from analyzer.stream import (
+    STREAM_RENDER_FPS,
+    STREAM_SMOOTHING,
+    STREAM_SSIM_FPS,
+    SessionClosed,
+    analyze_video,
+    stream_sessions,
+)
+from analyzer.visualize_result import generate_result_image, generate_group_result_image, compute_distance_dict
+from analyzer.warmup import start_warm_up, readiness
+from logger import logger, sample_request
+from utils.image_utils import (
+    DEFAULT_IMAGE_FORMAT,
+    EncodeOptions,
+    encode_image_to_base64,
+    encode_images,
+    to_data_uri,
+)
+from utils.face_utils import parse_landmarks
+from utils.response_utils import multipart_response
+from utils.admission import (
+    REQUEST_DEADLINE,
+    REQUEST_DEADLINES,
+    DeadlineExceeded,
+    Rejected,
+    admission,
+    check_deadline,
+    set_deadline,
+)
+from utils.metrics import (
+    CALLS,
+    IMAGE_BYTES,
+    IMAGE_PIXELS,
+    IN_FLIGHT,
+    REQUEST_SECONDS,
+    REQUESTS,
+    SHED,
+    record_error,
+    registry,
+    stage_timer,
+)
+from utils.result_cache import result_cache, make_cache_key
+from utils.visual_utils import render_landmark_overlay
 from flask_cors import CORS
 
 app = Flask(__name__)
 CORS(app, origins=["https://faicial.site"])  # 운영용: 정확한 출처만 허용
 
-# 전역 호출 카운터
-call_counters = {
-    "debug_landmarks": 0,
-    "analyze": 0
+# 모델·폰트 예열을 백그라운드로 시작 (완료 전까지 /readyz는 503)
+start_warm_up()
+
+# /analyze 렌더링 범위 옵션
+RENDER_MODES = ("none", "parts", "result", "all")
+
+# /debug_landmarks 출력 이미지 기본 최대 변 길이 (0이면 원본 크기)
+DEBUG_IMAGE_MAX_SIDE = int(os.environ.get("DEBUG_IMAGE_MAX_SIDE", "0"))
+
+# 요청 수·지연·처리 중 요청 수를 기록할 엔드포인트 (경로 → 지표 라벨)
+INSTRUMENTED_PATHS = {
+    "/debug_landmarks": "debug_landmarks",
+    "/analyze": "analyze",
+    "/analyze_batch": "analyze_batch",
+    "/analyze_video": "analyze_video",
+    "/jobs": "jobs"
+}
+
+# 입장 제어(동시 실행 수·대기열·처리 기한)를 적용할 분석 엔드포인트 (뷰 함수 이름 → 작업 종류)
+ADMISSION_ENDPOINTS = {
+    "debug_landmarks": "debug_landmarks",
+    "analyze": "analyze",
+    "analyze_batch_endpoint": "analyze_batch",
+    "stream_frame": "stream_frame",
+    "analyze_video_endpoint": "analyze_video"
 }
 
+@app.before_request
+def _sample_request_logs():
+    # 요청 단위로 DEBUG 로그 샘플링 여부 결정 (LOG_DEBUG_SAMPLE_RATE)
+    sample_request()
+
+@app.before_request
+def _start_request_metrics():
+    endpoint = INSTRUMENTED_PATHS.get(request.path)
+    if endpoint is not None:
+        g.metrics_endpoint = endpoint
+        g.metrics_start = time.perf_counter()
+        IN_FLIGHT.inc(endpoint=endpoint)
+
+@app.before_request
+def _admit_request():
+    # 업로드를 읽기 전에 실행 슬롯을 확보 (대기열이 가득 차거나 기한 내 처리가 어려우면 바로 거절)
+    kind = ADMISSION_ENDPOINTS.get(request.endpoint)
+    if kind is None:
+        return None
+    set_deadline(_request_timeout(kind))
+    try:
+        admission.acquire(kind)
+    except Rejected as e:
+        logger.warning(f"[{kind}] 요청 거절: {e.reason} (대기 중 {admission.stats()['queued']}건)")
+        return _shed_response(kind, e.reason, e.status, e.retry_after)
+    g.admission = (kind, time.perf_counter())
+    return None
+
+def _request_timeout(kind: str) -> float:
+    # 작업 종류별 기한(배치·동영상은 더 김), 요청 헤더 X-Request-Timeout(초)으로 더 짧은 기한 지정 가능
+    limit = REQUEST_DEADLINES.get(kind, REQUEST_DEADLINE)
+    try:
+        requested = float(request.headers.get("X-Request-Timeout") or 0)
+    except ValueError:
+        requested = 0
+    if requested <= 0:
+        return limit
+    return min(requested, limit) if limit > 0 else requested
+
+def _shed_response(kind: str, reason: str, status: int = 503, retry_after: int | None = None):
+    """거절·중단된 요청 응답 (429: 대기열 가득 참 / 503: 대기 시간 초과·기한 초과) + Retry-After"""
+    SHED.inc(endpoint=kind, reason=reason)
+    g.admission_shed = True
+    message = "Too many requests, retry later" if status == 429 else "Request could not be completed in time"
+    response = jsonify({"error": message, "reason": reason})
+    response.status_code = status
+    response.headers["Retry-After"] = str(retry_after or admission.retry_after(kind))
+    return response
+
+@app.after_request
+def _record_request_metrics(response):
+    endpoint = g.get("metrics_endpoint")
+    if endpoint is not None:
+        REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+        REQUEST_SECONDS.observe(time.perf_counter() - g.metrics_start, endpoint=endpoint)
+    return response
+
+@app.teardown_request
+def _finish_request_metrics(exc):
+    endpoint = g.pop("metrics_endpoint", None)
+    if endpoint is not None:
+        IN_FLIGHT.dec(endpoint=endpoint)
+    admitted = g.pop("admission", None)
+    if admitted is not None:
+        # 중단·실패한 요청은 평균 처리 시간에 반영하지 않음
+        kind, start = admitted
+        completed = exc is None and not g.pop("admission_shed", False)
+        admission.release(kind, time.perf_counter() - start if completed else None)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # DEBUG LANDMARKS ENDPOINT
 @app.route("/debug_landmarks", methods=["POST"])
 def debug_landmarks():
     # 호출 횟수 증가 및 로그
-    call_counters["debug_landmarks"] += 1
-    logger.info(f"[debug_landmarks] 호출 횟수: {call_counters['debug_landmarks']}회")
+    calls = CALLS.inc(endpoint="debug_landmarks")
+    logger.info(f"[debug_landmarks] 호출 횟수: {calls}회")
 
     logger.info("디버그 랜드마크 요청 수신됨")
     if "image" not in request.files:
@@ -33,22 +173,48 @@ def debug_landmarks():
     file = request.files["image"]
     image_bytes = file.read()
 
+    # 출력 이미지 최대 변 길이 (미리보기 해상도, 0이면 원본 크기)
     try:
-        landmarks, image = detect_landmarks(image_bytes)
+        max_side = int(request.values.get("max_side") or DEBUG_IMAGE_MAX_SIDE)
+    except ValueError:
+        max_side = -1
+    if max_side < 0:
+        return jsonify({"error": "max_side must be a non-negative integer"}), 400
+
+    try:
+        if max_side:
+            # 미리보기만 필요하면 축소 디코딩 (검출 입력 해상도보다는 작아지지 않게)
+            with stage_timer("decode"):
+                ctx = AnalysisContext(decode_image_rgb(image_bytes, max(max_side, DETECT_MAX_SIDE)))
+        else:
+            with stage_timer("decode"):
+                ctx = AnalysisContext.from_bytes(image_bytes)
+        landmarks = locate_landmarks(ctx)
         if landmarks is None:
             logger.warning("얼굴이 감지되지 않음")
             return jsonify({"error": "No face detected"}), 400
 
         logger.info(f"검출된 랜드마크 개수: {len(landmarks)}")
-        debug_img = draw_landmark_points(image, landmarks, color="lime", radius=2)
-        debug_img = draw_specific_points(debug_img, landmarks, [234, 454], color="red", radius=6)
+        check_deadline("render")
+        # 전체 랜드마크와 강조점(양쪽 귀 234, 454)을 한 캔버스에 한 번에 찍음
+        debug_img = render_landmark_overlay(ctx.image_rgb, [
+            (landmarks, "lime", 2),
+            (landmarks[[234, 454]], "red", 6),
+        ], max_side=max_side)
         img_data = encode_image_to_base64(debug_img)
 
         logger.info("디버그 랜드마크 이미지 생성 및 전송 완료")
         return jsonify({"image_base64": img_data})
 
+    except InvalidImage as e:
+        record_error("debug_landmarks", "invalid_image")
+        return jsonify({"error": str(e)}), 400
+    except DeadlineExceeded:
+        logger.warning("처리 기한 초과로 디버그 랜드마크 중단")
+        return _shed_response("debug_landmarks", "deadline")
     except Exception as e:
         logger.exception("디버그 랜드마크 처리 중 예외 발생")
+        record_error("debug_landmarks", e)
         return jsonify({"error": str(e)}), 500
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -56,8 +222,8 @@ def debug_landmarks():
 @app.route("/analyze", methods=["POST"])
 def analyze():
     # 호출 횟수 증가 및 로그
-    call_counters["analyze"] += 1
-    logger.info(f"[analyze] 호출 횟수: {call_counters['analyze']}회")
+    calls = CALLS.inc(endpoint="analyze")
+    logger.info(f"[analyze] 호출 횟수: {calls}회")
 
     if "image" not in request.files:
         logger.warning("요청에 이미지 파일 없음")
@@ -65,74 +231,559 @@ def analyze():
 
     file = request.files["image"]
     image_bytes = file.read()
+    IMAGE_BYTES.observe(len(image_bytes))
 
+    # 분석 옵션(정렬 모드, 렌더링 범위, 얼굴 수, 출력 이미지 포맷) 및 응답 형식(json/multipart)
     try:
-        logger.debug("얼굴 랜드마크 추출 시도")
-        landmarks, image = detect_landmarks(image_bytes)
-        if landmarks is None:
+        options = _analysis_options_from_request()
+    except ValueError as e:
+        logger.warning(f"잘못된 분석 옵션: {e}")
+        return jsonify({"error": str(e)}), 400
+    multipart = _wants_multipart()
+
+    try:
+        analysis = _run_analysis(image_bytes, **options)
+        if analysis is None:
             logger.warning("얼굴이 감지되지 않음")
+            record_error("analyze", "no_face")
             return jsonify({"error": "No face detected"}), 400
+        response, images, mime_type = analysis
+        return _analysis_response(response, images, mime_type, multipart)
+
+    except InvalidImage as e:
+        record_error("analyze", "invalid_image")
+        return jsonify({"error": str(e)}), 400
+    except DeadlineExceeded as e:
+        logger.warning(f"처리 기한 초과로 분석 중단: {e}")
+        return _shed_response("analyze", "deadline")
+    except Exception as e:
+        logger.exception("분석 중 예외 발생")
+        record_error("analyze", e)
+        return jsonify({"error": str(e)}), 500
 
-        logger.debug(f"랜드마크 수: {len(landmarks)}")
+def _align_mode_from_request() -> str:
+    """정렬 모드: analytic(기본, 재검출 생략) / precise(회전 후 재검출). 잘못된 값이면 ValueError가 발생합니다."""
+    align_mode = (request.values.get("align_mode") or DEFAULT_ALIGN_MODE).lower()
+    if align_mode not in ALIGN_MODES:
+        raise ValueError(f"Invalid align_mode (one of {', '.join(ALIGN_MODES)})")
+    return align_mode
 
-        align_landmarks, align_image = align_and_detect_landmarks(image_bytes)
-        
-        logger.debug("대칭률 계산 시작")
-        symmetry_score, part_scores = calculate_symmetry(align_landmarks)
-        logger.debug(f"총 대칭률 점수: {symmetry_score}")
-        logger.debug(f"부위별 대칭률 점수: {part_scores}")
+def _analysis_options_from_request() -> dict:
+    """/analyze·/jobs 공통 분석 옵션을 읽습니다. 잘못된 값이면 ValueError가 발생합니다."""
+    align_mode = _align_mode_from_request()
 
-        logger.debug("일치율 계산 시작")
-        parts_images = get_face_parts(align_landmarks, align_image)
-        match_scores = compare_match_parts_from_images(parts_images)
-        logger.debug(f"부위별 일치율 : {match_scores}")
+    # 렌더링 범위: none(점수만) / parts(부위 이미지) / result(결과 이미지) / all(기본)
+    render = (request.form.get("render") or request.args.get("render") or "all").lower()
+    if render not in RENDER_MODES:
+        raise ValueError(f"Invalid render option (one of {', '.join(RENDER_MODES)})")
 
-        encoded_parts = {
-            part_name: encode_image_to_base64(part_image)
-            for part_name, part_image in parts_images.items()
-        }
+    # 분석할 최대 얼굴 수: 1(기본, 단일 얼굴 응답) / 2~MAX_FACES(faces 목록 응답)
+    try:
+        max_faces = int(request.values.get("max_faces") or 1)
+    except ValueError:
+        max_faces = 0
+    if not 1 <= max_faces <= MAX_FACES:
+        raise ValueError(f"max_faces must be an integer between 1 and {MAX_FACES}")
+    if max_faces > 1 and align_mode == "precise":
+        # precise 모드는 회전한 이미지에서 얼굴 1개만 재검출하므로 여러 얼굴에 쓸 수 없음
+        raise ValueError("align_mode=precise is not supported with max_faces > 1")
+
+    # 클라이언트 랜드마크(선택): 있으면 서버 검출을 건너뜀 (정규화 좌표 기본, pixel 지정 시 픽셀 좌표)
+    landmarks = None
+    landmarks_space = (request.values.get("landmarks_space") or "normalized").lower()
+    pre_aligned = (request.values.get("pre_aligned") or "").lower() in ("1", "true", "yes")
+    # 폼 필드(-F landmarks=...) 또는 파일 파트(-F landmarks=@pts.json) 모두 허용
+    raw_landmarks = request.values.get("landmarks")
+    if not raw_landmarks and "landmarks" in request.files:
+        raw_landmarks = request.files["landmarks"].read()
+    if raw_landmarks:
+        if max_faces > 1:
+            raise ValueError("landmarks are only supported with max_faces=1")
+        if landmarks_space not in ("normalized", "pixel"):
+            raise ValueError("landmarks_space must be normalized or pixel")
+        landmarks = parse_landmarks(raw_landmarks)
 
-        weights = {
-            "eyes": 0.30,
-            "nose": 0.20,
-            "mouth": 0.20,
-            "chin": 0.20,
-            "ears": 0.10
+    # 출력 이미지 포맷(png/jpeg/webp, 품질, 압축 레벨)
+    encode_options = _encode_options_from_request()
+    return {
+        "align_mode": align_mode, "render": render, "max_faces": max_faces, "encode_options": encode_options,
+        "landmarks": landmarks, "landmarks_space": landmarks_space, "pre_aligned": pre_aligned,
+    }
+
+def _run_analysis(image_bytes: bytes, align_mode: str, render: str, max_faces: int, encode_options: EncodeOptions,
+                  landmarks=None, landmarks_space: str = "normalized", pre_aligned: bool = False):
+    """
+    캐시 확인 → 디코딩 → (클라이언트 랜드마크 적용) → 분석 → 렌더링 → 인코딩 → 캐시 저장을 실행합니다.
+    (응답, 이미지 이름 → 바이트, MIME 타입) 또는 얼굴이 없으면 None을 반환합니다.
+    디코딩할 수 없는 이미지이면 InvalidImage가 발생합니다.
+    """
+    # 같은 사진 + 같은 설정(+ 같은 클라이언트 랜드마크)이면 캐시된 결과 반환
+    client_settings = {}
+    if landmarks is not None:
+        client_settings = {
+            "landmarks": hashlib.sha256(landmarks.tobytes()).hexdigest(),
+            "landmarks_space": landmarks_space,
+            "pre_aligned": pre_aligned,
         }
+    cache_key = make_cache_key(
+        image_bytes, align_mode=align_mode, max_side=MAX_IMAGE_SIDE, detect_max_side=DETECT_MAX_SIDE, render=render,
+        max_faces=max_faces, symmetry_3d=SYMMETRY_3D, detector=LANDMARK_DETECTOR,
+        **client_settings, **encode_options.cache_settings()
+    )
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        logger.info("캐시된 분석 결과 반환")
+        images = {name: base64.b64decode(data) for name, data in cached["images"].items()}
+        return cached["response"], images, cached["mime_type"]
+
+    # 업로드 이미지는 한 번만 디코딩하여 모든 단계에서 공유
+    with stage_timer("decode"):
+        ctx = AnalysisContext.from_bytes(image_bytes)
+    w, h = ctx.size
+    IMAGE_PIXELS.observe(w * h)
+
+    landmark_source = "server"
+    if landmarks is not None:
+        landmark_source = use_client_landmarks(
+            ctx, landmarks, normalized=landmarks_space == "normalized", pre_aligned=pre_aligned
+        )
+        if landmark_source == "client":
+            # 클라이언트 랜드마크는 재검출 없이 사용 (precise 모드도 analytic으로 처리)
+            align_mode = "analytic"
 
-        final_scores = {}
-        weighted_total = 0.0
-        for part, weight in weights.items():
-            match = match_scores.get(part, 0)
-            if part == "chin":
-                final = round(match, 2)
-            else:
-                sym = part_scores.get(part, 0)
-                final = round((sym * 0.5 + match * 0.5), 2)
-            final_scores[part] = final
-            weighted_total += final * weight
-
-        final_score = round(weighted_total, 2)
-        logger.debug(f"일치율 + 대칭률 : {final_scores}")
-        logger.debug(f"최종 대칭 점수 : {final_score}")
-
-        result_image, distance_dict = generate_result_image(image, landmarks, final_score, final_scores)
-        img_data = encode_image_to_base64(result_image)
-
-        logger.info("분석 성공 및 응답 반환")
-        logger.info("결과 이미지 Base64 생성 및 전송 완료")
-
-        return jsonify({
-            "parts_images": encoded_parts,
-            "final_scores": final_scores,
-            "final_score": final_score,
-            "result_image": img_data,
-            "total_distance": distance_dict
+    render_parts = render in ("parts", "all")
+    render_result = render in ("result", "all")
+    if max_faces > 1:
+        analysis = _analyze_faces(ctx, max_faces, render_parts, render_result)
+    else:
+        analysis = _analyze_face(ctx, align_mode, render_parts, render_result)
+    if analysis is None:
+        return None
+    response, to_encode, cache_landmarks = analysis
+    response["render"] = render
+    response["landmark_source"] = landmark_source
+
+    # 인코딩은 별도 스레드 풀에서 병렬 실행
+    check_deadline("encode")
+    with stage_timer("encode"):
+        images = encode_images(to_encode, encode_options)
+    logger.info(f"분석 성공 (render={render}, format={encode_options.fmt}, max_faces={max_faces})")
+
+    if result_cache.enabled:
+        result_cache.put(cache_key, {
+            "landmarks": cache_landmarks,
+            "response": response,
+            "images": {name: base64.b64encode(data).decode("ascii") for name, data in images.items()},
+            "mime_type": encode_options.mime_type
+        })
+    return response, images, encode_options.mime_type
+
+def _analyze_face(ctx: AnalysisContext, align_mode: str, render_parts: bool, render_result: bool):
+    """얼굴 1개 분석: (응답, 인코딩할 이미지, 캐시용 랜드마크) 또는 얼굴이 없으면 None"""
+    if score_face(ctx, align_mode=align_mode) is None:
+        return None
+
+    final_scores, final_score = ctx.final_scores, ctx.final_score
+
+    # 응답 스키마는 고정하고, 생략한 항목은 null + omitted 목록으로 표시
+    omitted = []
+    to_encode = {}
+    if render_parts:
+        to_encode.update(part_images(ctx))
+    else:
+        omitted.append("parts_images")
+
+    if render_result:
+        check_deadline("render")
+        with stage_timer("render"):
+            result_image, distance_dict = generate_result_image(ctx.image_rgb, ctx.landmarks, final_score, final_scores)
+        to_encode["result_image"] = result_image
+    else:
+        # 결과 이미지 없이 거리 값만 계산
+        distance_dict = compute_distance_dict(ctx.size, ctx.landmarks)
+        omitted.append("result_image")
+
+    response = {
+        "parts_images": [name for name in to_encode if name != "result_image"] if render_parts else None,
+        "final_scores": final_scores,
+        "final_score": final_score,
+        "result_image": "result_image" if render_result else None,
+        "total_distance": distance_dict,
+        "align_mode": ctx.align_mode,
+        "omitted": omitted
+    }
+    return response, to_encode, ctx.aligned_landmarks.tolist()
+
+def _analyze_faces(ctx: AnalysisContext, max_faces: int, render_parts: bool, render_result: bool):
+    """
+    여러 얼굴 분석: 추론 1회로 검출한 얼굴마다 대칭률·일치율을 병렬 계산합니다.
+    - 얼굴은 왼쪽 → 오른쪽 순서이며, 부위 이미지 이름은 face<번호>.<부위>
+    - 결과 이미지는 모든 얼굴을 한 장에 그림
+    """
+    face_contexts = score_faces(ctx, max_faces, align_mode="analytic")
+    if not face_contexts:
+        return None
+
+    omitted = [] if render_parts else ["parts_images"]
+    to_encode = {}
+    faces = []
+    for i, face_ctx in enumerate(face_contexts, start=1):
+        parts = None
+        if render_parts:
+            parts = {}
+            for name, image in part_images(face_ctx).items():
+                parts[name] = f"face{i}.{name}"
+                to_encode[parts[name]] = image
+        faces.append({
+            "index": i,
+            "box": list(face_box(face_ctx.landmarks, ctx.size)),
+            "parts_images": parts,
+            "final_scores": face_ctx.final_scores,
+            "final_score": face_ctx.final_score,
+            "total_distance": compute_distance_dict(ctx.size, face_ctx.landmarks),
         })
 
+    if render_result:
+        check_deadline("render")
+        with stage_timer("render"):
+            to_encode["result_image"] = generate_group_result_image(
+                ctx.image_rgb, [(face_ctx.landmarks, face_ctx.final_score) for face_ctx in face_contexts]
+            )
+    else:
+        omitted.append("result_image")
+
+    response = {
+        "faces": faces,
+        "face_count": len(faces),
+        "final_score": round(sum(face["final_score"] for face in faces) / len(faces), 2),
+        "result_image": "result_image" if render_result else None,
+        "align_mode": "analytic",
+        "omitted": omitted
+    }
+    return response, to_encode, [face_ctx.aligned_landmarks.tolist() for face_ctx in face_contexts]
+
+def _int_option(name: str, low: int, high: int) -> int | None:
+    """정수 옵션(선택)을 읽습니다. 없으면 None, 범위를 벗어나거나 정수가 아니면 ValueError가 발생합니다."""
+    value = request.values.get(name)
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or not low <= number <= high:
+        raise ValueError(f"{name} must be an integer between {low} and {high}")
+    return number
+
+def _encode_options_from_request() -> EncodeOptions:
+    return EncodeOptions(
+        request.values.get("image_format") or DEFAULT_IMAGE_FORMAT,
+        quality=_int_option("quality", 1, 100),
+        compress_level=_int_option("compress_level", 0, 9),
+    )
+
+def _wants_multipart() -> bool:
+    response_type = request.values.get("response_type")
+    if response_type:
+        return response_type == "multipart"
+    return request.accept_mimetypes.best_match(["application/json", "multipart/mixed"]) == "multipart/mixed"
+
+def _analysis_response(response: dict, images: dict[str, bytes], mime_type: str, multipart: bool):
+    """
+    분석 결과 응답을 생성합니다.
+    - json: 이미지 항목을 data URI(Base64)로 채워 반환 (기존 형식)
+    - multipart: JSON에는 이미지 이름만 두고, 이미지 원본 바이트를 별도 파트로 전송
+    """
+    if multipart:
+        payload = _link_images(response, lambda name: name)
+        return multipart_response(payload, {name: (data, mime_type) for name, data in images.items()})
+    return jsonify(_link_images(response, lambda name: to_data_uri(images[name], mime_type)))
+
+def _link_images(response: dict, link) -> dict:
+    """응답의 이미지 이름을 link(이름)의 결과(data URI, URL 등)로 바꾼 사본을 반환합니다."""
+    def fill(entry: dict) -> dict:
+        # parts_images: 이름 목록(단일 얼굴) 또는 부위 → 이미지 이름(여러 얼굴)
+        entry = dict(entry)
+        parts = entry.get("parts_images")
+        if isinstance(parts, list):
+            entry["parts_images"] = {name: link(name) for name in parts}
+        elif parts is not None:
+            entry["parts_images"] = {part: link(name) for part, name in parts.items()}
+        if entry.get("result_image") is not None:
+            entry["result_image"] = link(entry["result_image"])
+        return entry
+
+    payload = fill(response)
+    if "faces" in payload:
+        payload["faces"] = [fill(face) for face in payload["faces"]]
+    return payload
+
+# ──────────────────────────────────────────────────────────────────────────────
+# ANALYZE BATCH ENDPOINT
+@app.route("/analyze_batch", methods=["POST"])
+def analyze_batch_endpoint():
+    # 호출 횟수 증가 및 로그
+    calls = CALLS.inc(endpoint="analyze_batch")
+    logger.info(f"[analyze_batch] 호출 횟수: {calls}회")
+
+    files = request.files.getlist("images")
+    if not files:
+        logger.warning("요청에 이미지 파일 없음")
+        return jsonify({"error": "No image files provided"}), 400
+
+    if len(files) > BATCH_MAX_IMAGES:
+        logger.warning(f"배치 이미지 수 초과: {len(files)}")
+        return jsonify({"error": f"Too many images (max {BATCH_MAX_IMAGES})"}), 400
+
+    try:
+        align_mode = _align_mode_from_request()
+    except ValueError as e:
+        logger.warning(f"잘못된 분석 옵션: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        results = analyze_batch([file.read() for file in files], align_mode=align_mode)
+    except DeadlineExceeded as e:
+        logger.warning(f"처리 기한 초과로 배치 분석 중단: {e}")
+        return _shed_response("analyze_batch", "deadline")
     except Exception as e:
-        logger.exception("분석 중 예외 발생")
+        logger.exception("배치 분석 중 예외 발생")
+        record_error("analyze_batch", e)
+        return jsonify({"error": str(e)}), 500
+
+    for result, file in zip(results, files):
+        result["filename"] = file.filename
+
+    failed = sum(1 for result in results if "error" in result)
+    logger.info(f"배치 분석 완료: {len(results)}건 중 {failed}건 실패")
+    return jsonify({"results": results})
+
+# ──────────────────────────────────────────────────────────────────────────────
+# JOB ENDPOINTS (비동기 분석: 작업 제출 → 상태 조회 → 결과 이미지 개별 다운로드)
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    # 호출 횟수 증가 및 로그
+    calls = CALLS.inc(endpoint="jobs")
+    logger.info(f"[jobs] 호출 횟수: {calls}회")
+
+    if "image" not in request.files:
+        logger.warning("요청에 이미지 파일 없음")
+        return jsonify({"error": "No image file provided"}), 400
+
+    image_bytes = request.files["image"].read()
+    IMAGE_BYTES.observe(len(image_bytes))
+
+    # 이미지가 아닌 업로드는 작업 등록 전에 거절 (헤더만 확인, 손상된 본문은 작업이 실패로 끝남)
+    try:
+        check_image_header(image_bytes)
+    except InvalidImage as e:
+        logger.warning("이미지가 아닌 업로드로 작업 거절")
+        record_error("jobs", "invalid_image")
+        return jsonify({"error": str(e)}), 400
+
+    # /analyze와 같은 분석 옵션
+    try:
+        options = _analysis_options_from_request()
+    except ValueError as e:
+        logger.warning(f"잘못된 분석 옵션: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        job = get_job_manager().submit(_analysis_job, image_bytes, options, kind="analyze")
+    except JobQueueFull:
+        logger.warning("대기 중 작업 수 초과로 작업 거절")
+        return _shed_response("jobs", "queue_full", 429)
+
+    status_url = url_for("job_status", job_id=job["id"])
+    response = jsonify({"job_id": job["id"], "status": job["status"], "status_url": status_url})
+    response.status_code = 202
+    response.headers["Location"] = status_url
+    return response
+
+def _analysis_job(image_bytes: bytes, options: dict):
+    # 작업 스레드에서 실행: /analyze와 같은 파이프라인 (캐시 포함)
+    try:
+        analysis = _run_analysis(image_bytes, **options)
+    except InvalidImage as e:
+        raise JobFailed(str(e)) from e
+    if analysis is None:
+        raise JobFailed("No face detected")
+    return analysis
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    payload = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "expires_at": job["expires_at"],
+        "error": job["error"],
+        "result": None
+    }
+    if job["result"] is not None:
+        # 이미지는 URL로만 알려 주고 별도 요청으로 받게 함 (상태 응답을 작게 유지)
+        payload["result"] = _link_images(
+            job["result"], lambda name: url_for("job_image", job_id=job_id, name=name)
+        )
+    return jsonify(payload)
+
+@app.route("/jobs/<job_id>/images/<name>", methods=["GET"])
+def job_image(job_id, name):
+    image = get_job_manager().get_image(job_id, name)
+    if image is None:
+        return jsonify({"error": "Image not found"}), 404
+    data, mime_type = image
+    return Response(data, mimetype=mime_type)
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def delete_job(job_id):
+    if not get_job_manager().delete(job_id):
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"job_id": job_id, "deleted": True})
+
+# ──────────────────────────────────────────────────────────────────────────────
+# STREAM ENDPOINTS (카메라 실시간 분석: 세션 생성 → 프레임 업로드 반복 → 세션 종료)
+def _float_param(name: str, default: float) -> float:
+    value = request.values.get(name)
+    return float(value) if value not in (None, "") else default
+
+@app.route("/stream/sessions", methods=["POST"])
+def create_stream_session():
+    try:
+        session = stream_sessions.create(
+            smoothing=_float_param("smoothing", STREAM_SMOOTHING),
+            ssim_fps=_float_param("ssim_fps", STREAM_SSIM_FPS),
+            render_fps=_float_param("render_fps", STREAM_RENDER_FPS),
+            encode_options=_encode_options_from_request(),
+        )
+    except ValueError as e:
+        logger.warning(f"잘못된 스트림 옵션: {e}")
+        return jsonify({"error": str(e)}), 400
+    except TimeoutError:
+        logger.warning("스트림 세션 한도 초과")
+        return jsonify({"error": "Too many active stream sessions"}), 503
+
+    return jsonify({"session_id": session.id, "settings": session.settings()}), 201
+
+@app.route("/stream/sessions/<session_id>/frames", methods=["POST"])
+def stream_frame(session_id):
+    session = stream_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown stream session"}), 404
+
+    # multipart(frame 필드) 또는 요청 본문 전체(image/jpeg 등)로 프레임 수신
+    file = request.files.get("frame") or request.files.get("image")
+    frame_bytes = file.read() if file is not None else request.get_data()
+    if not frame_bytes:
+        return jsonify({"error": "No frame provided"}), 400
+
+    try:
+        # timestamp: 클라이언트 프레임 시각(밀리초, 선택)
+        timestamp = request.values.get("timestamp")
+        timestamp = float(timestamp) / 1000 if timestamp else None
+        image_rgb = decode_image_rgb(frame_bytes, MAX_IMAGE_SIDE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        return jsonify(session.process_frame(image_rgb, timestamp))
+    except SessionClosed as e:
+        # 처리 중 세션이 종료됨
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        logger.exception("스트림 프레임 분석 중 예외 발생")
+        record_error("stream", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/stream/sessions/<session_id>", methods=["GET"])
+def stream_session_summary(session_id):
+    session = stream_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown stream session"}), 404
+    return jsonify(session.summary())
+
+@app.route("/stream/sessions/<session_id>", methods=["DELETE"])
+def close_stream_session(session_id):
+    summary = stream_sessions.close(session_id)
+    if summary is None:
+        return jsonify({"error": "Unknown stream session"}), 404
+    return jsonify(summary)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# ANALYZE VIDEO ENDPOINT
+@app.route("/analyze_video", methods=["POST"])
+def analyze_video_endpoint():
+    calls = CALLS.inc(endpoint="analyze_video")
+    logger.info(f"[analyze_video] 호출 횟수: {calls}회")
+
+    if "video" not in request.files:
+        logger.warning("요청에 동영상 파일 없음")
+        return jsonify({"error": "No video file provided"}), 400
+
+    try:
+        options = dict(
+            smoothing=_float_param("smoothing", STREAM_SMOOTHING),
+            ssim_fps=_float_param("ssim_fps", STREAM_SSIM_FPS),
+            sample_fps=_float_param("sample_fps", 0),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # OpenCV는 파일 경로로만 동영상을 열 수 있으므로 임시 파일에 저장
+    file = request.files["video"]
+    suffix = os.path.splitext(file.filename or "")[1] or ".mp4"
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            file.save(f)
+        result = analyze_video(path, **options)
+    except DeadlineExceeded as e:
+        logger.warning(f"처리 기한 초과로 동영상 분석 중단: {e}")
+        return _shed_response("analyze_video", "deadline")
+    except ValueError as e:
+        logger.warning(f"동영상 분석 실패: {e}")
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception("동영상 분석 중 예외 발생")
+        record_error("analyze_video", e)
         return jsonify({"error": str(e)}), 500
+    finally:
+        os.remove(path)
+
+    logger.info(f"동영상 분석 완료: 프레임 {result['frames']}개 (얼굴 {result['face_frames']}개)")
+    return jsonify(result)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# CACHE STATS ENDPOINT
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(result_cache.stats())
+
+# ──────────────────────────────────────────────────────────────────────────────
+# METRICS ENDPOINT
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus 텍스트 형식 (요청 수, 오류 수, 처리 중 요청, 단계별 지연, 이미지 크기)
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HEALTH / READINESS ENDPOINTS
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    # 프로세스 생존 여부만 확인 (예열 상태와 무관)
+    return jsonify({"status": "ok"})
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    # 예열이 끝나야 200 (오케스트레이터는 이 시점부터 트래픽 전달)
+    state = readiness()
+    return jsonify(state), (200 if state["ready"] else 503)
 
 if __name__ == "__main__":
     logger.info("Flask 앱 실행 시작")
@@ -0,0 +1,50 @@
+# benchmarks/corpus.py
+
+import hashlib
+import os
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# 벤치마크 입력 이미지 (원본 이름, 긴 변 길이, JPEG 바이트, sha256)
+CorpusImage = namedtuple("CorpusImage", ["name", "side", "data", "sha256"])
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+DEFAULT_SIDES = (480, 1080, 2160)
+JPEG_QUALITY = 95
+
+
+def _resize_long_side(image: np.ndarray, side: int) -> np.ndarray:
+    h, w = image.shape[:2]
+    scale = side / max(h, w)
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(image, size, interpolation=interpolation)
+
+
+def build_corpus(source_dir: str, sides=DEFAULT_SIDES) -> list[CorpusImage]:
+    """
+    source_dir의 얼굴 이미지를 해상도별(긴 변 기준)로 리사이즈한 고정 입력 세트를 만듭니다.
+    - 파일 이름 순으로 읽고 같은 설정(보간, JPEG 품질)으로 다시 인코딩하므로
+      같은 원본이면 실행마다 같은 바이트가 만들어집니다. (sha256으로 확인 가능)
+    """
+    names = sorted(
+        name for name in os.listdir(source_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if not names:
+        raise FileNotFoundError(f"No images found in {source_dir}")
+
+    corpus = []
+    for name in names:
+        image = cv2.imread(os.path.join(source_dir, name), cv2.IMREAD_COLOR)
+        if image is None:
+            continue
+        for side in sides:
+            ok, buffer = cv2.imencode(".jpg", _resize_long_side(image, side), [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+            if not ok:
+                continue
+            data = buffer.tobytes()
+            corpus.append(CorpusImage(name, side, data, hashlib.sha256(data).hexdigest()))
+    return corpus
@@ -0,0 +1,243 @@
+# benchmarks/run.py
+"""
+분석 파이프라인 벤치마크
+
+    python -m benchmarks.run --corpus test_images
+    python -m benchmarks.run --corpus test_images --baseline benchmarks/results/baseline.json
+    python -m benchmarks.run --corpus test_images --detector stub   # 모델 없이 검출 이후 단계만 측정
+
+- 공개 함수별, 해상도별 지연(p50/p95/p99), 처리량, 호출 1회의 최대 할당량을 측정합니다.
+- 최대 RSS는 함수별로 나눌 수 없어 프로세스 전체 값으로 한 번만 기록합니다 (meta.peak_rss_mb).
+- 결과는 JSON으로 저장하며, --baseline을 지정하면 p50 기준으로 비교하여
+  허용 범위(--threshold)를 넘는 회귀가 있으면 종료 코드 1을 반환합니다.
+"""
+
+import os
+
+# 캐시·백그라운드 예열이 측정값에 섞이지 않도록 app import 전에 설정
+os.environ["RESULT_CACHE_MAX_BYTES"] = "0"
+os.environ["RESULT_CACHE_DIR"] = ""
+os.environ["WARMUP_ON_START"] = "0"
+
+import argparse
+import io
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.corpus import DEFAULT_SIDES, build_corpus
+from logger import logger
+
+DEFAULT_REPEAT = 20
+DEFAULT_WARMUP = 3
+DEFAULT_THRESHOLD = 0.10  # p50 10% 이상 느려지면 회귀로 판단
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def _peak_rss_mb() -> float:
+    # Linux: KB 단위, macOS: 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _peak_alloc_mb(func) -> float:
+    # 시간 측정과 별도로 1회 더 실행하여 호출 중 Python·NumPy 할당의 최대치를 측정
+    # (OpenCV·MediaPipe 내부의 네이티브 할당은 포함되지 않음)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2)
+
+
+def _summarize(samples: list[float], peak_alloc_mb: float) -> dict:
+    values = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "n": len(samples),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "throughput_per_s": round(1000 / float(values.mean()), 2),
+        "peak_alloc_mb": peak_alloc_mb,
+    }
+
+
+def _measure(func, repeat: int, warmup: int) -> list[float]:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _benchmarks_for(image_bytes: bytes, client) -> dict | None:
+    """이미지 1장에 대해 측정할 (이름 → 인자 없는 호출) 목록을 준비합니다. 얼굴이 없으면 None."""
+    from analyzer.analyze_symmetry import calculate_symmetry
+    from analyzer.detect_face import align_and_detect_landmarks, detect_landmarks
+    from analyzer.image_devide import compare_match_parts_from_images, get_face_parts
+    from analyzer.visualize_result import generate_result_image
+    from utils.image_utils import encode_image_to_base64
+
+    landmarks, image = detect_landmarks(image_bytes)
+    if landmarks is None:
+        return None
+    aligned_landmarks, aligned_image = align_and_detect_landmarks(image_bytes)
+    if aligned_landmarks is None:
+        return None
+
+    _, part_scores = calculate_symmetry(aligned_landmarks)
+    parts = get_face_parts(aligned_landmarks, aligned_image)
+    result_image, _ = generate_result_image(image, landmarks, 80.0, part_scores)
+
+    def analyze():
+        response = client.post(
+            "/analyze",
+            data={"image": (io.BytesIO(image_bytes), "bench.jpg")},
+            content_type="multipart/form-data",
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"/analyze failed: {response.status_code}")
+
+    return {
+        "detect_landmarks": lambda: detect_landmarks(image_bytes),
+        "align_and_detect_landmarks": lambda: align_and_detect_landmarks(image_bytes),
+        "calculate_symmetry": lambda: calculate_symmetry(aligned_landmarks),
+        "get_face_parts": lambda: get_face_parts(aligned_landmarks, aligned_image),
+        # 입력 딕셔너리를 수정(코·입 항목 제거)하므로 호출마다 복사본 전달
+        "compare_match_parts_from_images": lambda: compare_match_parts_from_images(dict(parts)),
+        "generate_result_image": lambda: generate_result_image(image, landmarks, 80.0, part_scores),
+        "encode_image_to_base64": lambda: encode_image_to_base64(result_image),
+        "analyze_endpoint": analyze,
+    }
+
+
+def run(corpus_dir: str, sides=DEFAULT_SIDES, repeat: int = DEFAULT_REPEAT, warmup: int = DEFAULT_WARMUP,
+        only: list[str] | None = None) -> dict:
+    """코퍼스 전체에 대해 벤치마크를 실행하고 결과 딕셔너리를 반환합니다."""
+    import cv2
+    import mediapipe
+    from analyzer.detectors import LANDMARK_DETECTOR
+    from analyzer.warmup import warm_up
+    from app import app
+
+    corpus = build_corpus(corpus_dir, sides)
+    logger.info(f"벤치마크 코퍼스: 이미지 {len(corpus)}장 (해상도 {list(sides)})")
+
+    warm_up()
+    client = app.test_client()
+
+    samples: dict[str, list[float]] = {}
+    peaks: dict[str, float] = {}
+    skipped = []
+    for item in corpus:
+        benchmarks = _benchmarks_for(item.data, client)
+        if benchmarks is None:
+            logger.warning(f"얼굴 미검출로 제외: {item.name} ({item.side}px)")
+            skipped.append({"name": item.name, "side": item.side})
+            continue
+        for name, func in benchmarks.items():
+            if only and name not in only:
+                continue
+            key = f"{name}@{item.side}"
+            samples.setdefault(key, []).extend(_measure(func, repeat, warmup))
+            peaks[key] = max(peaks.get(key, 0.0), _peak_alloc_mb(func))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "mediapipe": getattr(mediapipe, "__version__", "unknown"),
+            "detector": LANDMARK_DETECTOR,
+            "repeat": repeat,
+            "warmup": warmup,
+            "corpus": [{"name": item.name, "side": item.side, "sha256": item.sha256} for item in corpus],
+            "skipped": skipped,
+            "peak_rss_mb": _peak_rss_mb(),
+        },
+        "results": {key: _summarize(values, peaks[key]) for key, values in sorted(samples.items())},
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """p50 기준으로 기준선과 비교하여 출력하고, 허용 범위를 넘은 항목 이름 목록을 반환합니다."""
+    if current["meta"]["corpus"] != baseline["meta"].get("corpus"):
+        logger.warning("기준선과 코퍼스가 다릅니다 (이미지 또는 해상도 불일치)")
+    if current["meta"].get("detector") != baseline["meta"].get("detector", "facemesh"):
+        logger.warning("기준선과 검출 백엔드가 다릅니다 (LANDMARK_DETECTOR 불일치)")
+
+    regressions = []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        change = result["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        mark = "REGRESSION" if change > threshold else ""
+        print(f"{key:45s} {base['p50_ms']:10.3f} -> {result['p50_ms']:10.3f} ms  {change:+7.1%} {mark}")
+        if mark:
+            regressions.append(key)
+    return regressions
+
+
+def _print_table(results: dict):
+    print(f"{'benchmark':45s} {'p50':>10s} {'p95':>10s} {'p99':>10s} {'ops/s':>9s} {'alloc MB':>9s}")
+    for key, r in results.items():
+        print(f"{key:45s} {r['p50_ms']:10.3f} {r['p95_ms']:10.3f} {r['p99_ms']:10.3f} "
+              f"{r['throughput_per_s']:9.2f} {r['peak_alloc_mb']:9.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="FAIcial 분석 파이프라인 벤치마크")
+    parser.add_argument("--corpus", default="test_images", help="얼굴 이미지 폴더")
+    parser.add_argument("--sides", type=int, nargs="+", default=list(DEFAULT_SIDES), help="긴 변 해상도 목록")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="이미지·함수별 측정 횟수")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="측정 전 예열 실행 횟수")
+    parser.add_argument("--only", nargs="+", help="지정한 벤치마크만 실행 (예: detect_landmarks analyze_endpoint)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/<시각>.json)")
+    parser.add_argument("--baseline", help="비교할 기준선 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀 판단 p50 증가율")
+    parser.add_argument("--detector", help="랜드마크 검출 백엔드 (LANDMARK_DETECTOR, 예: facemesh / landmarker / stub)")
+    args = parser.parse_args(argv)
+
+    # 검출 백엔드는 analyzer import 시점에 정해지므로 run() 전에 설정
+    if args.detector:
+        os.environ["LANDMARK_DETECTOR"] = args.detector
+
+    result = run(args.corpus, tuple(args.sides), args.repeat, args.warmup, args.only)
+    _print_table(result["results"])
+    print(f"peak RSS (process): {result['meta']['peak_rss_mb']:.1f} MB")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    logger.info(f"벤치마크 결과 저장: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            logger.warning(f"성능 회귀 {len(regressions)}건: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
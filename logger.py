@@ -1,14 +1,22 @@
+import atexit
+import contextvars
 import logging
+import logging.handlers
+import multiprocessing
 import os
-from datetime import datetime
+import queue
+import random
 
-# 로그 디렉토리 생성
-log_dir = "logs"
-os.makedirs(log_dir, exist_ok=True)
+# 로그 설정 (환경 변수)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_DIR = os.environ.get("LOG_DIR", "logs")
+# 보관할 지난 로그 파일 수 (자정마다 교체, 일 단위)
+LOG_RETENTION_DAYS = int(os.environ.get("LOG_RETENTION_DAYS", "14"))
+# DEBUG 로그를 남길 요청 비율 (1이면 전부, 0.1이면 요청 10개 중 1개꼴)
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "1"))
 
-# 오늘 날짜 기반 파일명 생성
-today = datetime.now().strftime("%Y-%m-%d")
-log_file = os.path.join(log_dir, f"app_{today}.log")
+# 현재 로그는 app.log, 자정에 app.log.YYYY-MM-DD로 교체
+log_file = os.path.join(LOG_DIR, "app.log")
 
 # 로그 포맷 설정
 formatter = logging.Formatter(
@@ -16,22 +24,58 @@ formatter = logging.Formatter(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
+# 현재 요청의 DEBUG 로그 샘플링 여부 (요청 단위로 결정, 미지정 시 로그마다 결정)
+_debug_sampled = contextvars.ContextVar("debug_sampled", default=None)
+
+
+def sample_request() -> bool:
+    """요청 시작 시 호출: 이번 요청의 DEBUG 로그를 모두 남길지 한 번에 결정합니다."""
+    sampled = LOG_DEBUG_SAMPLE_RATE >= 1 or random.random() < LOG_DEBUG_SAMPLE_RATE
+    _debug_sampled.set(sampled)
+    return sampled
+
+
+class DebugSamplingFilter(logging.Filter):
+    """INFO 이상은 항상 통과, DEBUG는 샘플링된 요청의 로그만 통과시킵니다."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO or LOG_DEBUG_SAMPLE_RATE >= 1:
+            return True
+        sampled = _debug_sampled.get()
+        if sampled is None:
+            sampled = random.random() < LOG_DEBUG_SAMPLE_RATE
+        return sampled
+
+
 # 루트 로거 설정
 logger = logging.getLogger("FAIcial")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(LOG_LEVEL)
 
 # 중복 핸들러 방지
 if not logger.handlers:
-    # 파일 핸들러
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-
     # 콘솔 핸들러
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG)
     console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    # 파일 핸들러 (자정마다 교체, LOG_RETENTION_DAYS개 보관)
+    # 배치 워커 등 자식 프로세스는 같은 파일을 동시에 교체하며 충돌하므로 콘솔에만 기록
+    if multiprocessing.parent_process() is None:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when="midnight", backupCount=LOG_RETENTION_DAYS, encoding="utf-8", delay=True
+        )
+        file_handler.suffix = "%Y-%m-%d"
+        file_handler.setFormatter(formatter)
+        handlers.insert(0, file_handler)
+
+    # 요청 스레드는 큐에 넣기만 하고, 파일·콘솔 쓰기는 별도 리스너 스레드에서 처리
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter())
+    logger.addHandler(queue_handler)
 
-    # 핸들러 등록
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    # 종료 시 큐에 남은 로그를 모두 기록
+    atexit.register(listener.stop)
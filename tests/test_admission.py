@@ -0,0 +1,175 @@
+# tests/test_admission.py
+"""utils.admission.AdmissionController의 대기 순서, Retry-After, 처리 시간 평균(이동 평균·만료)을 확인합니다."""
+
+import threading
+import time
+
+import pytest
+
+from utils import admission
+from utils.admission import AdmissionController, Rejected, set_deadline
+
+
+def _wait_until(condition, timeout: float = 2.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "condition not met in time"
+        time.sleep(0.005)
+
+
+def _start_waiter(controller: AdmissionController, kind: str = "", deadline: float | None = None):
+    # 별도 스레드에서 acquire (스레드마다 기한 컨텍스트가 따로 있으므로 스레드 안에서 지정)
+    outcome = {}
+
+    def run():
+        set_deadline(deadline)
+        try:
+            controller.acquire(kind)
+            outcome["acquired"] = time.monotonic()
+        except Rejected as e:
+            outcome["rejected"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_slots_are_handed_over_in_arrival_order():
+    controller = AdmissionController(max_concurrency=1, queue_size=8, queue_timeout=5)
+    controller.acquire()
+
+    order = []
+    threads = []
+    for i in range(5):
+        def run(i=i):
+            controller.acquire()
+            order.append(i)
+            controller.release()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        threads.append(thread)
+        # 앞 요청이 대기열에 들어간 뒤 다음 요청을 시작하여 도착 순서를 고정
+        _wait_until(lambda: controller.stats()["queued"] == i + 1)
+
+    controller.release()
+    for thread in threads:
+        thread.join(2)
+    assert order == [0, 1, 2, 3, 4]
+    assert controller.stats()["active"] == 0
+
+
+def test_full_queue_is_rejected_with_429():
+    controller = AdmissionController(max_concurrency=1, queue_size=1, queue_timeout=5)
+    controller.acquire()
+    thread, _ = _start_waiter(controller)
+    _wait_until(lambda: controller.stats()["queued"] == 1)
+
+    with pytest.raises(Rejected) as excinfo:
+        controller.acquire()
+    assert (excinfo.value.reason, excinfo.value.status) == ("queue_full", 429)
+    assert excinfo.value.retry_after >= 1
+
+    controller.release()
+    thread.join(2)
+    controller.release()
+
+
+def test_queue_timeout_is_rejected_with_503():
+    controller = AdmissionController(max_concurrency=1, queue_size=4, queue_timeout=0.05)
+    controller.acquire()
+    thread, outcome = _start_waiter(controller)
+    thread.join(2)
+
+    assert (outcome["rejected"].reason, outcome["rejected"].status) == ("queue_timeout", 503)
+    assert controller.stats()["queued"] == 0
+    controller.release()
+
+
+def test_retry_after_scales_with_queue_and_service_time():
+    controller = AdmissionController(max_concurrency=2, queue_size=8, queue_timeout=5)
+    # 기록이 없으면 최소 1초
+    assert controller.retry_after("analyze") == 1
+
+    controller.acquire("analyze")
+    controller.release("analyze", elapsed=4.0)
+    # 대기 0건: 4초 * 1 / 동시 실행 2
+    assert controller.retry_after("analyze") == 2
+    # 기록이 없는 종류는 다른 종류의 평균 중 가장 긴 값을 사용
+    assert controller.retry_after("stream_frame") == 2
+
+    controller.acquire("analyze")
+    controller.acquire("analyze")
+    threads = [_start_waiter(controller, "analyze")[0] for _ in range(2)]
+    _wait_until(lambda: controller.stats()["queued"] == 2)
+    # 대기 2건: 4초 * 3 / 2
+    assert controller.retry_after("analyze") == 6
+
+    controller.release("analyze", elapsed=1000.0)
+    assert controller.retry_after("analyze") == admission._MAX_RETRY_AFTER
+    for _ in range(3):
+        controller.release()
+    for thread in threads:
+        thread.join(2)
+
+
+def test_service_time_is_an_exponential_moving_average():
+    controller = AdmissionController()
+    for elapsed in (1.0, 2.0, 2.0):
+        controller.acquire("analyze")
+        controller.release("analyze", elapsed=elapsed)
+
+    a = admission._SERVICE_TIME_ALPHA
+    expected = a * 2.0 + (1 - a) * (a * 2.0 + (1 - a) * 1.0)
+    assert controller.expected_time("analyze") == pytest.approx(expected)
+    # 실패·중단된 요청(elapsed=None)은 평균에 반영하지 않음
+    controller.acquire("analyze")
+    controller.release("analyze")
+    assert controller.expected_time("analyze") == pytest.approx(expected)
+    assert controller.expected_time("analyze_batch") == 0.0
+
+
+def test_stale_service_time_expires_and_restarts(monkeypatch):
+    controller = AdmissionController()
+    controller.acquire("analyze")
+    controller.release("analyze", elapsed=20.0)
+    assert controller.expected_time("analyze") == pytest.approx(20.0)
+
+    # ADMISSION_SERVICE_TIME_TTL이 지난 평균은 버리고, 다음 기록으로 새로 시작
+    monkeypatch.setattr(admission, "ADMISSION_SERVICE_TIME_TTL", -1.0)
+    assert controller.expected_time("analyze") == 0.0
+    assert controller.retry_after("analyze") == 1
+    controller.acquire("analyze")
+    controller.release("analyze", elapsed=0.5)
+    monkeypatch.setattr(admission, "ADMISSION_SERVICE_TIME_TTL", 300.0)
+    assert controller.expected_time("analyze") == pytest.approx(0.5)
+
+
+def test_waiter_is_rejected_when_deadline_leaves_no_time_for_processing():
+    controller = AdmissionController(max_concurrency=1, queue_size=4, queue_timeout=10)
+    controller.acquire("analyze")
+    controller.release("analyze", elapsed=1.0)
+    controller.acquire("analyze")
+
+    # 기한 1.2초 - 평균 처리 시간 1초 = 약 0.2초만 기다린 뒤 거절
+    start = time.monotonic()
+    thread, outcome = _start_waiter(controller, "analyze", deadline=1.2)
+    thread.join(2)
+    assert (outcome["rejected"].reason, outcome["rejected"].status) == ("deadline", 503)
+    assert time.monotonic() - start < 1.0
+    controller.release()
+
+
+def test_inflated_service_time_does_not_lock_out_requests():
+    # 평균 처리 시간이 기한 전체보다 길어도 (기한 초과 요청으로 부풀려진 경우 등) 모든 요청을 거절하지 않음
+    controller = AdmissionController(max_concurrency=1, queue_size=4, queue_timeout=5)
+    controller.acquire("analyze")
+    controller.release("analyze", elapsed=60.0)
+    controller.acquire("analyze")
+
+    thread, outcome = _start_waiter(controller, "analyze", deadline=30)
+    _wait_until(lambda: controller.stats()["queued"] == 1)
+    controller.release("analyze")
+    thread.join(2)
+    assert "acquired" in outcome
+    controller.release()
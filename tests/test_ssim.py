@@ -0,0 +1,38 @@
+# tests/test_ssim.py
+"""analyzer.ssim이 skimage.metrics.structural_similarity와 같은 값을 내는지 확인합니다."""
+
+import numpy as np
+import pytest
+
+metrics = pytest.importorskip("skimage.metrics")
+
+from analyzer.ssim import ssim, ssim_pairs
+
+
+def _pairs():
+    # 크기·내용이 다른 uint8 그레이스케일 쌍 (무작위, 노이즈 추가, 동일 이미지, 최소 크기, 평탄한 이미지)
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (64, 48), dtype=np.uint8)
+    noisy = np.clip(base + rng.normal(0, 20, base.shape), 0, 255).astype(np.uint8)
+    return [
+        (base, noisy),
+        (base, base),
+        (rng.integers(0, 256, (7, 7), dtype=np.uint8), rng.integers(0, 256, (7, 7), dtype=np.uint8)),
+        (np.full((20, 31), 128, dtype=np.uint8), rng.integers(0, 256, (20, 31), dtype=np.uint8)),
+    ]
+
+
+@pytest.mark.parametrize("img1, img2", _pairs())
+def test_ssim_matches_skimage(img1, img2):
+    assert ssim(img1, img2) == pytest.approx(metrics.structural_similarity(img1, img2), abs=1e-9)
+
+
+def test_ssim_pairs_matches_skimage():
+    pairs = _pairs()
+    expected = [metrics.structural_similarity(img1, img2) for img1, img2 in pairs]
+    assert ssim_pairs(pairs) == pytest.approx(expected, abs=1e-9)
+
+
+def test_ssim_rejects_mismatched_shapes():
+    with pytest.raises(ValueError):
+        ssim(np.zeros((8, 8), np.uint8), np.zeros((8, 9), np.uint8))
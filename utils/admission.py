@@ -0,0 +1,173 @@
+# utils/admission.py
+
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from utils.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH
+
+# 동시에 실행할 분석 요청 수 (기본값은 FaceMesh 풀 크기와 같게)
+ADMISSION_MAX_CONCURRENCY = int(os.environ.get("ADMISSION_MAX_CONCURRENCY", "4"))
+# 실행 슬롯을 기다릴 수 있는 요청 수 (넘으면 즉시 429)
+ADMISSION_QUEUE_SIZE = int(os.environ.get("ADMISSION_QUEUE_SIZE", "16"))
+# 대기열에서 기다리는 최대 시간(초) (넘으면 503)
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "10"))
+# 요청 처리 기한(초), 0이면 기한 없음. 요청 헤더 X-Request-Timeout으로 더 짧게 지정 가능
+REQUEST_DEADLINE = float(os.environ.get("REQUEST_DEADLINE", "30"))
+# 배치(최대 BATCH_MAX_IMAGES장)·동영상 요청은 처리할 항목이 많아 별도 기한(초) 적용, 0이면 기한 없음
+BATCH_REQUEST_DEADLINE = float(os.environ.get("BATCH_REQUEST_DEADLINE", "120"))
+VIDEO_REQUEST_DEADLINE = float(os.environ.get("VIDEO_REQUEST_DEADLINE", "120"))
+# 작업 종류별 처리 기한 (없는 종류는 REQUEST_DEADLINE)
+REQUEST_DEADLINES = {"analyze_batch": BATCH_REQUEST_DEADLINE, "analyze_video": VIDEO_REQUEST_DEADLINE}
+# 이 시간(초) 동안 새 기록이 없으면 처리 시간 평균을 버림 (한때 느렸던 기록이 계속 거절을 일으키지 않도록)
+ADMISSION_SERVICE_TIME_TTL = float(os.environ.get("ADMISSION_SERVICE_TIME_TTL", "300"))
+
+# 처리 시간 이동 평균 가중치 (Retry-After·기한 내 완료 가능 여부 추정용)
+_SERVICE_TIME_ALPHA = 0.2
+_MAX_RETRY_AFTER = 60
+
+# 현재 요청의 처리 기한 (time.monotonic 기준 절대 시각, 없으면 None)
+_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+class Rejected(Exception):
+    """대기열이 가득 찼거나 기한 내에 처리할 수 없어 요청을 거절할 때 발생합니다."""
+
+    def __init__(self, reason: str, status: int, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """처리 도중 요청 기한이 지나 남은 작업을 중단할 때 발생합니다."""
+
+
+def set_deadline(timeout: float | None) -> float | None:
+    """지금부터 timeout초 뒤를 현재 요청의 기한으로 설정합니다. (None 또는 0 이하이면 기한 없음)"""
+    deadline = time.monotonic() + timeout if timeout and timeout > 0 else None
+    _deadline.set(deadline)
+    return deadline
+
+
+def remaining() -> float | None:
+    """현재 요청 기한까지 남은 시간(초), 기한이 없으면 None"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline(stage: str = ""):
+    """단계 사이에서 호출: 기한이 지났으면 DeadlineExceeded로 남은 작업을 중단합니다."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Request deadline exceeded{' before ' + stage if stage else ''}")
+
+
+class AdmissionController:
+    """
+    분석 요청의 동시 실행 수를 제한하고, 나머지는 크기가 정해진 대기열에서 순서대로 기다리게 합니다.
+    - 대기열이 가득 차면 즉시 거절 (429)
+    - 대기 시간 초과, 또는 기다리다가 기한까지 남은 시간이 평균 처리 시간보다 짧아지면 거절 (503)
+    - 평균 처리 시간이 기한 전체보다 길면 사전 거절하지 않고 실행 중 기한 검사(check_deadline)에 맡김
+    - 슬롯이 비면 가장 오래 기다린 요청에 바로 넘겨줌 (먼저 온 순서 보장)
+    """
+
+    def __init__(self, max_concurrency: int = ADMISSION_MAX_CONCURRENCY, queue_size: int = ADMISSION_QUEUE_SIZE,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._waiters: deque[threading.Event] = deque()
+        self.active = 0
+        self._service_time: dict[str, float] = {}  # 작업 종류별 처리 시간 이동 평균(초)
+        self._sampled_at: dict[str, float] = {}    # 작업 종류별 마지막 기록 시각 (time.monotonic)
+
+    def expected_time(self, kind: str) -> float:
+        """작업 종류별 평균 처리 시간(초), 기록이 없거나 ADMISSION_SERVICE_TIME_TTL이 지났으면 0"""
+        sampled_at = self._sampled_at.get(kind)
+        if sampled_at is None or time.monotonic() - sampled_at > ADMISSION_SERVICE_TIME_TTL:
+            return 0.0
+        return self._service_time.get(kind, 0.0)
+
+    def retry_after(self, kind: str = "") -> int:
+        """대기열이 한 번 비워질 때까지의 예상 시간(초)"""
+        service_time = self.expected_time(kind) or max(map(self.expected_time, list(self._service_time)), default=0.0)
+        estimate = service_time * (len(self._waiters) + 1) / self.max_concurrency
+        return min(_MAX_RETRY_AFTER, max(1, math.ceil(estimate)))
+
+    def acquire(self, kind: str = ""):
+        """
+        실행 슬롯을 얻을 때까지 기다립니다. 얻지 못하면 Rejected가 발생합니다.
+        - kind: 작업 종류(엔드포인트), 종류별 평균 처리 시간으로 기한 내 완료 가능 여부를 판단
+        """
+        # 평균 처리 시간이 기한 전체보다 길면 (기한 초과 요청으로 부풀려진 추정치 등) 추정치를 쓰지 않음
+        expected = self.expected_time(kind)
+        left = remaining()
+        if left is not None and expected >= left:
+            expected = 0.0
+
+        with self._lock:
+            if self.active < self.max_concurrency and not self._waiters:
+                self.active += 1
+                ADMISSION_ACTIVE.inc()
+                return
+            if len(self._waiters) >= self.queue_size:
+                raise Rejected("queue_full", 429, self.retry_after(kind))
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+            ADMISSION_QUEUE_DEPTH.inc()
+
+        # 기한이 있으면 처리 시간만큼 여유를 남기고 기다림
+        timeout, reason = self.queue_timeout, "queue_timeout"
+        left = remaining()
+        if left is not None and left - expected < timeout:
+            timeout, reason = max(0.0, left - expected), "deadline"
+
+        if waiter.wait(timeout):
+            return
+        with self._lock:
+            # 시간 초과와 슬롯 전달이 겹친 경우에는 받은 슬롯을 사용
+            if waiter.is_set():
+                return
+            self._waiters.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.dec()
+            raise Rejected(reason, 503, self.retry_after(kind))
+
+    def release(self, kind: str = "", elapsed: float | None = None):
+        """실행 슬롯을 반납합니다. elapsed(초)는 작업 종류별 처리 시간 평균에 반영합니다."""
+        with self._lock:
+            if elapsed is not None:
+                # 오래된 평균은 이어 쓰지 않고 새 기록으로 다시 시작
+                previous = self.expected_time(kind) or None
+                a = _SERVICE_TIME_ALPHA
+                self._service_time[kind] = elapsed if previous is None else a * elapsed + (1 - a) * previous
+                self._sampled_at[kind] = time.monotonic()
+            if self._waiters:
+                # 활성 수는 그대로 두고 슬롯을 다음 대기 요청에 넘김
+                self._waiters.popleft().set()
+                ADMISSION_QUEUE_DEPTH.dec()
+            else:
+                self.active -= 1
+                ADMISSION_ACTIVE.dec()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active": self.active,
+                "queued": len(self._waiters),
+                "max_concurrency": self.max_concurrency,
+                "queue_size": self.queue_size,
+                "service_time": {kind: round(value, 4) for kind, value in self._service_time.items()},
+            }
+
+
+# 프로세스 전역 분석 요청 입장 제어
+admission = AdmissionController()
+# 요청이 없을 때도 /metrics에 0으로 표시
+ADMISSION_ACTIVE.inc(0)
+ADMISSION_QUEUE_DEPTH.inc(0)
@@ -1,16 +1,64 @@
 # utils/face_utils.py
 
+import json
 from typing import List, Tuple
 
-def estimate_position(landmarks: List[Tuple[float, float]], indices: List[int]) -> Tuple[int, int]:
+import numpy as np
+
+# 랜드마크 표현: (N, 2) float32 배열, 원본 이미지 기준 실수 픽셀 좌표 (x, y)
+Landmarks = np.ndarray
+
+# 클라이언트가 보낼 수 있는 랜드마크 수 (FaceMesh 기본 468개 / 홍채 포함 478개)
+LANDMARK_COUNTS = (468, 478)
+
+
+def as_landmark_array(landmarks) -> Landmarks:
+    """
+    (x, y) 튜플 리스트 또는 배열을 (N, 2) float32 랜드마크 배열로 변환합니다.
+    - 이미 float32 배열이면 복사 없이 그대로 반환합니다.
+    """
+    return np.asarray(landmarks, dtype=np.float32).reshape(-1, 2)
+
+
+def estimate_position(landmarks: Landmarks | List[Tuple[float, float]], indices: List[int]) -> Tuple[int, int]:
     """
     지정된 인덱스의 랜드마크 좌표들의 평균 위치를 계산하여 반환합니다.
-    - landmarks: (x, y) 튜플의 리스트
+    - landmarks: (N, 2) 랜드마크 배열 또는 (x, y) 튜플의 리스트
     - indices: 평균을 낼 랜드마크 인덱스 리스트
     """
-    pts = [landmarks[i] for i in indices if i < len(landmarks)]
-    if not pts:
+    landmarks = as_landmark_array(landmarks)
+    idx = np.asarray(indices, dtype=np.intp)
+    idx = idx[idx < len(landmarks)]
+    if idx.size == 0:
         return (0, 0)
-    avg_x = sum(x for x, y in pts) // len(pts)
-    avg_y = sum(y for x, y in pts) // len(pts)
-    return (avg_x, avg_y)
+    avg_x, avg_y = np.floor(landmarks[idx].mean(axis=0))
+    return (int(avg_x), int(avg_y))
+
+
+def parse_landmarks(data) -> Landmarks:
+    """
+    클라이언트가 보낸 랜드마크(JSON 문자열 또는 리스트)를 검증하여 (N, 2) 또는 (N, 3) 배열로 변환합니다.
+    - [[x, y], ...], [[x, y, z], ...], [{"x": .., "y": .., "z": ..}, ...] 형식 허용
+    - z(깊이)가 있으면 3열로 유지 (3D 대칭 계산용, 모든 점에 있을 때만)
+    - 개수(LANDMARK_COUNTS)·형태·유한값이 아니면 ValueError
+    """
+    if isinstance(data, (str, bytes)):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError:
+            raise ValueError("landmarks must be valid JSON")
+    try:
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            if all("z" in point for point in data):
+                data = [(point["x"], point["y"], point["z"]) for point in data]
+            else:
+                data = [(point["x"], point["y"]) for point in data]
+        points = np.asarray(data, dtype=np.float64)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("landmarks must be a list of [x, y] or {x, y} points")
+
+    if points.ndim != 2 or points.shape[1] not in (2, 3) or len(points) not in LANDMARK_COUNTS:
+        raise ValueError(f"landmarks must contain {' or '.join(map(str, LANDMARK_COUNTS))} points")
+    if not np.isfinite(points).all():
+        raise ValueError("landmarks must be finite numbers")
+    return points.astype(np.float32)
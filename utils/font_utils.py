@@ -0,0 +1,89 @@
+# utils/font_utils.py
+
+import os
+import sys
+
+from PIL import ImageFont
+from logger import logger
+
+# 결과 이미지용 한글 폰트 (빌드 시 `python -m utils.font_utils`로 미리 받아 둠)
+FONT_URL = os.environ.get(
+    "FONT_URL",
+    "https://github.com/notofonts/noto-cjk/raw/main/Sans/SubsetOTF/KR/NotoSansKR-Regular.otf",
+)
+FONT_PATH = os.environ.get("FONT_PATH", os.path.join("fonts", "NotoSansKR-Regular.otf"))
+
+# FONT_PATH가 없을 때 차례로 찾아볼 경로 (이전 파일명, 시스템 Noto CJK 패키지)
+FONT_CANDIDATES = [
+    FONT_PATH,
+    os.path.join("fonts", "NotoSansKR-Regular.ttf"),
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+]
+
+# TrueType / OpenType / TrueType Collection 파일 시그니처
+_FONT_MAGIC = (b"\x00\x01\x00\x00", b"OTTO", b"true", b"ttcf")
+
+_resolved_path = None
+
+
+def is_font_file(path: str) -> bool:
+    """파일 앞부분 시그니처로 실제 폰트 파일인지 확인합니다. (다운로드 실패로 저장된 HTML 등 제외)"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) in _FONT_MAGIC
+    except OSError:
+        return False
+
+
+def find_font_path() -> str | None:
+    """사용 가능한 폰트 경로를 찾습니다. 네트워크에는 접근하지 않으며 결과는 한 번만 계산합니다."""
+    global _resolved_path
+    if _resolved_path is None:
+        _resolved_path = next((path for path in FONT_CANDIDATES if is_font_file(path)), "")
+        if _resolved_path:
+            logger.info(f"결과 이미지 폰트: {_resolved_path}")
+        else:
+            logger.warning("사용 가능한 한글 폰트 없음: 기본 폰트로 대체합니다 (python -m utils.font_utils 로 설치)")
+    return _resolved_path or None
+
+
+def load_font(size: int) -> ImageFont.FreeTypeFont:
+    """지정 크기의 폰트를 로드합니다. 폰트 파일이 없으면 Pillow 기본 폰트를 사용합니다."""
+    path = find_font_path()
+    if path is None:
+        return ImageFont.load_default(size)
+    return ImageFont.truetype(path, size)
+
+
+def download_font(url: str = FONT_URL, path: str = FONT_PATH) -> str:
+    """
+    폰트를 내려받아 저장합니다. 이미지 빌드/배포 단계에서만 호출하며
+    요청 처리나 import 경로에서는 호출하지 않습니다.
+    """
+    import requests
+
+    if is_font_file(path):
+        logger.info(f"폰트가 이미 설치되어 있음: {path}")
+        return path
+
+    resp = requests.get(url, timeout=60)
+    resp.raise_for_status()
+    if resp.content[:4] not in _FONT_MAGIC:
+        raise ValueError(f"Downloaded file is not a font: {url}")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(resp.content)
+    os.replace(tmp_path, path)
+    logger.info(f"폰트 다운로드 완료: {path}")
+    return path
+
+
+if __name__ == "__main__":
+    try:
+        download_font()
+    except Exception as e:
+        logger.error(f"폰트 다운로드 실패: {e}")
+        sys.exit(1)
@@ -1,14 +1,96 @@
 import base64
 import io
+import os
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
-def encode_image_to_base64(image: Image.Image) -> str:
+# 지원 출력 포맷 → (PIL 포맷 이름, MIME 타입)
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+FORMAT_ALIASES = {"jpg": "jpeg"}
+
+# 기본 출력 설정 (요청에서 지정하지 않은 경우)
+DEFAULT_IMAGE_FORMAT = os.environ.get("IMAGE_FORMAT", "png")
+DEFAULT_IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", "90"))
+DEFAULT_PNG_COMPRESS_LEVEL = int(os.environ.get("PNG_COMPRESS_LEVEL", "6"))
+
+# 인코딩 전용 스레드 풀 (PIL 인코더는 GIL을 풀고 실행되므로 병렬 처리 가능)
+ENCODER_THREADS = int(os.environ.get("ENCODER_THREADS", "4"))
+_encoder_pool = ThreadPoolExecutor(max_workers=ENCODER_THREADS, thread_name_prefix="encoder")
+
+
+class EncodeOptions:
     """
-    PIL Image 객체를 받아 PNG 형식으로 바이트 버퍼에 저장한 뒤
-    Base64로 인코딩하여 data URI 문자열로 반환합니다.
+    이미지 출력 포맷 설정입니다.
+    - fmt: png / jpeg / webp
+    - quality: jpeg, webp 품질 (1~100)
+    - compress_level: png 압축 레벨 (0~9, 낮을수록 빠름)
     """
+
+    def __init__(self, fmt: str = DEFAULT_IMAGE_FORMAT, quality: int | None = None, compress_level: int | None = None):
+        fmt = FORMAT_ALIASES.get(fmt.lower(), fmt.lower())
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {fmt}")
+        quality = DEFAULT_IMAGE_QUALITY if quality is None else int(quality)
+        compress_level = DEFAULT_PNG_COMPRESS_LEVEL if compress_level is None else int(compress_level)
+        if not 1 <= quality <= 100:
+            raise ValueError("quality must be an integer between 1 and 100")
+        if not 0 <= compress_level <= 9:
+            raise ValueError("compress_level must be an integer between 0 and 9")
+
+        self.fmt = fmt
+        self.quality = quality
+        self.compress_level = compress_level
+
+    @property
+    def mime_type(self) -> str:
+        return IMAGE_FORMATS[self.fmt][1]
+
+    def cache_settings(self) -> dict:
+        # 결과 캐시 키에 포함할 값
+        return {"image_format": self.fmt, "quality": self.quality, "compress_level": self.compress_level}
+
+
+PNG_OPTIONS = EncodeOptions("png")
+
+
+def encode_image(image: Image.Image, options: EncodeOptions = PNG_OPTIONS) -> bytes:
+    """PIL Image 객체를 지정한 포맷의 바이트로 인코딩합니다."""
+    pil_format = IMAGE_FORMATS[options.fmt][0]
+    params = {}
+    if options.fmt == "png":
+        params["compress_level"] = options.compress_level
+    else:
+        params["quality"] = options.quality
+        if options.fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            # JPEG는 알파 채널을 지원하지 않음
+            image = image.convert("RGB")
+
     buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    img_bytes = buffer.getvalue()
-    img_str = base64.b64encode(img_bytes).decode("utf-8")
-    return f"data:image/png;base64,{img_str}"
+    image.save(buffer, format=pil_format, **params)
+    return buffer.getvalue()
+
+
+def to_data_uri(data: bytes, mime_type: str) -> str:
+    img_str = base64.b64encode(data).decode("utf-8")
+    return f"data:{mime_type};base64,{img_str}"
+
+
+def encode_image_to_base64(image: Image.Image, options: EncodeOptions = PNG_OPTIONS) -> str:
+    """
+    PIL Image 객체를 받아 지정한 포맷(기본 PNG)으로 바이트 버퍼에 저장한 뒤
+    Base64로 인코딩하여 data URI 문자열로 반환합니다.
+    """
+    return to_data_uri(encode_image(image, options), options.mime_type)
+
+
+def encode_images(images: dict[str, Image.Image], options: EncodeOptions = PNG_OPTIONS) -> dict[str, bytes]:
+    """
+    여러 이미지를 인코딩 스레드 풀에서 병렬로 인코딩합니다.
+    요청 스레드는 결과를 기다리기만 하므로 인코딩이 요청 스레드를 점유하지 않습니다.
+    """
+    futures = {name: _encoder_pool.submit(encode_image, image, options) for name, image in images.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,250 @@
+# utils/job_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from logger import logger
+
+# 작업 저장소: "memory"(기본) 또는 "sqlite:<경로>" (예: sqlite:data/jobs.db)
+JOB_STORE = os.environ.get("JOB_STORE", "memory")
+
+# 작업 상태
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+# 작업 레코드 필드 (result는 JSON으로 직렬화 가능한 dict)
+JOB_FIELDS = ("id", "kind", "status", "created_at", "started_at", "finished_at", "expires_at", "result", "error")
+
+
+class JobStore(ABC):
+    """
+    비동기 작업 레코드와 결과 이미지를 보관하는 저장소 인터페이스입니다.
+    - 레코드는 dict (JOB_FIELDS), 결과 이미지는 (이름 → 바이트, MIME 타입)으로 따로 저장
+    - 모든 메서드는 여러 스레드에서 동시에 호출될 수 있습니다.
+    """
+
+    @abstractmethod
+    def create(self, job: dict):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, job_id: str, **fields):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put_images(self, job_id: str, images: dict[str, bytes], mime_type: str) -> bool:
+        """작업이 남아 있으면 이미지를 저장하고 True, 이미 삭제되었으면 저장하지 않고 False를 반환합니다. (확인과 저장은 원자적)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_image(self, job_id: str, name: str) -> tuple[bytes, str] | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, job_id: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def purge_expired(self, now: float) -> int:
+        """만료 시각이 지난 완료·실패 작업을 이미지와 함께 삭제하고 삭제 수를 반환합니다."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail_unfinished(self, error: str) -> int:
+        """재시작 등으로 중단된 대기·실행 중 작업을 실패로 표시하고 그 수를 반환합니다."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self) -> dict[str, int]:
+        """상태별 작업 수"""
+        raise NotImplementedError
+
+
+class MemoryJobStore(JobStore):
+    """프로세스 메모리에 보관하는 저장소 (재시작하면 사라짐)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict] = {}
+        self._images: dict[str, dict[str, tuple[bytes, str]]] = {}
+
+    def create(self, job: dict):
+        with self._lock:
+            self._jobs[job["id"]] = {field: job.get(field) for field in JOB_FIELDS}
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def put_images(self, job_id: str, images: dict[str, bytes], mime_type: str) -> bool:
+        with self._lock:
+            if job_id not in self._jobs:
+                return False
+            self._images[job_id] = {name: (data, mime_type) for name, data in images.items()}
+            return True
+
+    def get_image(self, job_id: str, name: str) -> tuple[bytes, str] | None:
+        with self._lock:
+            return self._images.get(job_id, {}).get(name)
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            self._images.pop(job_id, None)
+            return self._jobs.pop(job_id, None) is not None
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["status"] in FINISHED and job["expires_at"] is not None and job["expires_at"] <= now
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+                self._images.pop(job_id, None)
+        return len(expired)
+
+    def fail_unfinished(self, error: str) -> int:
+        # 메모리 저장소는 재시작 시 비어 있으므로 중단된 작업이 없음
+        return 0
+
+    def count(self) -> dict[str, int]:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+
+class SQLiteJobStore(JobStore):
+    """
+    로컬 SQLite 파일에 보관하는 저장소입니다.
+    - 재시작 후에도 완료된 작업 결과를 조회할 수 있음 (만료 전까지)
+    - 연결 1개를 lock으로 보호하여 공유 (WAL 모드)
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT, status TEXT NOT NULL,"
+                " created_at REAL, started_at REAL, finished_at REAL, expires_at REAL,"
+                " result TEXT, error TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_images ("
+                " job_id TEXT NOT NULL, name TEXT NOT NULL, mime_type TEXT NOT NULL, data BLOB NOT NULL,"
+                " PRIMARY KEY (job_id, name))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at)")
+
+    @staticmethod
+    def _encode(field: str, value):
+        return json.dumps(value, ensure_ascii=False) if field == "result" and value is not None else value
+
+    def create(self, job: dict):
+        values = [self._encode(field, job.get(field)) for field in JOB_FIELDS]
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(JOB_FIELDS)}) VALUES ({', '.join('?' * len(JOB_FIELDS))})", values
+            )
+
+    def update(self, job_id: str, **fields):
+        names = [name for name in fields if name in JOB_FIELDS and name != "id"]
+        if not names:
+            return
+        values = [self._encode(name, fields[name]) for name in names]
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in names)} WHERE id = ?", values + [job_id]
+            )
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_FIELDS, row))
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def put_images(self, job_id: str, images: dict[str, bytes], mime_type: str) -> bool:
+        rows = [(job_id, name, mime_type, data) for name, data in images.items()]
+        with self._lock:
+            # 작업 존재 확인과 이미지 저장을 한 트랜잭션으로 묶어 삭제와 경합해도 고아 이미지가 남지 않게 함
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO job_images (job_id, name, mime_type, data) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def get_image(self, job_id: str, name: str) -> tuple[bytes, str] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, mime_type FROM job_images WHERE job_id = ? AND name = ?", (job_id, name)
+            ).fetchone()
+        return (bytes(row[0]), row[1]) if row is not None else None
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            self._conn.execute("DELETE FROM job_images WHERE job_id = ?", (job_id,))
+            return self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount > 0
+
+    def purge_expired(self, now: float) -> int:
+        condition = f"status IN ({', '.join('?' * len(FINISHED))}) AND expires_at <= ?"
+        params = (*FINISHED, now)
+        with self._lock:
+            self._conn.execute(f"DELETE FROM job_images WHERE job_id IN (SELECT id FROM jobs WHERE {condition})", params)
+            return self._conn.execute(f"DELETE FROM jobs WHERE {condition}", params).rowcount
+
+    def fail_unfinished(self, error: str) -> int:
+        now = time.time()
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?)",
+                (FAILED, error, now, QUEUED, RUNNING),
+            ).rowcount
+
+    def count(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+def create_job_store(spec: str = JOB_STORE) -> JobStore:
+    """설정 문자열로 저장소를 생성합니다. ("memory" / "sqlite:<경로>")"""
+    if spec.startswith("sqlite:"):
+        path = spec.split(":", 1)[1] or os.path.join("data", "jobs.db")
+        logger.info(f"작업 저장소: SQLite ({path})")
+        return SQLiteJobStore(path)
+    if spec != "memory":
+        raise ValueError(f"Unknown JOB_STORE: {spec}")
+    return MemoryJobStore()
@@ -0,0 +1,36 @@
+# utils/lazy_import.py
+
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    처음 속성에 접근할 때 실제 모듈을 import하는 대리 객체입니다.
+    - import 비용이 큰 모듈(cv2 등)을 모듈 수준에서 `cv2 = lazy_module("cv2")`로 선언해 두면
+      app import나 /healthz는 이를 로드하지 않고, 예열 또는 첫 사용 시점에 한 번만 로드됩니다.
+    - 로드 후에는 모듈 속성을 대리 객체에 복사하여 이후 접근은 일반 속성 조회와 같은 비용
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_lock"] = threading.Lock()
+
+    def load(self):
+        """실제 모듈을 로드하여 반환합니다. (예열 단계에서 명시적으로 호출 가능)"""
+        with self._lock:
+            module = importlib.import_module(self._name)
+            self.__dict__.update(vars(module))
+        return module
+
+    def __getattr__(self, attr: str):
+        # 아직 복사되지 않은 속성에 접근할 때만 호출됨
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """name 모듈을 처음 사용할 때 import하는 대리 객체를 반환합니다."""
+    return LazyModule(name)
@@ -0,0 +1,195 @@
+# utils/metrics.py
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+# 히스토그램(단계별 지연, 이미지 크기) 기록 여부 (0이면 카운터·게이지만 유지)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+# 기본 버킷
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+IMAGE_BYTES_BUCKETS = tuple(2 ** p * 1024 for p in range(4, 16, 2))          # 16KB ~ 32MB
+IMAGE_PIXELS_BUCKETS = (0.1e6, 0.3e6, 1e6, 2e6, 4e6, 8e6, 16e6, 32e6)
+
+
+def _escape_label_value(value) -> str:
+    # Prometheus 텍스트 형식: 라벨 값의 역슬래시, 큰따옴표, 줄바꿈은 이스케이프
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터 (요청 수, 오류 수)"""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> float:
+        key = self._key(labels)
+        with self._lock:
+            value = self._values.get(key, 0) + amount
+            self._values[key] = value
+        return value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """증감 가능한 현재 값 (처리 중 요청 수)"""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> float:
+        return self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """버킷별 관측 수와 합계를 보관하는 히스토그램 (지연 시간, 이미지 크기)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [버킷별 관측 수(마지막은 +Inf), 합계, 개수]
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, **labels):
+        """with 블록 실행 시간을 기록합니다. 기록이 꺼져 있으면 빈 컨텍스트를 반환합니다."""
+        if not METRICS_ENABLED:
+            return nullcontext()
+        return self._timer(labels)
+
+    @contextmanager
+    def _timer(self, labels: dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, [list(entry[0]), entry[1], entry[2]]) for key, entry in self._values.items())
+
+        lines = self._header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(float(bound))
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """프로세스 전역 지표 모음입니다. render()는 Prometheus 텍스트 형식을 반환합니다."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+CALLS = registry.register(Counter(
+    "faicial_calls_total", "Endpoint calls received.", ("endpoint",)))
+REQUESTS = registry.register(Counter(
+    "faicial_requests_total", "Handled HTTP requests by status code.", ("endpoint", "status")))
+ERRORS = registry.register(Counter(
+    "faicial_errors_total", "Request errors by type.", ("endpoint", "type")))
+IN_FLIGHT = registry.register(Gauge(
+    "faicial_requests_in_flight", "Requests currently being processed.", ("endpoint",)))
+REQUEST_SECONDS = registry.register(Histogram(
+    "faicial_request_seconds", "End-to-end request latency.", ("endpoint",)))
+STAGE_SECONDS = registry.register(Histogram(
+    "faicial_stage_seconds", "Pipeline stage latency.", ("stage",)))
+ADMISSION_ACTIVE = registry.register(Gauge(
+    "faicial_admission_active", "Analysis requests holding an execution slot."))
+ADMISSION_QUEUE_DEPTH = registry.register(Gauge(
+    "faicial_admission_queue_depth", "Analysis requests waiting for an execution slot."))
+SHED = registry.register(Counter(
+    "faicial_shed_total", "Requests rejected or abandoned by admission control.", ("endpoint", "reason")))
+JOBS = registry.register(Counter(
+    "faicial_jobs_total", "Finished asynchronous jobs by status.", ("status",)))
+JOBS_PENDING = registry.register(Gauge(
+    "faicial_jobs_pending", "Asynchronous jobs queued or running."))
+CLIENT_LANDMARKS = registry.register(Counter(
+    "faicial_client_landmarks_total", "Client-supplied landmark sets by outcome.", ("result",)))
+IMAGE_BYTES = registry.register(Histogram(
+    "faicial_image_bytes", "Uploaded image size in bytes.", buckets=IMAGE_BYTES_BUCKETS))
+IMAGE_PIXELS = registry.register(Histogram(
+    "faicial_image_pixels", "Decoded image size in pixels.", buckets=IMAGE_PIXELS_BUCKETS))
+
+
+def stage_timer(stage: str):
+    """
+    파이프라인 단계 실행 시간을 faicial_stage_seconds에 기록합니다.
+    단계: decode / detect / align / symmetry / crop / ssim / render / encode
+    """
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def record_error(endpoint: str, error) -> None:
+    """오류 종류(예외 클래스 이름 또는 문자열)별로 오류 수를 기록합니다."""
+    error_type = error if isinstance(error, str) else type(error).__name__
+    ERRORS.inc(endpoint=endpoint, type=error_type)
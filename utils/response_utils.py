@@ -0,0 +1,37 @@
+# utils/response_utils.py
+
+import json
+import uuid
+
+from flask import Response
+
+
+def multipart_response(payload: dict, files: dict[str, tuple[bytes, str]]) -> Response:
+    """
+    JSON 점수와 원본 이미지 바이트를 함께 담은 multipart/mixed 응답을 생성합니다.
+    - 첫 번째 파트: application/json (payload)
+    - 이후 파트: 이미지 바이트 (Content-Disposition의 name으로 구분)
+    Base64 인코딩이 없으므로 JSON + data URI 방식보다 전송량이 약 25% 줄어듭니다.
+    """
+    boundary = uuid.uuid4().hex
+    delimiter = f"--{boundary}\r\n".encode("ascii")
+
+    chunks = [
+        delimiter,
+        b"Content-Type: application/json; charset=utf-8\r\n",
+        b'Content-Disposition: inline; name="result"\r\n\r\n',
+        json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+        b"\r\n",
+    ]
+    for name, (data, mime_type) in files.items():
+        chunks += [
+            delimiter,
+            f"Content-Type: {mime_type}\r\n".encode("ascii"),
+            f'Content-Disposition: attachment; name="{name}"\r\n'.encode("ascii"),
+            f"Content-Length: {len(data)}\r\n\r\n".encode("ascii"),
+            data,
+            b"\r\n",
+        ]
+    chunks.append(f"--{boundary}--\r\n".encode("ascii"))
+
+    return Response(b"".join(chunks), mimetype=f"multipart/mixed; boundary={boundary}")
@@ -0,0 +1,136 @@
+# utils/result_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from logger import logger
+
+# 메모리 캐시 용량 (바이트) 및 디스크 캐시 경로 (비워 두면 디스크 캐시 미사용)
+CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "")
+
+# 응답 형식이나 점수 계산 방식이 바뀌면 올려서 이전 버전의 캐시 항목(특히 디스크)을 쓰지 않게 함
+RESULT_SCHEMA_VERSION = 2
+
+
+def make_cache_key(image_bytes: bytes, **settings) -> str:
+    """
+    업로드 이미지 바이트와 결과에 영향을 주는 설정값으로 캐시 키를 생성합니다.
+    - 같은 사진을 같은 설정으로 다시 올리면 같은 키가 생성됩니다.
+    - 결과 형식 버전(RESULT_SCHEMA_VERSION)이 다르면 다른 키가 생성됩니다.
+    """
+    digest = hashlib.sha256(image_bytes)
+    digest.update(f"|schema={RESULT_SCHEMA_VERSION}".encode("utf-8"))
+    for name in sorted(settings):
+        digest.update(f"|{name}={settings[name]}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    분석 결과(랜드마크, 점수, 거리, 인코딩된 이미지)를 보관하는 2단 캐시입니다.
+    - 메모리: 바이트 용량 한도 내에서 LRU 방식으로 제거
+    - 디스크(선택): JSON 파일로 저장하여 재시작 후에도 유지
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, cache_dir: str = CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir or None
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[dict, int]] = OrderedDict()
+        self._current_bytes = 0
+        self._counters = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 or self.cache_dir is not None
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _store(self, key: str, entry: dict, size: int):
+        # 호출 측에서 lock을 잡은 상태로 호출
+        if key in self._entries:
+            _, old_size = self._entries.pop(key)
+            self._current_bytes -= old_size
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (entry, size)
+        self._current_bytes += size
+        while self._current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._current_bytes -= evicted_size
+            self._counters["evictions"] += 1
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return self._entries[key][0]
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    data = f.read()
+                entry = json.loads(data)
+            except FileNotFoundError:
+                entry = None
+            except (OSError, ValueError):
+                logger.warning(f"디스크 캐시 읽기 실패: {key}")
+                entry = None
+
+            if entry is not None:
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                    self._store(key, entry, len(data))
+                return entry
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key: str, entry: dict):
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._store(key, entry, len(data))
+
+        if self.cache_dir:
+            # 임시 파일에 쓴 뒤 교체하여 중간 상태 파일이 읽히지 않도록 함
+            tmp_path = f"{self._disk_path(key)}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._disk_path(key))
+            except OSError:
+                logger.warning(f"디스크 캐시 쓰기 실패: {key}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "disk": bool(self.cache_dir),
+            }
+
+
+# 프로세스 전역 결과 캐시
+result_cache = ResultCache()
@@ -1,5 +1,80 @@
-from PIL import Image, ImageDraw
-from typing import List, Tuple
+
+import numpy as np
+from functools import lru_cache
+from PIL import Image, ImageColor
+from typing import List, Sequence, Tuple
+from utils.lazy_import import lazy_module
+
+cv2 = lazy_module("cv2")
+
+# 점 레이어: (좌표 배열 (N, 2), 색상, 반지름)
+PointLayer = Tuple[np.ndarray, str, int]
+
+@lru_cache(maxsize=32)
+def _disc_offsets(radius: int) -> np.ndarray:
+    """반지름 radius인 원 안의 (dx, dy) 오프셋 목록 (M, 2)"""
+    r = max(int(radius), 0)
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    inside = dx * dx + dy * dy <= r * r + r  # PIL ellipse와 비슷한 외곽선
+    return np.stack([dx[inside], dy[inside]], axis=1).astype(np.int32)
+
+def stamp_points(canvas: np.ndarray, points, color, radius: int) -> np.ndarray:
+    """
+    canvas(H x W x C, uint8) 위에 모든 점을 한 번에 찍습니다. (제자리 수정)
+    - 점마다 원을 그리는 대신, 원 오프셋을 모든 점에 브로드캐스트하여 픽셀 좌표를 만들고 한 번에 대입
+    - 색상은 불투명이므로 오버레이·합성 없이 바로 씁니다.
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+    if len(points) == 0:
+        return canvas
+
+    h, w = canvas.shape[:2]
+    centers = np.rint(points).astype(np.int32)
+    pixels = (centers[:, None, :] + _disc_offsets(radius)[None, :, :]).reshape(-1, 2)
+    inside = (pixels[:, 0] >= 0) & (pixels[:, 0] < w) & (pixels[:, 1] >= 0) & (pixels[:, 1] < h)
+    pixels = pixels[inside]
+
+    rgba = ImageColor.getrgb(color) if isinstance(color, str) else tuple(color)
+    value = (tuple(rgba[:3]) + (255,))[:canvas.shape[2]]
+    canvas[pixels[:, 1], pixels[:, 0]] = value
+    return canvas
+
+def _resize_for_preview(image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    # 정수 배율 INTER_AREA(빠른 경로)로 먼저 줄인 뒤 남은 배율만 선형 보간
+    h, w = image.shape[:2]
+    factor = w // size[0]
+    if factor > 1:
+        image = cv2.resize(image, (w // factor, h // factor), interpolation=cv2.INTER_AREA)
+    return cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
+
+def render_landmark_overlay(
+    image_rgb: np.ndarray,
+    layers: Sequence[PointLayer],
+    max_side: int = 0
+) -> Image.Image:
+    """
+    디버깅용: 원본 RGB 배열 위에 여러 점 레이어를 한 장의 캔버스에 한 번에 찍어 반환합니다.
+
+    Args:
+        image_rgb: 원본 RGB 배열 (H, W, 3), 수정하지 않음
+        layers: [(랜드마크 좌표 (N, 2), 색상, 반지름), ...] — 뒤 레이어가 위에 그려짐
+        max_side: 출력 이미지 최대 변 길이 (0이면 원본 크기). 좌표는 함께 축소, 반지름은 출력 픽셀 기준
+
+    Returns:
+        랜드마크가 찍힌 RGB PIL Image 객체
+    """
+    h, w = image_rgb.shape[:2]
+    scale = 1.0
+    if max_side and max(h, w) > max_side:
+        # 미리보기 해상도로 먼저 축소하여 큰 버퍼를 만들지 않음
+        scale = max_side / max(h, w)
+        canvas = _resize_for_preview(image_rgb, (max(1, round(w * scale)), max(1, round(h * scale))))
+    else:
+        canvas = image_rgb.copy()
+
+    for points, color, radius in layers:
+        stamp_points(canvas, np.asarray(points, dtype=np.float32) * np.float32(scale), color, radius)
+    return Image.fromarray(canvas, "RGB")
 
 def draw_landmark_points(
     image: Image.Image,
@@ -8,29 +83,19 @@ def draw_landmark_points(
     radius: int = 3
 ) -> Image.Image:
     """
-    디버깅용: PIL Image 위에 랜드마크 좌표마다 작은 원(circle)을 그려 반환합니다.
+    디버깅용: PIL Image 위에 랜드마크 좌표마다 작은 원(circle)을 찍어 반환합니다.
 
     Args:
         image: PIL Image 객체 (RGBA 모드 권장)
-        landmarks: [(x, y), ...] 형태의 랜드마크 좌표 리스트
+        landmarks: (N, 2) 랜드마크 배열 또는 [(x, y), ...] 좌표 리스트
         color: 원의 색상 (기본 'lime')
         radius: 원의 반지름(px) (기본값 3)
 
     Returns:
-        랜드마크가 오버레이된 새로운 PIL Image 객체
+        랜드마크가 찍힌 새로운 RGBA PIL Image 객체
     """
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
-
-    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
-
-    for x, y in landmarks:
-        left_up = (x - radius, y - radius)
-        right_down = (x + radius, y + radius)
-        draw.ellipse([left_up, right_down], fill=color)
-
-    return Image.alpha_composite(image, overlay)
+    canvas = np.array(image.convert("RGBA"))
+    return Image.fromarray(stamp_points(canvas, landmarks, color, radius), "RGBA")
 
 def draw_specific_points(
     image: Image.Image,
@@ -44,25 +109,14 @@ def draw_specific_points(
 
     Args:
         image: PIL Image 객체 (RGBA 모드 권장)
-        landmarks: [(x, y), ...] 형태의 랜드마크 좌표 리스트
+        landmarks: (N, 2) 랜드마크 배열 또는 [(x, y), ...] 좌표 리스트
         indices: 강조할 랜드마크 인덱스 리스트
         color: 원의 색상 (기본 'red')
         radius: 원의 반지름(px) (기본값 6)
 
     Returns:
-        강조된 랜드마크 오버레이된 PIL Image 객체
+        강조된 랜드마크가 찍힌 RGBA PIL Image 객체
     """
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
-
-    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
-
-    for idx in indices:
-        if idx < len(landmarks):
-            x, y = landmarks[idx]
-            left_up = (x - radius, y - radius)
-            right_down = (x + radius, y + radius)
-            draw.ellipse([left_up, right_down], fill=color)
-
-    return Image.alpha_composite(image, overlay)
+    landmarks = np.asarray(landmarks, dtype=np.float32).reshape(-1, 2)
+    indices = [idx for idx in indices if idx < len(landmarks)]
+    return draw_landmark_points(image, landmarks[indices], color, radius)